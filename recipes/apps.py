@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class RecipesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipes'
+
+    def ready(self):
+        """Connect the app's signal receivers and the SQLite connection tuning."""
+        from recipes import signals, sqlite  # noqa: F401
@@ -0,0 +1,126 @@
+"""
+User avatars, from Gravatar or generated locally.
+
+``settings.AVATAR_BACKEND`` chooses where avatar URLs point. With
+``'gravatar'`` (the default) they point at gravatar.com. With ``'local'``
+they point at the ``avatar`` view, which draws an identicon from the
+user's email hash with Pillow: a symmetric 5x5 grid of cells in a colour
+taken from the hash, so the same email always gets the same image.
+
+Each image is written once under ``MEDIA_ROOT/avatars/<size>/`` and served
+from there afterwards. Only hashes that belong to a user are drawn and
+stored, so requests for made-up hashes cannot fill the disk. A user with no
+email hash gets the default avatar, a plain silhouette. The URL is fully
+determined by the hash and size, so responses are marked cacheable for a
+year.
+"""
+import os
+import tempfile
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from PIL import Image, ImageDraw
+
+GRAVATAR_URL = 'https://www.gravatar.com/avatar/{email_hash}?size={size}&default=mp'
+AVATAR_SIZES = (60, 120)
+AVATAR_DIRECTORY = 'avatars'
+AVATAR_MAX_AGE = 60 * 60 * 24 * 365
+DEFAULT_AVATAR_NAME = 'default'
+GRID_SIZE = 5
+BACKGROUND = (240, 240, 240)
+SILHOUETTE = (190, 190, 190)
+
+
+def use_local_avatars():
+    """Check whether avatars are generated locally rather than loaded from Gravatar."""
+    return getattr(settings, 'AVATAR_BACKEND', 'gravatar') == 'local'
+
+
+def avatar_url(email_hash, size):
+    """Return the URL of the avatar for an email hash at a size in pixels."""
+    if not use_local_avatars():
+        return GRAVATAR_URL.format(email_hash=email_hash, size=size)
+    if not email_hash:
+        return reverse('default_avatar', kwargs={'size': local_size(size)})
+    return reverse('avatar', kwargs={'email_hash': email_hash, 'size': local_size(size)})
+
+
+def local_size(size):
+    """Return the smallest generated size at least as large as size, or the largest one."""
+    return next((available for available in AVATAR_SIZES if available >= size), AVATAR_SIZES[-1])
+
+
+def avatar_path(email_hash, size):
+    """Return where the generated avatar for an email hash and size is stored."""
+    return os.path.join(settings.MEDIA_ROOT, AVATAR_DIRECTORY, str(size), f'{email_hash}.png')
+
+
+def get_avatar_path(email_hash, size):
+    """
+    Return the path of a generated avatar, drawing and storing it first if needed.
+
+    Returns:
+        The path, or None if the avatar is not stored and no user has the
+        email hash.
+    """
+    path = avatar_path(email_hash, size)
+    if not os.path.exists(path):
+        if not get_user_model().objects.filter(email_hash=email_hash).exists():
+            return None
+        save_image(draw_identicon(email_hash, size), path)
+    return path
+
+
+def get_default_avatar_path(size):
+    """Return the path of the default avatar, drawing and storing it first if needed."""
+    path = avatar_path(DEFAULT_AVATAR_NAME, size)
+    if not os.path.exists(path):
+        save_image(draw_default_avatar(size), path)
+    return path
+
+
+def draw_identicon(email_hash, size):
+    """
+    Draw the identicon for a hex email hash.
+
+    The first 15 hex digits switch on the cells of the left three columns,
+    which are mirrored onto the right two; the last six give the colour.
+    """
+    colour = tuple(int(email_hash[index:index + 2], 16) for index in (26, 28, 30))
+    image = Image.new('RGB', (size, size), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    cell = size // (GRID_SIZE + 1)
+    margin = (size - cell * GRID_SIZE) // 2
+    for index in range(GRID_SIZE * 3):
+        if int(email_hash[index], 16) % 2:
+            continue
+        column, row = divmod(index, GRID_SIZE)
+        for x in {column, GRID_SIZE - 1 - column}:
+            left, top = margin + x * cell, margin + row * cell
+            draw.rectangle([left, top, left + cell - 1, top + cell - 1], fill=colour)
+    return image
+
+
+def draw_default_avatar(size):
+    """Draw the default avatar: a head and shoulders silhouette."""
+    image = Image.new('RGB', (size, size), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    head = size // 5
+    centre = size // 2
+    draw.ellipse([centre - head, size * 2 // 5 - head, centre + head, size * 2 // 5 + head], fill=SILHOUETTE)
+    draw.ellipse([centre - head * 2, size * 7 // 10, centre + head * 2, size * 7 // 10 + head * 4], fill=SILHOUETTE)
+    return image
+
+
+def save_image(image, path):
+    """Write an image atomically, so concurrent requests never read a partial file."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary_path = tempfile.mkstemp(dir=directory, suffix='.png')
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            image.save(file, format='PNG', optimize=True)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
@@ -0,0 +1,78 @@
+"""
+Fragment cache for the viewer-independent part of recipe cards.
+
+The image, title, author link, description, stars and difficulty of a card
+look the same to every viewer, so they are rendered once and stored in the
+default cache. Fragments are kept in the versioned cache at the versions of
+their recipe and its author, which signal receivers bump when the recipe is
+saved, its ratings change or its author is saved, so stale fragments are
+simply never looked up again. Without a shared cache every fragment is
+rendered on each request, as versions would not be shared either.
+
+The favourite heart and owner controls depend on the viewer and are rendered
+around the cached fragment on every request.
+"""
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from recipes import single_flight, versioned_cache
+from recipes.versioned_cache import RECIPE, USER
+
+FRAGMENT_NAME = 'recipe_card'
+FRAGMENT_TEMPLATE = 'partials/recipe_card_body.html'
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+
+def get_card_fragments(cards):
+    """
+    Return the rendered fragment of each card, keyed by recipe id.
+
+    Args:
+        cards: Card context dicts with at least 'recipe' and 'stars' keys.
+            Every version is read in one cache call, all cached fragments
+            are fetched in another and every miss is rendered and stored
+            in a third.
+    """
+    if not versioned_cache.is_shared():
+        return render_fragments(cards)
+    recipes = [card['recipe'] for card in cards]
+    versions = iter(versioned_cache.get_versions(
+        [pair for recipe in recipes for pair in fragment_versions(recipe)]
+    ))
+    keys = {
+        recipe.id: versioned_cache.value_key_at((FRAGMENT_NAME, recipe.id), [next(versions), next(versions)])
+        for recipe in recipes
+    }
+    fragments = cache.get_many(keys.values())
+    rendered = {}
+    for card in cards:
+        key = keys[card['recipe'].id]
+        hit = key in fragments
+        if not hit:
+            rendered[key] = render_fragment(card)
+        versioned_cache.stats.record(FRAGMENT_NAME, single_flight.HIT if hit else single_flight.MISS)
+    if rendered:
+        cache.set_many(rendered, FRAGMENT_TIMEOUT)
+    fragments.update(rendered)
+    return {recipe_id: mark_safe(fragments[key]) for recipe_id, key in keys.items()}
+
+
+def render_fragments(cards):
+    """Render the fragment of every card without the cache, counting each as a miss."""
+    fragments = {}
+    for card in cards:
+        fragments[card['recipe'].id] = mark_safe(render_fragment(card))
+        versioned_cache.stats.record(FRAGMENT_NAME, single_flight.MISS)
+    return fragments
+
+
+def fragment_versions(recipe):
+    """Return the (entity, pk) pairs a recipe's fragment is computed from."""
+    return [(RECIPE, recipe.id), (USER, recipe.author_id)]
+
+
+def render_fragment(card):
+    """Render the viewer-independent part of one card."""
+    return render_to_string(FRAGMENT_TEMPLATE, {
+        'recipe_obj': card['recipe'], 'stars_data': card['stars'], 'rating_known': True,
+    })
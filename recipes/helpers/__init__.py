@@ -1,5 +1,6 @@
 """Helper modules for the recipes app."""
 from recipes.helpers.recipe_form import *
+from recipes.helpers.recipe_cards import *
 
 
 def build_recipe_list(recipes, favourite_ids):
@@ -0,0 +1,126 @@
+"""Helpers shared by the benchmark management commands."""
+import tempfile
+import time
+from contextlib import contextmanager
+from random import choice, randint
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from recipes import versioned_cache
+from recipes.models import Rating, Recipe, RecipeIngredient, User
+from recipes.models.user import hash_email
+
+
+class BenchmarkRollback(Exception):
+    """Raised to discard everything a benchmark wrote to the database."""
+
+
+@contextmanager
+def rolled_back():
+    """
+    Run the enclosed block in a transaction that is always rolled back.
+
+    Recipe lists cached from the rolled back rows are invalidated afterwards.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            raise BenchmarkRollback
+    except BenchmarkRollback:
+        pass
+    finally:
+        versioned_cache.bump(versioned_cache.CATALOGUE)
+
+
+@contextmanager
+def shared_cache():
+    """
+    Run the enclosed block with a cache that versioned values are stored in.
+
+    If the configured cache is process-local, a file cache in a temporary
+    directory is used instead, so cache hits can be measured.
+    """
+    if versioned_cache.is_shared():
+        yield
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        with override_settings(CACHES={'default': {**settings.CACHE_BACKENDS['file'], 'LOCATION': directory}}):
+            yield
+
+
+def create_benchmark_users(count, prefix='bench'):
+    """Bulk create users with unusable passwords for benchmarking."""
+    users = [
+        User(
+            username=f'@{prefix}{index}', email=f'{prefix}{index}@example.org',
+            email_hash=hash_email(f'{prefix}{index}@example.org'),
+            first_name='Bench', last_name=f'User{index}', password='!'
+        )
+        for index in range(count)
+    ]
+    return User.objects.bulk_create(users)
+
+
+def create_benchmark_recipes(count, authors, names=None, batch_size=1000):
+    """Bulk create recipes spread across the given authors, optionally picking from names."""
+    recipes = [
+        Recipe(
+            author=choice(authors),
+            recipe_name=choice(names) if names else f'Benchmark Recipe {index}',
+            difficulty=randint(1, 5), description='Benchmark description',
+            instructions='Step 1\nStep 2'
+        )
+        for index in range(count)
+    ]
+    recipes = Recipe.objects.bulk_create(recipes, batch_size=batch_size)
+    versioned_cache.bump(versioned_cache.CATALOGUE)
+    return recipes
+
+
+def create_benchmark_ingredients(recipes, names, per_recipe=4, batch_size=1000):
+    """Bulk create ingredients for every recipe, picking names at random."""
+    ingredients = [
+        RecipeIngredient(recipe=recipe, name=choice(names), amount=randint(1, 500))
+        for recipe in recipes
+        for _ in range(per_recipe)
+    ]
+    return RecipeIngredient.objects.bulk_create(ingredients, batch_size=batch_size)
+
+
+def create_benchmark_ratings(recipes, raters, per_recipe=3, batch_size=1000):
+    """Bulk create ratings from the first raters for every recipe, then reconcile totals."""
+    ratings = [
+        Rating(recipe=recipe, user=rater, rating=randint(1, 5))
+        for recipe in recipes
+        for rater in raters[:per_recipe]
+    ]
+    ratings = Rating.objects.bulk_create(ratings, batch_size=batch_size)
+    Recipe.reconcile_rating_totals()
+    versioned_cache.bump(versioned_cache.CATALOGUE)
+    return ratings
+
+
+def build_request(path, user=None, params=None):
+    """Build a GET request for calling a view function directly."""
+    request = RequestFactory().get(path, params or {}, HTTP_HOST='localhost')
+    request.user = user or AnonymousUser()
+    return request
+
+
+def measure(func, repeat=5):
+    """
+    Call func repeatedly and measure it.
+
+    Returns:
+        Tuple of (best wall time in milliseconds, queries issued by one call).
+    """
+    with CaptureQueriesContext(connection) as queries:
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), len(queries)
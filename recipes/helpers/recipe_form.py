@@ -1,5 +1,8 @@
 """Helpers for parsing and saving recipe form data."""
+from django.db import transaction
+from recipes import search, tag_cache, versioned_cache
 from recipes.models import CuisineTag, DietaryTag, RecipeIngredient
+from recipes.versioned_cache import CATALOGUE, RECIPE
 
 def build_ingredient_dict(post_data, index, include_id):
     """Build a single ingredient dict from POST data."""
@@ -131,44 +134,105 @@ def parse_ingredient_amount(amount_str):
     except (ValueError, TypeError):
         return 1
 
-def create_ingredient(recipe, ingredient):
-    """Create a single RecipeIngredient from a dict."""
+def parse_ingredient_units(units):
+    """Return posted ingredient units, defaulting to the model's default when none were chosen."""
+    units = (units or '').strip()
+    if not units:
+        return RecipeIngredient._meta.get_field('units').default
+    return units
+
+def parse_ingredient_id(id_str):
+    """Parse a posted ingredient id, returning None when it is missing or invalid."""
+    try:
+        return int(id_str)
+    except (ValueError, TypeError):
+        return None
+
+def build_ingredient_fields(ingredient):
+    """Return the cleaned name, amount and units of an ingredient dict, or None if it has no name."""
     name = ingredient.get('name', '').strip()
     if not name:
-        return
+        return None
     
-    amount = parse_ingredient_amount(ingredient.get('amount', ''))
-    units = ingredient.get('units', 'g')
-    
-    RecipeIngredient.objects.create(
-        recipe=recipe,
-        name=name,
-        amount=amount,
-        units=units
-    )
+    return {
+        'name': name,
+        'amount': parse_ingredient_amount(ingredient.get('amount', '')),
+        'units': parse_ingredient_units(ingredient.get('units', '')),
+    }
 
-def save_ingredients_to_recipe(recipe, ingredients):
-    """Save ingredients to recipe, replacing existing ones. Skips empty names."""
-    RecipeIngredient.objects.filter(recipe=recipe).delete()
+def diff_ingredients(existing, ingredients):
+    """
+    Compare posted ingredients with a recipe's stored ones.
     
-    for ingredient in ingredients:
-        create_ingredient(recipe, ingredient)
-
-def build_tag_objects(tag_names, tag_model):
-    """Build tag objects from tag name strings."""
-    tag_objects = []
+    A posted ingredient whose id names a stored ingredient of the recipe
+    updates it; any other is new. Stored ingredients that are not posted
+    are stale.
+    
+    Args:
+        existing: Dict of the recipe's stored RecipeIngredients by id.
+        ingredients: Posted ingredient dicts, with an optional 'id' key.
     
-    for tag_name in tag_names:
-        cleaned_name = tag_name.strip()
-        if cleaned_name:
-            tag_obj, _ = tag_model.objects.get_or_create(name=cleaned_name)
-            tag_objects.append(tag_obj)
+    Returns:
+        Tuple of (changed ingredients to update, field dicts to create, ids to delete).
+    """
+    to_update, to_create, kept_ids = [], [], set()
     
-    return tag_objects
+    for ingredient in ingredients:
+        fields = build_ingredient_fields(ingredient)
+        if fields is None:
+            continue
+        
+        ingredient_id = parse_ingredient_id(ingredient.get('id'))
+        stored = existing.get(ingredient_id)
+        if stored is None or ingredient_id in kept_ids:
+            to_create.append(fields)
+            continue
+        
+        kept_ids.add(ingredient_id)
+        if any(getattr(stored, field) != value for field, value in fields.items()):
+            for field, value in fields.items():
+                setattr(stored, field, value)
+            to_update.append(stored)
+    
+    return to_update, to_create, existing.keys() - kept_ids
+
+def save_ingredients_to_recipe(recipe, ingredients):
+    """
+    Save ingredients to recipe, keeping the rows whose ids were posted. Skips empty names.
+    
+    Changed rows are written with one bulk update, new rows with one bulk
+    insert and removed rows with one delete, all in a single transaction.
+    Bulk writes send no model signals, so the recipe's search entry is
+    refreshed and its cached values are invalidated here instead.
+    """
+    with transaction.atomic():
+        existing = {ingredient.id: ingredient for ingredient in RecipeIngredient.objects.filter(recipe=recipe)}
+        to_update, to_create, stale_ids = diff_ingredients(existing, ingredients)
+        
+        if stale_ids:
+            RecipeIngredient.objects.filter(id__in=stale_ids).delete()
+        if to_update:
+            RecipeIngredient.objects.bulk_update(to_update, ['name', 'amount', 'units'])
+        if to_create:
+            RecipeIngredient.objects.bulk_create(RecipeIngredient(recipe=recipe, **fields) for fields in to_create)
+        
+        if to_update or to_create:
+            ingredients_changed(recipe.pk)
+
+def ingredients_changed(recipe_id):
+    """Refresh what is derived from a recipe's ingredients after a bulk write."""
+    versioned_cache.bump(RECIPE, recipe_id)
+    versioned_cache.bump(CATALOGUE)
+    if search.is_available():
+        search.index_recipe(recipe_id)
+
+def build_tag_ids(tag_names, tag_model):
+    """Resolve tag name strings to tag ids, creating missing tags in one query."""
+    return tag_cache.for_model(tag_model).ids_for_names(tag_names)
 
 def save_tags_to_recipe(recipe, cuisine_tags, dietary_tags):
     """Save tags to recipe, creating new tag objects if needed."""
-    cuisine_objs = build_tag_objects(cuisine_tags, CuisineTag)
-    dietary_objs = build_tag_objects(dietary_tags, DietaryTag)
-    recipe.cuisine_tags.set(cuisine_objs)
-    recipe.dietary_tags.set(dietary_objs)
\ No newline at end of file
+    cuisine_ids = build_tag_ids(cuisine_tags, CuisineTag)
+    dietary_ids = build_tag_ids(dietary_tags, DietaryTag)
+    recipe.cuisine_tags.set(cuisine_ids)
+    recipe.dietary_tags.set(dietary_ids)
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Management command to benchmark page renders with a cold and a warm card cache.
+
+Recipes and ratings are bulk inserted inside a transaction that is rolled
+back at the end, so the command can be run against a development database
+without leaving any data behind.
+"""
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from recipes import card_cache, versioned_cache
+from recipes.helpers.benchmark import (
+    build_request,
+    create_benchmark_ratings,
+    create_benchmark_recipes,
+    create_benchmark_users,
+    measure,
+    rolled_back,
+    shared_cache,
+)
+from recipes.views import other_user_profile_view, welcome
+
+
+class Command(BaseCommand):
+    """
+    Measure welcome and profile render times with the recipe card cache cold and warm.
+
+    Attributes:
+        help (str): Short description shown in ``manage.py help``.
+    """
+
+    help = 'Benchmarks recipe card rendering with a cold and a warm fragment cache'
+
+    def add_arguments(self, parser):
+        """Register the recipe count and the repeat count."""
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        """Create the catalogue and render each page with both cache states."""
+        with shared_cache(), rolled_back():
+            self.run(options['recipes'], options['repeat'])
+
+    def run(self, recipe_count, repeat):
+        """Print one row per page and cache state."""
+        users = create_benchmark_users(10)
+        recipes = create_benchmark_recipes(recipe_count, users)
+        create_benchmark_ratings(recipes, users)
+        viewer, author = users[0], users[1]
+        pages = [
+            ('welcome, anonymous', lambda: welcome(build_request('/welcome/'))),
+            ('welcome, signed in', lambda: welcome(build_request('/welcome/', user=viewer))),
+            ('other profile', lambda: other_user_profile_view(
+                build_request(f'/user/{author.id}/', user=viewer), author.id
+            )),
+        ]
+        self.stdout.write(f"{'page':<22}{'cache':<8}{'best ms':>10}{'hits':>8}{'misses':>8}")
+        for label, render in pages:
+            self.report(label, 'cold', lambda: (cache.clear(), render()), repeat)
+            self.report(label, 'warm', render, repeat)
+
+    def report(self, label, state, render, repeat):
+        """Time one page in one cache state and print the counters it produced."""
+        render()
+        versioned_cache.stats.reset()
+        best, _ = measure(render, repeat)
+        calls = repeat + 1
+        hits, misses = versioned_cache.stats.counts(card_cache.FRAGMENT_NAME)
+        self.stdout.write(f"{label:<22}{state:<8}{best:>10.2f}{hits // calls:>8}{misses // calls:>8}")
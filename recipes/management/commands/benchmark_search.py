@@ -0,0 +1,80 @@
+"""
+Management command to benchmark full-text search against substring search.
+
+Recipes, ingredients and authors are bulk inserted inside a transaction
+that is rolled back at the end, so the command can be run against a
+development database without leaving any data behind.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from recipes import search
+from recipes.helpers.benchmark import (
+    create_benchmark_ingredients,
+    create_benchmark_recipes,
+    create_benchmark_users,
+    measure,
+    rolled_back,
+)
+from recipes.models import Recipe
+from recipes.views.welcome_view import apply_substring_filter, sort_recipes
+
+DISHES = [
+    'Spicy Pasta', 'Chocolate Cake', 'Chicken Curry', 'Beef Stew', 'Garlic Bread',
+    'Tomato Soup', 'Caesar Salad', 'Mushroom Risotto', 'Lemon Tart', 'Fish Pie',
+]
+INGREDIENTS = [
+    'flour', 'sugar', 'butter', 'eggs', 'milk', 'garlic', 'onions', 'tomatoes',
+    'chicken', 'beef', 'pasta', 'rice', 'cheese', 'chocolate', 'lemon', 'basil',
+]
+
+
+class Command(BaseCommand):
+    """
+    Compare the first welcome page of search results for both search paths.
+
+    Each measurement counts the matches and fetches one page of 12, as the
+    welcome view does.
+
+    Attributes:
+        QUERIES (list): Search strings measured against the catalogue.
+        help (str): Short description shown in ``manage.py help``.
+    """
+
+    QUERIES = ['pasta', 'choc', 'garlic chicken', 'bench7', 'saffron']
+    help = 'Benchmarks full-text recipe search against icontains search'
+
+    def add_arguments(self, parser):
+        """Register the catalogue size and the repeat count."""
+        parser.add_argument('--recipes', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        """Build the catalogue, index it and time each query on both paths."""
+        if not search.is_available():
+            raise CommandError('The search index requires an SQLite database with FTS5.')
+        with rolled_back():
+            self.run(options['recipes'], options['repeat'])
+
+    def run(self, recipe_count, repeat):
+        """Print one row per query with the timings of both paths."""
+        users = create_benchmark_users(50)
+        recipes = create_benchmark_recipes(recipe_count, users, names=DISHES)
+        create_benchmark_ingredients(recipes, INGREDIENTS)
+        search.rebuild_index()
+        self.stdout.write(f"{recipe_count} recipes")
+        self.stdout.write(f"{'query':<16}{'matches':>9}{'icontains ms':>14}{'fts5 ms':>10}")
+        for query in self.QUERIES:
+            substring = sort_recipes(apply_substring_filter(Recipe.objects.all(), query), None)
+            ranked = sort_recipes(search.search_recipes(Recipe.objects.all(), query), None, ranked=True)
+            substring_ms, _ = measure(lambda: first_page(substring), repeat)
+            ranked_ms, _ = measure(lambda: first_page(ranked), repeat)
+            matches = first_page(ranked).paginator.count
+            self.stdout.write(f"{query:<16}{matches:>9}{substring_ms:>14.1f}{ranked_ms:>10.1f}")
+
+
+def first_page(recipes):
+    """Count the matches and fetch the first page, as the welcome view does."""
+    page = Paginator(recipes.all(), 12).get_page(1)
+    list(page.object_list)
+    return page
@@ -0,0 +1,176 @@
+"""
+Management command to benchmark concurrent reads and writes on SQLite with
+its default settings and with the tuning from ``recipes.sqlite``.
+
+Each run builds a fresh database file in a temporary directory, with
+tables shaped like recipes and ratings, so the development database is
+never touched. Reader threads page through the newest recipes while writer
+threads rate recipes and update their stored totals, as the rating view
+does, for a fixed time.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from random import Random
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from recipes.sqlite import apply_pragmas, get_pragmas
+
+SCHEMA = [
+    'CREATE TABLE recipe (id INTEGER PRIMARY KEY, name TEXT NOT NULL, published REAL NOT NULL, '
+    'rating_total INTEGER NOT NULL DEFAULT 0, rating_count INTEGER NOT NULL DEFAULT 0)',
+    'CREATE INDEX recipe_published_idx ON recipe (published)',
+    'CREATE TABLE rating (id INTEGER PRIMARY KEY, recipe_id INTEGER NOT NULL REFERENCES recipe (id), '
+    'user_id INTEGER NOT NULL, rating INTEGER NOT NULL, UNIQUE (recipe_id, user_id))',
+]
+READ_PAGE = 'SELECT id, name, rating_total, rating_count FROM recipe ORDER BY published DESC LIMIT 12 OFFSET ?'
+READ_RATING = 'SELECT rating FROM rating WHERE recipe_id = ? AND user_id = ?'
+WRITE_RATING = (
+    'INSERT INTO rating (recipe_id, user_id, rating) VALUES (?, ?, ?) '
+    'ON CONFLICT (recipe_id, user_id) DO UPDATE SET rating = excluded.rating'
+)
+WRITE_TOTALS = 'UPDATE recipe SET rating_total = rating_total + ?, rating_count = rating_count + ? WHERE id = ?'
+
+
+class Command(BaseCommand):
+    """
+    Compare read and write throughput of the default and tuned connections.
+
+    The default connection is what Django opens without any options: a
+    rollback journal, full syncs and deferred transactions. The tuned one
+    runs the pragmas every app connection runs, from
+    ``recipes.sqlite.get_pragmas``, and begins transactions with the
+    configured ``transaction_mode``.
+
+    Attributes:
+        help (str): Short description shown in ``manage.py help``.
+    """
+
+    help = 'Benchmarks concurrent SQLite reads and writes with default and tuned settings'
+
+    def add_arguments(self, parser):
+        """Register the thread counts, the catalogue size and the duration."""
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--seconds', type=float, default=5)
+
+    def handle(self, *args, **options):
+        """Run the workload once per configuration and print a row for each."""
+        database_options = settings.DATABASES['default'].get('OPTIONS', {})
+        configurations = [
+            ('default', {}, 'DEFERRED'),
+            ('tuned', get_pragmas(), database_options.get('transaction_mode', 'DEFERRED')),
+        ]
+        self.stdout.write(
+            f"{options['readers']} readers, {options['writers']} writers, "
+            f"{options['recipes']} recipes, {options['seconds']:g} s"
+        )
+        self.stdout.write(f"{'settings':<10}{'reads/s':>10}{'writes/s':>10}{'locked':>8}")
+        for label, pragmas, transaction_mode in configurations:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                workload = Workload(path, pragmas, transaction_mode)
+                workload.create(options['recipes'])
+                reads, writes, locked = workload.run(options['readers'], options['writers'], options['seconds'])
+            self.stdout.write(
+                f"{label:<10}{reads / options['seconds']:>10.0f}{writes / options['seconds']:>10.0f}{locked:>8}"
+            )
+
+
+class Workload:
+    """
+    Concurrent readers and writers against one database file.
+
+    Attributes:
+        path (str): Path of the database file.
+        pragmas (dict): Pragmas run on every connection.
+        transaction_mode (str): DEFERRED, IMMEDIATE or EXCLUSIVE, for each write.
+    """
+
+    def __init__(self, path, pragmas, transaction_mode):
+        self.path = path
+        self.pragmas = pragmas
+        self.transaction_mode = transaction_mode
+        self.recipe_count = 0
+        self.lock = threading.Lock()
+        self.totals = {'reads': 0, 'writes': 0, 'locked': 0}
+
+    def connect(self):
+        """Open a connection as Django does, then run the pragmas on it."""
+        connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        apply_pragmas(connection, self.pragmas)
+        return connection
+
+    def create(self, recipe_count):
+        """Create the tables and the recipes."""
+        connection = self.connect()
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.execute('BEGIN')
+        connection.executemany(
+            'INSERT INTO recipe (name, published) VALUES (?, ?)',
+            ((f'Benchmark Recipe {index}', index) for index in range(recipe_count))
+        )
+        connection.execute('COMMIT')
+        connection.close()
+        self.recipe_count = recipe_count
+
+    def run(self, readers, writers, seconds):
+        """
+        Run the threads for a number of seconds.
+
+        Returns:
+            Tuple of (reads, writes, operations that failed on a lock).
+        """
+        deadline = time.perf_counter() + seconds
+        threads = [
+            threading.Thread(target=self.work, args=(operation, deadline, seed))
+            for seed, operation in enumerate([self.read] * readers + [self.write] * writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.totals['reads'], self.totals['writes'], self.totals['locked']
+
+    def work(self, operation, deadline, seed):
+        """Repeat one operation until the deadline, counting successes and lock failures."""
+        connection = self.connect()
+        random = Random(seed)
+        counts = {'reads': 0, 'writes': 0, 'locked': 0}
+        while time.perf_counter() < deadline:
+            try:
+                counts[operation(connection, random)] += 1
+            except sqlite3.OperationalError as error:
+                if 'locked' not in str(error) and 'busy' not in str(error):
+                    raise
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                counts['locked'] += 1
+        connection.close()
+        with self.lock:
+            for name, count in counts.items():
+                self.totals[name] += count
+
+    def read(self, connection, random):
+        """Fetch a page of the newest recipes near the front of the feed."""
+        connection.execute(READ_PAGE, (12 * random.randrange(10),)).fetchall()
+        return 'reads'
+
+    def write(self, connection, random):
+        """Rate a recipe and update its stored totals in one transaction."""
+        recipe_id = random.randrange(1, self.recipe_count + 1)
+        user_id = random.randrange(1, 1000)
+        rating = random.randint(1, 5)
+        connection.execute(f'BEGIN {self.transaction_mode}')
+        previous = connection.execute(READ_RATING, (recipe_id, user_id)).fetchone()
+        connection.execute(WRITE_RATING, (recipe_id, user_id, rating))
+        if previous is None:
+            connection.execute(WRITE_TOTALS, (rating, 1, recipe_id))
+        else:
+            connection.execute(WRITE_TOTALS, (rating - previous[0], 0, recipe_id))
+        connection.execute('COMMIT')
+        return 'writes'
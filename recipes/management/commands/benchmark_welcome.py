@@ -0,0 +1,70 @@
+"""
+Management command to benchmark the welcome feed as the catalogue grows.
+
+Recipes and ratings are bulk inserted inside a transaction that is rolled
+back at the end, so the command can be run against a development database
+without leaving any data behind.
+"""
+
+from django.core.management.base import BaseCommand
+from recipes import versioned_cache
+from recipes.helpers.benchmark import (
+    build_request,
+    create_benchmark_ratings,
+    create_benchmark_recipes,
+    create_benchmark_users,
+    measure,
+    rolled_back,
+    shared_cache,
+)
+from recipes.views import welcome
+
+
+class Command(BaseCommand):
+    """
+    Measure welcome page query count and latency for growing recipe counts.
+
+    Each scenario is timed with the cached recipe page invalidated before
+    every render, and again served from the cache.
+
+    Attributes:
+        SCENARIOS (list): Pairs of (label, query parameters) rendered at each size.
+        help (str): Short description shown in ``manage.py help``.
+    """
+
+    SCENARIOS = [
+        ('newest', {}),
+        ('highest', {'sort': 'highest'}),
+        ('lowest, page 2', {'sort': 'lowest', 'page': '2'}),
+    ]
+    help = 'Benchmarks the welcome page for growing recipe counts'
+
+    def add_arguments(self, parser):
+        """Register the recipe counts to measure and the repeat count."""
+        parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000, 10000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        """Grow the catalogue to each size in turn and render every scenario."""
+        with shared_cache(), rolled_back():
+            self.run(sorted(options['sizes']), options['repeat'])
+
+    def run(self, sizes, repeat):
+        """Print one row per size and scenario."""
+        users = create_benchmark_users(10)
+        self.stdout.write(f"{'recipes':>8}  {'scenario':<16}{'queries':>8}{'best ms':>10}{'cached ms':>11}")
+        recipe_count = 0
+        for size in sizes:
+            recipes = create_benchmark_recipes(size - recipe_count, users)
+            create_benchmark_ratings(recipes, users)
+            recipe_count = size
+            for label, params in self.SCENARIOS:
+                best, queries = measure(lambda: render_uncached(params), repeat)
+                cached, _ = measure(lambda: welcome(build_request('/welcome/', params=params)), repeat)
+                self.stdout.write(f"{size:>8}  {label:<16}{queries:>8}{best:>10.1f}{cached:>11.1f}")
+
+
+def render_uncached(params):
+    """Render the welcome page after invalidating every cached recipe page."""
+    versioned_cache.bump(versioned_cache.CATALOGUE)
+    return welcome(build_request('/welcome/', params=params))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from recipes.timeline import rebuild_timelines
+
+
+class Command(BaseCommand):
+    """
+    Management command to rebuild every user's following timeline.
+
+    Timeline entries are normally written as recipes are published and
+    users follow or unfollow each other. Fixtures, bulk inserts and raw SQL
+    bypass that, so this command recreates every entry from the Follow and
+    Recipe tables in one INSERT statement.
+
+    Attributes:
+        help (str): Short description displayed when running
+            `python manage.py help rebuild_timelines`.
+    """
+
+    help = 'Rebuilds the following timeline of every user'
+
+    def handle(self, *args, **options):
+        """Rebuild all timelines and report how many entries were written."""
+        count = rebuild_timelines()
+        self.stdout.write(f"Wrote {count} timeline entries.")
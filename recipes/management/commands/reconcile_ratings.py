@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    """
+    Management command to recompute the rating totals and comment counts stored on recipes.
+
+    Totals are normally maintained incrementally as ratings and comments are
+    saved and deleted. Bulk inserts, raw SQL and queryset updates bypass
+    that, so this command rebuilds every recipe's totals from the Rating and
+    Comment tables, with one UPDATE statement each.
+
+    Attributes:
+        help (str): Short description displayed when running
+            `python manage.py help reconcile_ratings`.
+    """
+
+    help = 'Recomputes stored rating totals and comment counts on every recipe'
+
+    def handle(self, *args, **options):
+        """Recompute all rating totals and comment counts and report how many recipes were updated."""
+        updated = Recipe.reconcile_rating_totals()
+        self.stdout.write(f"Reconciled rating totals for {updated} recipes.")
+        updated = Recipe.reconcile_comment_counts()
+        self.stdout.write(f"Reconciled comment counts for {updated} recipes.")
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from recipes.models import User
+
+
+class Command(BaseCommand):
+    """
+    Management command to recompute the follower, following, favourite and recipe counts stored on users.
+
+    Counts are normally maintained incrementally as follows, favourites and
+    recipes are created and deleted. Bulk inserts, raw SQL and queryset
+    updates bypass that, so this command rebuilds every user's counts from
+    grouped counts over the Follow, Favourite and Recipe tables in one
+    UPDATE statement.
+
+    Attributes:
+        help (str): Short description displayed when running
+            `python manage.py help reconcile_user_counts`.
+    """
+
+    help = 'Recomputes stored follower, following, favourite and recipe counts on every user'
+
+    def handle(self, *args, **options):
+        """Recompute all user counts and report how many users were updated."""
+        updated = User.reconcile_counts()
+        self.stdout.write(f"Reconciled counts for {updated} users.")
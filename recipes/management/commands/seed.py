@@ -12,7 +12,7 @@ from random import randint, choice, sample
 from datetime import timedelta
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from recipes.models import User, Recipe, RecipeIngredient, Comment, Rating, DietaryTag, CuisineTag, Follow, Favourite
+from recipes.models import User, Recipe, RecipeIngredient, Comment, Rating, DietaryTag, CuisineTag, Follow, Favourite, normalize_tag_name
 
 user_fixtures = [
     {'username': '@johndoe', 'email': 'john.doe@example.org', 'first_name': 'John', 'last_name': 'Doe'},
@@ -139,10 +139,10 @@ class Command(BaseCommand):
         cuisine_list = ['Italian', 'Mexican', 'Chinese', 'Japanese', 'Indian', 'French', 'Thai', 'Mediterranean', 'American', 'British']
         print("Seeding dietary tags...")
         for name in dietary_list:
-            DietaryTag.objects.get_or_create(name=name)
+            DietaryTag.objects.get_or_create(key=normalize_tag_name(name), defaults={'name': name})
         print("Seeding cuisine tags...")
         for name in cuisine_list:
-            CuisineTag.objects.get_or_create(name=name)
+            CuisineTag.objects.get_or_create(key=normalize_tag_name(name), defaults={'name': name})
         print("Tag seeding complete.")
 
     def create_recipes(self):
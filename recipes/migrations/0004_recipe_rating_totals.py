@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:27
+
+from django.db import migrations, models
+from django.db.models import Count, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce
+
+
+def backfill_rating_totals(apps, schema_editor):
+    """Compute stored rating totals for recipes that already have ratings."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Rating = apps.get_model('recipes', 'Rating')
+    ratings = Rating.objects.filter(recipe=OuterRef('pk')).order_by().values('recipe')
+    rating_sum = ratings.annotate(total=Sum('rating')).values('total')
+    rating_count = ratings.annotate(total=Count('id')).values('total')
+    Recipe.objects.update(
+        rating_sum=Coalesce(Subquery(rating_sum), 0),
+        rating_count=Coalesce(Subquery(rating_count), 0),
+        rating_average=Coalesce(
+            Cast(Subquery(rating_sum), FloatField()) / Subquery(rating_count), Value(0.0)
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_cuisinetag_dietarytag_remove_tag_category_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_average',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['rating_average', 'publication_date', 'id'], name='recipe_rating_average_idx'),
+        ),
+        migrations.RunPython(backfill_rating_totals, migrations.RunPython.noop),
+    ]
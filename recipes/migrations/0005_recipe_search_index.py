@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:34
+
+import django.db.models.deletion
+import recipes.models.recipe_search
+from django.db import migrations, models
+
+SEARCH_TABLE = 'recipes_recipe_search'
+
+
+def create_search_index(apps, schema_editor):
+    """Create the FTS5 table with bm25 column weights and index existing recipes."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+        "recipe_name, description, ingredients, author, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rank) "
+        "VALUES ('rank', 'bm25(10.0, 1.0, 4.0, 3.0)')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, recipe_name, description, ingredients, author) "
+        "SELECT recipe.id, recipe.recipe_name, recipe.description, "
+        "COALESCE((SELECT group_concat(ingredient.name, ' ') FROM recipes_recipeingredient AS ingredient "
+        "WHERE ingredient.recipe_id = recipe.id), ''), "
+        "COALESCE(author.username || ' ' || author.first_name || ' ' || author.last_name, '') "
+        "FROM recipes_recipe AS recipe LEFT JOIN recipes_user AS author ON author.id = recipe.author_id"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    """Drop the FTS5 table."""
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_rating_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeSearchEntry',
+            fields=[
+                ('recipe', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='recipes.recipe')),
+                ('document', recipes.models.recipe_search.SearchDocumentField(db_column='recipes_recipe_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'recipes_recipe_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_recipe_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['publication_date', 'id'], name='recipe_publication_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:16
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_counts(apps, schema_editor):
+    """Store the comment count of every existing recipe."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Comment = apps.get_model('recipes', 'Comment')
+    comments = Comment.objects.filter(recipe=OuterRef('pk')).order_by().values('recipe')
+    comment_count = comments.annotate(total=Count('id')).values('total')
+    Recipe.objects.update(comment_count=Coalesce(Subquery(comment_count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_timeline_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(models.F('recipe'), models.OrderBy(models.F('timestamp'), descending=True), models.OrderBy(models.F('id'), descending=True), name='comment_recipe_timestamp_idx'),
+        ),
+        migrations.RunPython(backfill_comment_counts, migrations.RunPython.noop),
+    ]
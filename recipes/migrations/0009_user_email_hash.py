@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:29
+
+import hashlib
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_email_hashes(apps, schema_editor):
+    """Store the Gravatar hash of every existing user's email, a batch of users at a time."""
+    User = apps.get_model('recipes', 'User')
+    last_id = 0
+    while True:
+        users = list(User.objects.filter(id__gt=last_id).order_by('id').only('id', 'email')[:BATCH_SIZE])
+        if not users:
+            break
+        for user in users:
+            user.email_hash = hashlib.md5(user.email.strip().lower().encode('utf-8')).hexdigest()
+        User.objects.bulk_update(users, ['email_hash'])
+        last_id = users[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipe_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='email_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.RunPython(backfill_email_hashes, migrations.RunPython.noop),
+    ]
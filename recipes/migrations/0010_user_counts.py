@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_per_user(queryset, user_field):
+    """Build a subquery counting the rows of queryset whose user_field is the outer user."""
+    rows = queryset.filter(**{user_field: OuterRef('pk')}).order_by().values(user_field)
+    return Coalesce(Subquery(rows.annotate(total=Count('id')).values('total')), 0)
+
+
+def backfill_user_counts(apps, schema_editor):
+    """Store the follower, following, favourite and recipe counts of every existing user."""
+    User = apps.get_model('recipes', 'User')
+    Follow = apps.get_model('recipes', 'Follow')
+    Favourite = apps.get_model('recipes', 'Favourite')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    User.objects.update(
+        follower_count=count_per_user(Follow.objects.all(), 'following'),
+        following_count=count_per_user(Follow.objects.all(), 'follower'),
+        favourite_count=count_per_user(Favourite.objects.all(), 'user'),
+        recipe_count=count_per_user(Recipe.objects.all(), 'author'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_user_email_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='favourite_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_user_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+TAG_FIELDS = (('CuisineTag', 'cuisine_tags'), ('DietaryTag', 'dietary_tags'))
+
+
+def normalize_tag_name(name):
+    """Return the key a tag name is stored under."""
+    return ' '.join(name.split()).lower()
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    """
+    Key every tag by its normalized name, merging tags that share a key.
+
+    The oldest tag of each key is kept. Recipes tagged with a newer
+    duplicate are retagged with it unless they already have it, and the
+    duplicates are then deleted along with their remaining recipe links.
+    """
+    Recipe = apps.get_model('recipes', 'Recipe')
+    for model_name, field_name in TAG_FIELDS:
+        Tag = apps.get_model('recipes', model_name)
+        through = Recipe._meta.get_field(field_name).remote_field.through
+        tag_field = f'{Recipe._meta.get_field(field_name).m2m_reverse_field_name()}_id'
+        kept, duplicates = {}, {}
+        for tag in Tag.objects.order_by('id'):
+            tag.key = normalize_tag_name(tag.name)
+            if tag.key in kept:
+                duplicates[tag.id] = kept[tag.key].id
+            else:
+                kept[tag.key] = tag
+        for duplicate_id, kept_id in duplicates.items():
+            tagged = through.objects.filter(**{tag_field: kept_id}).values('recipe_id')
+            through.objects.filter(**{tag_field: duplicate_id}).exclude(recipe_id__in=tagged).update(
+                **{tag_field: kept_id}
+            )
+        Tag.objects.filter(id__in=duplicates).delete()
+        Tag.objects.bulk_update(kept.values(), ['key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_user_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cuisinetag',
+            name='key',
+            field=models.CharField(default='', editable=False, max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='dietarytag',
+            name='key',
+            field=models.CharField(default='', editable=False, max_length=255),
+            preserve_default=False,
+        ),
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='cuisinetag',
+            name='key',
+            field=models.CharField(editable=False, max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='dietarytag',
+            name='key',
+            field=models.CharField(editable=False, max_length=255, unique=True),
+        ),
+    ]
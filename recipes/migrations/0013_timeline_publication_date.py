@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-17 14:05
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_publication_dates(apps, schema_editor):
+    """Copy each recipe's publication date onto its timeline entries."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    TimelineEntry = apps.get_model('recipes', 'TimelineEntry')
+    TimelineEntry.objects.update(publication_date=Subquery(
+        Recipe.objects.filter(pk=OuterRef('recipe_id')).values('publication_date')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timelineentry',
+            name='publication_date',
+            field=models.DateField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_publication_dates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-publication_date', '-recipe'], name='timeline_user_published_idx'),
+        ),
+    ]
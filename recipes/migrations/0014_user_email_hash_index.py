@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_timeline_publication_date'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='email_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 16:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0014_user_email_hash_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='favourite',
+            name='favourite_user_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='rating',
+            name='rating_recipe_user_idx',
+        ),
+    ]
@@ -2,7 +2,10 @@ from .user import *
 from .recipe import *
 from .comment import *
 from .rating import *
+from .tag import *
 from .dietary_tag import *
 from .cuisine_tag import *
 from .recipeIngredient import *
 from .favourite import *
+from .recipe_search import *
+from .timeline_entry import *
@@ -15,6 +15,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(
+                'recipe', models.F('timestamp').desc(), models.F('id').desc(),
+                name='comment_recipe_timestamp_idx'
+            ),
+        ]
 
     def __str__(self):
         """Return string representation of the comment."""
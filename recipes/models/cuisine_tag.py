@@ -1,14 +1,8 @@
-from django.db import models
+from .tag import Tag
 
 
-class CuisineTag(models.Model):
+class CuisineTag(Tag):
     """Model for cuisine type tags"""
 
-    name = models.CharField(max_length=255)
-
     class Meta:
         ordering = ['name']
-
-    def __str__(self):
-        """Return the tag name."""
-        return self.name
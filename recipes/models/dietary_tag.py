@@ -1,14 +1,8 @@
-from django.db import models
+from .tag import Tag
 
 
-class DietaryTag(models.Model):
+class DietaryTag(Tag):
     """Model for dietary requirement tags"""
 
-    name = models.CharField(max_length=255)
-
     class Meta:
         ordering = ['name']
-
-    def __str__(self):
-        """Return the tag name."""
-        return self.name
@@ -1,7 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
-from recipes.models.recipe import Recipe
+from recipes.models import upsert
+from recipes.models.recipe import RATING_TOTAL_FIELDS, Recipe
 
 User = get_user_model()
 
@@ -36,3 +37,56 @@ class Rating(models.Model):
     def __str__(self):
         """Return string representation of the rating."""
         return f"{self.user} rated '{self.recipe}' {self.rating}/5"
+
+    @classmethod
+    def rate(cls, user, recipe, rating):
+        """
+        Create or change a user's rating of a recipe in a single statement.
+
+        Returns:
+            upsert.CREATED or upsert.UPDATED, or None if the user had
+            already given the recipe this rating.
+        """
+        values = {'user_id': user.pk, 'recipe_id': recipe.pk, 'rating': int(rating)}
+        return upsert.insert(cls, values, ['user', 'recipe'], update_fields=['rating'])
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Load a rating and remember the recipe it was stored against."""
+        instance = super().from_db(db, field_names, values)
+        instance._stored_recipe_id = instance.__dict__.get('recipe_id')
+        return instance
+
+    def add_to_recipe_totals(self, created):
+        """
+        Apply this rating's create or update to its recipe's stored totals.
+
+        A new rating adds its score. A changed one has its recipe recounted
+        from the Rating table inside the write, since the score loaded
+        earlier may since have been changed by another request.
+        """
+        if created:
+            Recipe.adjust_rating_totals(self.recipe_id, int(self.rating), 1)
+        else:
+            self.recount_recipe_totals()
+        self._stored_recipe_id = self.recipe_id
+        self.refresh_cached_recipe()
+
+    def remove_from_recipe_totals(self):
+        """Recount the stored totals of the recipe this deleted rating belonged to."""
+        self.recount_recipe_totals()
+        self.refresh_cached_recipe()
+
+    def recount_recipe_totals(self):
+        """Recompute the totals of this rating's recipe, and of the one it was moved from."""
+        recipe_ids = {self.recipe_id, getattr(self, '_stored_recipe_id', None)} - {None}
+        Recipe.reconcile_rating_totals(Recipe.objects.filter(pk__in=recipe_ids))
+
+    def refresh_cached_recipe(self):
+        """Reload rating totals on a recipe instance already attached to this rating."""
+        if not Rating.recipe.is_cached(self):
+            return
+        try:
+            self.recipe.refresh_from_db(fields=RATING_TOTAL_FIELDS)
+        except Recipe.DoesNotExist:
+            pass
@@ -1,7 +1,12 @@
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
-from django.db.models import Avg
+from django.db.models import Case, Count, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.lookups import GreaterThan
+
+RATING_TOTAL_FIELDS = ('rating_sum', 'rating_count', 'rating_average')
+STORED_TOTAL_FIELDS = RATING_TOTAL_FIELDS + ('comment_count',)
 
 
 class Recipe(models.Model):
@@ -10,6 +15,11 @@ class Recipe(models.Model):
 
     Includes basic info (name, description, difficulty), instructions,
     an optional image, and relationships to tags and ingredients.
+
+    Rating totals are denormalized onto the recipe and kept in step with
+    the Rating table by signal receivers, so averages are column reads.
+    An unrated recipe stores an average of 0 so it sorts below any rating.
+    The number of comments is stored the same way.
     """
 
     DIFFICULTY_CHOICES = [
@@ -50,9 +60,27 @@ class Recipe(models.Model):
         related_name='recipes',
         blank=True
     )
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_average = models.FloatField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ['-publication_date']
+        indexes = [
+            models.Index(
+                fields=['rating_average', 'publication_date', 'id'],
+                name='recipe_rating_average_idx'
+            ),
+            models.Index(
+                fields=['publication_date', 'id'],
+                name='recipe_publication_idx'
+            ),
+            models.Index(
+                fields=['author', 'publication_date', 'id'],
+                name='recipe_author_published_idx'
+            ),
+        ]
 
     def __str__(self):
         return (
@@ -60,14 +88,83 @@ class Recipe(models.Model):
             f"difficulty: {self.difficulty}/5 description: {self.description}"
         )
 
+    def save(self, *args, **kwargs):
+        """Save the recipe without overwriting rating and comment totals held in the database."""
+        if not self._state.adding and 'update_fields' not in kwargs:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in STORED_TOTAL_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def average_rating(self):
         """
-        Calculate the average rating for this recipe.
+        Return the stored average rating for this recipe.
 
         Returns:
             Float rounded to 2 decimal places, or None if no ratings.
         """
-        average = self.ratings.aggregate(Avg('rating'))['rating__avg']
-        if average is None:
+        if not self.rating_count:
             return None
-        return round(average, 2)
+        return round(self.rating_average, 2)
+
+    @classmethod
+    def adjust_rating_totals(cls, recipe_id, score_delta, count_delta):
+        """Atomically shift one recipe's rating totals with a single UPDATE."""
+        rating_count = F('rating_count') + count_delta
+        cls.objects.filter(pk=recipe_id).update(
+            rating_sum=F('rating_sum') + score_delta,
+            rating_count=rating_count,
+            rating_average=Case(
+                When(
+                    GreaterThan(rating_count, 0),
+                    then=Cast(F('rating_sum') + score_delta, FloatField()) / rating_count
+                ),
+                default=Value(0.0),
+            ),
+        )
+
+    @classmethod
+    def adjust_comment_count(cls, recipe_id, delta):
+        """Atomically shift one recipe's stored comment count with a single UPDATE."""
+        cls.objects.filter(pk=recipe_id).update(comment_count=F('comment_count') + delta)
+
+    @classmethod
+    def reconcile_rating_totals(cls, recipes=None):
+        """
+        Recompute rating totals from the Rating table in one bulk UPDATE.
+
+        Args:
+            recipes: Optional queryset to limit which recipes are recomputed.
+
+        Returns:
+            Number of recipes updated.
+        """
+        from recipes.models.rating import Rating
+        ratings = Rating.objects.filter(recipe=OuterRef('pk')).order_by().values('recipe')
+        rating_sum = ratings.annotate(total=Sum('rating')).values('total')
+        rating_count = ratings.annotate(total=Count('id')).values('total')
+        average = Cast(Subquery(rating_sum), FloatField()) / Subquery(rating_count)
+        recipes = cls.objects.all() if recipes is None else recipes
+        return recipes.update(
+            rating_sum=Coalesce(Subquery(rating_sum), 0),
+            rating_count=Coalesce(Subquery(rating_count), 0),
+            rating_average=Coalesce(average, Value(0.0)),
+        )
+
+    @classmethod
+    def reconcile_comment_counts(cls, recipes=None):
+        """
+        Recompute stored comment counts from the Comment table in one bulk UPDATE.
+
+        Args:
+            recipes: Optional queryset to limit which recipes are recomputed.
+
+        Returns:
+            Number of recipes updated.
+        """
+        from recipes.models.comment import Comment
+        comments = Comment.objects.filter(recipe=OuterRef('pk')).order_by().values('recipe')
+        comment_count = comments.annotate(total=Count('id')).values('total')
+        recipes = cls.objects.all() if recipes is None else recipes
+        return recipes.update(comment_count=Coalesce(Subquery(comment_count), 0))
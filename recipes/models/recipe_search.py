@@ -0,0 +1,46 @@
+from django.db import models
+from django.db.models import Lookup
+from .recipe import Recipe
+
+
+class SearchDocumentField(models.TextField):
+    """The FTS5 hidden column named after its table, which MATCH searches across."""
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    """Full-text MATCH lookup against an FTS5 table."""
+
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        """Render ``<document column> MATCH <query>``."""
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class RecipeSearchEntry(models.Model):
+    """
+    Read-only view of one recipe's row in the SQLite FTS5 search index.
+
+    The virtual table is created by a migration and written to by
+    ``recipes.search``; this unmanaged model only exists so recipe querysets
+    can join to it, filter with ``search_entry__document__match`` and order
+    by its bm25 ``rank``.
+    """
+
+    recipe = models.OneToOneField(
+        Recipe,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_entry'
+    )
+    document = SearchDocumentField(db_column='recipes_recipe_search')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'recipes_recipe_search'
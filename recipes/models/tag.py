@@ -0,0 +1,34 @@
+from django.db import models
+
+
+def normalize_tag_name(name):
+    """Return the key a tag name is stored under: lower-cased, with runs of whitespace collapsed."""
+    return ' '.join(name.split()).lower()
+
+
+class Tag(models.Model):
+    """
+    Base model for tags, unique by name regardless of case.
+
+    Attributes:
+        name (str): Tag name as first entered.
+        key (str): Normalized name, unique among tags of the same model.
+    """
+
+    name = models.CharField(max_length=255)
+    key = models.CharField(max_length=255, unique=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        """Save the tag, storing the key of its current name."""
+        self.key = normalize_tag_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'key'}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        """Return the tag name."""
+        return self.name
@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from .recipe import Recipe
+
+User = get_user_model()
+
+
+class TimelineEntry(models.Model):
+    """
+    A recipe in a user's following timeline.
+
+    One row exists for every recipe by every author the user follows. Each
+    row copies its recipe's publication date, so a page of the timeline,
+    newest first, is a single range of the user/date index rather than a
+    sort of every followed recipe. Rows are written when an author publishes
+    or is followed and removed when they are unfollowed or the recipe is
+    deleted.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_entries')
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='timeline_entries')
+    publication_date = models.DateField()
+
+    class Meta:
+        unique_together = ('user', 'recipe')
+        indexes = [
+            models.Index(
+                fields=['user', '-publication_date', '-recipe'],
+                name='timeline_user_published_idx'
+            ),
+        ]
+
+    def __str__(self):
+        """Return string representation of the timeline entry."""
+        return f"{self.recipe.recipe_name} in {self.user.username}'s timeline"
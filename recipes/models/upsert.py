@@ -0,0 +1,136 @@
+"""
+Single-statement writes for rows keyed by a unique pair, such as a user's
+rating of a recipe.
+
+Reading a row and then writing it takes two round trips and races: two
+requests that both see no favourite both insert one, and the second fails
+on the unique constraint. Here each write is one ``INSERT ... ON CONFLICT``
+or ``DELETE ... RETURNING`` statement, and what it returns tells whether a
+row was created, updated or deleted. ``RETURNING`` needs SQLite 3.35 or
+later, which the ``recipes.sqlite`` system check makes sure of at startup.
+
+Raw statements send no model signals, so ``post_save`` and ``post_delete``
+are sent here for every row actually written, in the same transaction.
+The receivers that keep stored counts and caches in step therefore run
+exactly as they would for ``save()`` and ``delete()``. The instance sent
+for an updated row leaves its auto_now_add fields deferred, so reading one
+loads the stored value rather than the time of the update.
+"""
+from django.db import connection, transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+
+def insert(model, values, conflict_fields, update_fields=()):
+    """
+    Insert a row, or update the row it conflicts with, in one statement.
+
+    Args:
+        model: Model class to write to.
+        values: Dict of field name to value for the new row, giving
+            foreign keys by attname, e.g. ``user_id``.
+        conflict_fields: Names of the fields of the unique constraint.
+        update_fields: Names of the fields to overwrite on conflict. With
+            none, a conflicting row is left as it is. Updating needs an
+            auto_now_add field to tell an updated row from a new one.
+
+    Returns:
+        CREATED or UPDATED, or None if an existing row was left unchanged.
+    """
+    created_at = auto_now_add_values(model)
+    if update_fields and not created_at:
+        raise ValueError(f'{model.__name__} has no auto_now_add field to detect updates by.')
+    values = {**values, **created_at}
+    params = {name: model._meta.get_field(name).get_db_prep_save(value, connection) for name, value in values.items()}
+    columns = [quote_column(model, name) for name in values]
+    conflict_columns = [quote_column(model, name) for name in conflict_fields]
+    inserted = ' AND '.join(f'{quote_column(model, name)} = %s' for name in created_at) or '1'
+    sql = (
+        f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({", ".join(columns)}) '
+        f'VALUES ({", ".join(["%s"] * len(columns))}) '
+        f'ON CONFLICT ({", ".join(conflict_columns)}) {conflict_action(model, update_fields)} '
+        f'RETURNING {quote_column(model, "pk")}, {inserted}'
+    )
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*params.values(), *(params[name] for name in created_at)])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        created = bool(row[1])
+        written = values if created else {name: value for name, value in values.items() if name not in created_at}
+        post_save.send(
+            sender=model, instance=written_instance(model, row[0], written), created=created,
+            update_fields=None, raw=False, using=connection.alias,
+        )
+    return CREATED if created else UPDATED
+
+
+def delete(model, **filters):
+    """
+    Delete the row matching the given field values in one statement.
+
+    Foreign keys are given by attname, e.g. ``delete(Favourite, user_id=1, recipe_id=2)``.
+
+    Returns:
+        DELETED, or None if there was no such row.
+    """
+    conditions = ' AND '.join(f'{quote_column(model, name)} = %s' for name in filters)
+    params = [model._meta.get_field(name).get_db_prep_value(value, connection) for name, value in filters.items()]
+    sql = (
+        f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)} WHERE {conditions} '
+        f'RETURNING {quote_column(model, "pk")}'
+    )
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        post_delete.send(
+            sender=model, instance=model(pk=row[0], **filters), origin=model, using=connection.alias,
+        )
+    return DELETED
+
+
+def written_instance(model, pk, values):
+    """Build the instance of a written row from the values written, deferring every other field."""
+    values = {model._meta.get_field(name).attname: value for name, value in values.items()}
+    values[model._meta.pk.attname] = pk
+    field_names = [field.attname for field in model._meta.concrete_fields]
+    return model.from_db(connection.alias, field_names, [values.get(name, DEFERRED) for name in field_names])
+
+
+def conflict_action(model, update_fields):
+    """Build the ON CONFLICT action, updating only rows whose values would change."""
+    if not update_fields:
+        return 'DO NOTHING'
+    columns = [quote_column(model, name) for name in update_fields]
+    assignments = ', '.join(f'{column} = excluded.{column}' for column in columns)
+    changes = ' OR '.join(f'{column} IS NOT excluded.{column}' for column in columns)
+    return f'DO UPDATE SET {assignments} WHERE {changes}'
+
+
+def auto_now_add_values(model):
+    """
+    Return the current time for each of a model's auto_now_add fields.
+
+    The time is never overwritten on conflict, so an upserted row whose
+    timestamp comes back unchanged is one this statement inserted.
+    """
+    now = timezone.now()
+    return {
+        field.name: now for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    }
+
+
+def quote_column(model, name):
+    """Quote the column of a model field, accepting 'pk' and foreign key attnames."""
+    field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+    return connection.ops.quote_name(field.column)
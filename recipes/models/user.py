@@ -1,7 +1,21 @@
+from collections import namedtuple
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.db import models
-from libgravatar import Gravatar
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from libgravatar import md5_hash, sanitize_email
+from recipes.avatars import avatar_url
+from recipes.models import upsert
+
+COUNTER_FIELDS = ('follower_count', 'following_count', 'favourite_count', 'recipe_count')
+
+FollowRelations = namedtuple('FollowRelations', ['following', 'followed_by'])
+
+
+def hash_email(email):
+    """Return the Gravatar hash of an email address."""
+    return md5_hash(sanitize_email(email))
 
 
 class User(AbstractUser):
@@ -13,6 +27,13 @@ class User(AbstractUser):
     - Required first/last name and email
     - Follow/unfollow functionality
     - Favourite recipes functionality
+
+    The Gravatar hash of the email is stored in `email_hash` and only
+    recomputed when the email changes, so avatar URLs need no hashing.
+
+    Follower, following, favourite and recipe counts are denormalized onto
+    the user and kept in step by signal receivers, so profile headers are
+    column reads.
     """
 
     username = models.CharField(
@@ -27,23 +48,56 @@ class User(AbstractUser):
     first_name = models.CharField(max_length=50, blank=False)
     last_name = models.CharField(max_length=50, blank=False)
     email = models.EmailField(unique=True, blank=False)
+    email_hash = models.CharField(max_length=32, blank=True, editable=False, db_index=True)
+    follower_count = models.PositiveIntegerField(default=0, editable=False)
+    following_count = models.PositiveIntegerField(default=0, editable=False)
+    favourite_count = models.PositiveIntegerField(default=0, editable=False)
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+
+    _hashed_email = None
 
     class Meta:
         """Model options."""
 
         ordering = ['last_name', 'first_name']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember which email the loaded hash belongs to."""
+        user = super().from_db(db, field_names, values)
+        user._hashed_email = user.__dict__.get('email')
+        return user
+
+    def save(self, *args, **kwargs):
+        """
+        Save the user without overwriting the counts held in the database,
+        rehashing the email if it changed since it was last hashed.
+        """
+        if not self._state.adding and 'update_fields' not in kwargs:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTER_FIELDS
+            ]
+        email = self.__dict__.get('email')
+        update_fields = kwargs.get('update_fields')
+        email_saved = update_fields is None or 'email' in update_fields
+        if email is not None and email != self._hashed_email and email_saved:
+            self.email_hash = hash_email(email)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'email_hash'}
+        super().save(*args, **kwargs)
+        if email_saved:
+            self._hashed_email = email
+
     def full_name(self):
         """Return a string containing the user's full name."""
 
         return f'{self.first_name} {self.last_name}'
 
     def gravatar(self, size=120):
-        """Return a URL to the user's gravatar."""
+        """Return a URL to the user's avatar, from Gravatar or generated locally."""
 
-        gravatar_object = Gravatar(self.email)
-        gravatar_url = gravatar_object.get_image(size=size, default='mp')
-        return gravatar_url
+        return avatar_url(self.email_hash, size)
 
     def mini_gravatar(self):
         """Return a URL to a miniature version of the user's gravatar."""
@@ -51,18 +105,62 @@ class User(AbstractUser):
         return self.gravatar(size=60)
 
     def follow(self, user):
-        """Follow another user."""
-        if self != user:
-            Follow.objects.get_or_create(follower=self, following=user)
+        """
+        Follow another user in a single statement.
+
+        Returns:
+            upsert.CREATED, or None if already following or user is this user.
+        """
+        if self == user:
+            return None
+        result = upsert.insert(Follow, {'follower_id': self.pk, 'following_id': user.pk}, ['follower', 'following'])
+        if result:
+            self.following_count += 1
+            user.follower_count += 1
+        return result
 
     def unfollow(self, user):
-        """Unfollow another user."""
-        Follow.objects.filter(follower=self, following=user).delete()
+        """
+        Unfollow another user in a single statement.
+
+        Returns:
+            upsert.DELETED, or None if not following.
+        """
+        result = upsert.delete(Follow, follower_id=self.pk, following_id=user.pk)
+        if result:
+            self.following_count -= 1
+            user.follower_count -= 1
+        return result
 
     def is_following(self, user):
         """Check if the user is following another user."""
         return Follow.objects.filter(follower=self, following=user).exists()
 
+    def get_follow_relations(self, users):
+        """
+        Find which of the given users this user follows and which follow this user, in one query.
+
+        Args:
+            users: Iterable of User objects, e.g. a page of followers.
+
+        Returns:
+            FollowRelations whose `following` and `followed_by` are sets of
+            user ids. A user in both follows this user mutually.
+        """
+        user_ids = {user.pk for user in users}
+        relations = FollowRelations(following=set(), followed_by=set())
+        if not user_ids:
+            return relations
+        follows = Follow.objects.filter(
+            Q(follower=self, following_id__in=user_ids) | Q(following=self, follower_id__in=user_ids)
+        ).values_list('follower_id', 'following_id')
+        for follower_id, following_id in follows:
+            if follower_id == self.pk:
+                relations.following.add(following_id)
+            else:
+                relations.followed_by.add(follower_id)
+        return relations
+
     def get_followers(self):
         """Return queryset of users who follow this user."""
         return User.objects.filter(following__following=self)
@@ -73,21 +171,37 @@ class User(AbstractUser):
 
     def get_followers_count(self):
         """Get the number of followers this user has."""
-        return self.get_followers().count()
+        return self.follower_count
 
     def get_following_count(self):
         """Get the number of users this user is following."""
-        return self.get_following().count()
+        return self.following_count
 
     def favourite_recipe(self, recipe):
-        """Add a recipe to favourites."""
+        """
+        Add a recipe to favourites in a single statement.
+
+        Returns:
+            upsert.CREATED, or None if already a favourite.
+        """
         from recipes.models.favourite import Favourite
-        Favourite.objects.get_or_create(user=self, recipe=recipe)
+        result = upsert.insert(Favourite, {'user_id': self.pk, 'recipe_id': recipe.pk}, ['user', 'recipe'])
+        if result:
+            self.favourite_count += 1
+        return result
 
     def unfavourite_recipe(self, recipe):
-        """Remove a recipe from favourites."""
+        """
+        Remove a recipe from favourites in a single statement.
+
+        Returns:
+            upsert.DELETED, or None if not a favourite.
+        """
         from recipes.models.favourite import Favourite
-        Favourite.objects.filter(user=self, recipe=recipe).delete()
+        result = upsert.delete(Favourite, user_id=self.pk, recipe_id=recipe.pk)
+        if result:
+            self.favourite_count -= 1
+        return result
 
     def has_favourited(self, recipe):
         """Check if user has favourited a recipe."""
@@ -101,7 +215,35 @@ class User(AbstractUser):
 
     def get_favourites_count(self):
         """Get count of favourite recipes."""
-        return self.favourites.count()
+        return self.favourite_count
+
+    @classmethod
+    def adjust_counts(cls, user_id, **deltas):
+        """Atomically shift one user's stored counts, e.g. follower_count=1, with a single UPDATE."""
+        cls.objects.filter(pk=user_id).update(**{
+            field: F(field) + delta for field, delta in deltas.items()
+        })
+
+    @classmethod
+    def reconcile_counts(cls, users=None):
+        """
+        Recompute stored follower, following, favourite and recipe counts in one bulk UPDATE.
+
+        Args:
+            users: Optional queryset to limit which users are recomputed.
+
+        Returns:
+            Number of users updated.
+        """
+        from recipes.models.favourite import Favourite
+        from recipes.models.recipe import Recipe
+        users = cls.objects.all() if users is None else users
+        return users.update(
+            follower_count=count_per_user(Follow.objects.all(), 'following'),
+            following_count=count_per_user(Follow.objects.all(), 'follower'),
+            favourite_count=count_per_user(Favourite.objects.all(), 'user'),
+            recipe_count=count_per_user(Recipe.objects.all(), 'author'),
+        )
 
 
 class Follow(models.Model):
@@ -126,3 +268,8 @@ class Follow(models.Model):
         """Return a string representation of the follow relationship."""
         return f"{self.follower.username} follows {self.following.username}"
 
+
+def count_per_user(queryset, user_field):
+    """Build a subquery counting the rows of queryset whose user_field is the outer user."""
+    rows = queryset.filter(**{user_field: OuterRef('pk')}).order_by().values(user_field)
+    return Coalesce(Subquery(rows.annotate(total=Count('id')).values('total')), 0)
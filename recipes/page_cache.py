@@ -0,0 +1,110 @@
+"""
+Full-page cache for public pages viewed while logged out.
+
+Logged-out visitors all see the same page for the same query, so the
+rendered HTML is cached in the versioned cache and served without running
+the view. The key is the page's name and its recognised query parameters,
+sorted and with empty ones left out, so ``?sort=highest&q=`` and
+``?sort=highest`` share an entry. The entry is invalidated whenever one of
+the given versions is bumped.
+
+A response is only cached when nothing in it can differ between visitors:
+
+* the visitor is logged out, and the request is a GET or HEAD;
+* the query holds only recognised parameters, each once, since the page
+  echoes every parameter back in its links;
+* there are no messages waiting to be shown;
+* the response is a 200 that sets no cookies.
+
+Every response of a decorated view varies on ``Cookie``. Cacheable
+responses are marked public for ``max_age`` seconds. The rest are marked
+private, so shared caches never give a logged-in page to anyone else.
+
+Pages are only cached when the ``PAGE_CACHE`` setting is on and the default
+cache is shared between processes, as ``versioned_cache.is_shared`` checks.
+"""
+from functools import wraps
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from recipes import versioned_cache
+
+PAGE_TIMEOUT = 60 * 5
+PAGE_MAX_AGE = 60
+
+
+class UncacheableResponse(Exception):
+    """Raised from inside the cache to hand back a response that must not be stored."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def cache_anonymous_page(name, params, versions, timeout=PAGE_TIMEOUT, max_age=PAGE_MAX_AGE):
+    """
+    Decorator caching a view's page for logged-out visitors.
+
+    Args:
+        name: Name of the page, used in its cache keys and hit counts.
+        params: Names of the query parameters the page depends on.
+        versions: (entity, pk) pairs of the versioned_cache entities whose
+            changes invalidate the page.
+        timeout: Seconds to keep a cached page for.
+        max_age: Seconds browsers and shared caches may reuse a public page for.
+    """
+    def decorator(view_function):
+        @wraps(view_function)
+        def wrapper(request, *args, **kwargs):
+            key_parts = page_key_parts(name, request, params) if page_cache_enabled() else None
+            if key_parts is None:
+                return mark_private(view_function(request, *args, **kwargs))
+            try:
+                page = versioned_cache.cached(
+                    key_parts, versions, timeout,
+                    lambda: render_page(view_function, request, *args, **kwargs), stale=True,
+                )
+            except UncacheableResponse as uncacheable:
+                return mark_private(uncacheable.response)
+            return mark_public(HttpResponse(page['content'], content_type=page['content_type']), max_age)
+        return wrapper
+    return decorator
+
+
+def page_cache_enabled():
+    """Check whether pages are cached, which needs the setting on and a cache shared between processes."""
+    return getattr(settings, 'PAGE_CACHE', True) and versioned_cache.is_shared()
+
+
+def page_key_parts(name, request, params):
+    """Return the key parts of the cached page for a request, or None if it must not be cached."""
+    if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+        return None
+    if any(key not in params or len(request.GET.getlist(key)) > 1 for key in request.GET):
+        return None
+    if len(get_messages(request)):
+        return None
+    return (name, *sorted((key, value) for key, value in request.GET.items() if value))
+
+
+def render_page(view_function, request, *args, **kwargs):
+    """Render a page to cache, raising UncacheableResponse if the response is personal or an error."""
+    response = view_function(request, *args, **kwargs)
+    if response.status_code != 200 or response.cookies or response.streaming:
+        raise UncacheableResponse(response)
+    return {'content': response.content, 'content_type': response['Content-Type']}
+
+
+def mark_public(response, max_age):
+    """Let browsers and shared caches reuse a page for max_age seconds."""
+    patch_vary_headers(response, ('Cookie',))
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def mark_private(response):
+    """Keep shared caches from storing a page."""
+    patch_vary_headers(response, ('Cookie',))
+    patch_cache_control(response, private=True)
+    return response
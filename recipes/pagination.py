@@ -0,0 +1,246 @@
+"""
+Keyset (cursor) pagination for ordered recipe querysets.
+
+Instead of an offset, each page link carries an opaque cursor holding the
+ordering values of the last (or first) row shown, and the next page is the
+rows that sort strictly after it. Fetching a page therefore costs the same
+however deep it is, and no total count is ever run.
+
+The queryset's ``order_by`` is used as the key, so its last field must be
+unique (normally ``id``) to give every row a distinct position.
+"""
+import base64
+import binascii
+import datetime
+import json
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import F, Q
+from django.db.models.constants import LOOKUP_SEP
+
+NEXT = 'next'
+PREVIOUS = 'previous'
+
+
+def cursor_pagination_enabled():
+    """Check whether lists are paginated by cursor rather than page number."""
+    return getattr(settings, 'CURSOR_PAGINATION', False)
+
+
+def paginate(queryset, per_page, page_number=None, cursor=None):
+    """Return a page of queryset, by cursor if enabled and by page number otherwise."""
+    if cursor_pagination_enabled():
+        return CursorPaginator(queryset, per_page).get_page(cursor)
+    return Paginator(queryset, per_page).get_page(page_number)
+
+
+def freeze_page(page):
+    """
+    Reduce a page to plain data that can be cached.
+
+    Returns:
+        Dict of the ids of the rows on the page with either the page number,
+        total count and page size, or the cursors of the neighbouring pages.
+    """
+    frozen = {'ids': [row.pk for row in page.object_list]}
+    if getattr(page, 'is_cursor', False):
+        frozen.update(next_cursor=page.next_cursor, previous_cursor=page.previous_cursor)
+    else:
+        frozen.update(number=page.number, count=page.paginator.count, per_page=page.paginator.per_page)
+    return frozen
+
+
+def thaw_page(frozen, queryset):
+    """
+    Rebuild a page frozen by `freeze_page`, fetching its rows from queryset in one query.
+
+    Rows deleted since the page was frozen are left out. The paginator of a
+    numbered page counts a range, so it never runs a count query.
+    """
+    rows = queryset.in_bulk(frozen['ids'])
+    object_list = [rows[pk] for pk in frozen['ids'] if pk in rows]
+    if 'number' not in frozen:
+        return CursorPage(object_list, frozen['next_cursor'], frozen['previous_cursor'])
+    return Page(object_list, frozen['number'], Paginator(range(frozen['count']), frozen['per_page']))
+
+
+class CursorPage:
+    """
+    One page of a cursor-paginated queryset.
+
+    Mirrors the parts of Django's ``Page`` that templates use, but instead of
+    page numbers it exposes the cursors for the neighbouring pages.
+
+    Attributes:
+        object_list (list): The rows on this page.
+        next_cursor (str): Cursor for the following page, or None on the last page.
+        previous_cursor (str): Cursor for the preceding page, or None on the first page.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        """Check if there is a following page."""
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        """Check if there is a preceding page."""
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        """Check if there is any page besides this one."""
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Split an ordered queryset into pages addressed by opaque cursors."""
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = [parse_ordering(field) for field in queryset.query.order_by]
+        if not self.ordering:
+            raise ValueError('Cursor pagination needs an explicitly ordered queryset.')
+        self.fields = [resolve_field(queryset.model, path) for path, _ in self.ordering]
+
+    def get_page(self, cursor=None):
+        """Return the page a cursor points to, or the first page for a missing or invalid cursor."""
+        position = self.decode_cursor(cursor) if cursor else None
+        if position is None:
+            return self.first_page()
+        direction, values = position
+        if direction == PREVIOUS:
+            return self.page_before(values)
+        return self.page_after(values)
+
+    def first_page(self):
+        """Return the first page."""
+        rows = self.fetch(self.annotated(), self.per_page + 1)
+        return self.build_page(rows, has_before=False)
+
+    def page_after(self, values):
+        """Return the page of rows that sort after the given key."""
+        queryset = self.annotated().filter(self.keyset_filter(values, reverse=False))
+        rows = self.fetch(queryset, self.per_page + 1)
+        return self.build_page(rows, has_before=True)
+
+    def page_before(self, values):
+        """Return the page of rows that sort before the given key."""
+        queryset = self.annotated().filter(self.keyset_filter(values, reverse=True)).reverse()
+        rows = self.fetch(queryset, self.per_page + 1)
+        if not rows:
+            return self.first_page()
+        has_before = len(rows) > self.per_page
+        rows = list(reversed(rows[:self.per_page]))
+        return CursorPage(
+            rows,
+            self.encode_cursor(NEXT, rows[-1]),
+            self.encode_cursor(PREVIOUS, rows[0]) if has_before else None,
+        )
+
+    def build_page(self, rows, has_before):
+        """Build a page from rows fetched forwards, including one extra row if there is a next page."""
+        has_after = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return CursorPage(
+            rows,
+            self.encode_cursor(NEXT, rows[-1]) if rows and has_after else None,
+            self.encode_cursor(PREVIOUS, rows[0]) if rows and has_before else None,
+        )
+
+    def fetch(self, queryset, limit):
+        """Evaluate at most limit rows of queryset."""
+        return list(queryset[:limit])
+
+    def annotated(self):
+        """Annotate each row with its ordering values so cursors can be built from it."""
+        return self.queryset.annotate(**{
+            cursor_attribute(index): F(path) for index, (path, _) in enumerate(self.ordering)
+        })
+
+    def keyset_filter(self, values, reverse):
+        """
+        Build the filter for rows strictly after (or, if reverse, before) a key.
+
+        For an ordering (a, b, id) this is
+        a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z),
+        with each comparison flipped for descending fields.
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (path, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{path}__{lookup}': value})
+            equal &= Q(**{path: value})
+        return condition
+
+    def encode_cursor(self, direction, row):
+        """Encode the position of row as an opaque, URL-safe cursor."""
+        values = [
+            encode_value(getattr(row, cursor_attribute(index)))
+            for index in range(len(self.ordering))
+        ]
+        data = json.dumps([direction, values], separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Decode a cursor into (direction, ordering values), or None if it is invalid."""
+        try:
+            data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(data)
+            if direction not in (NEXT, PREVIOUS) or len(values) != len(self.fields):
+                return None
+            values = [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            return None
+        if None in values:
+            return None
+        return direction, values
+
+
+def parse_ordering(field):
+    """Split an order_by entry into (field path, descending)."""
+    if not isinstance(field, str) or field == '?':
+        raise ValueError('Cursor pagination needs a queryset ordered by field names.')
+    if field.startswith('-'):
+        return field[1:], True
+    return field, False
+
+
+def resolve_field(model, path):
+    """Return the model field a lookup path such as 'search_entry__rank' points to."""
+    field = None
+    for name in path.split(LOOKUP_SEP):
+        if field is not None:
+            model = field.related_model
+        field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+    if field is None:
+        raise FieldDoesNotExist(path)
+    return field
+
+
+def cursor_attribute(index):
+    """Name of the annotation holding the index-th ordering value."""
+    return f'cursor_value_{index}'
+
+
+def encode_value(value):
+    """Make an ordering value JSON serialisable without losing precision."""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
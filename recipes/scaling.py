@@ -0,0 +1,124 @@
+"""
+Servings scaling for recipe ingredient lists.
+
+A recipe's ingredients are held as an ``IngredientVector``: parallel tuples
+of names, amounts in the smallest unit of each unit family, and the family
+itself. Scaling multiplies the whole amount tuple by the servings in one
+pass, then expresses each amount in the largest unit of its family that
+keeps it at or above 1, so 1500 g is shown as 1.5 kg and 2000 ml as 2 L.
+Amounts are rounded to a tenth of the base unit whatever unit they are
+shown in, so 1050 ml becomes 1.05 L. Ounces have no larger unit among the
+ingredient units and are never converted, and neither is a unit missing
+from ``UNIT_FACTORS``, such as a blank one saved before units were
+checked: it is its own family, so its amount is scaled but keeps its unit.
+
+With a shared cache, each recipe's vector is cached under the recipe's
+version in ``recipes.versioned_cache``, so scaling a recipe needs no
+database query until the recipe or one of its ingredients changes.
+"""
+from recipes import versioned_cache
+from recipes.models import RecipeIngredient
+from recipes.versioned_cache import RECIPE
+
+VECTOR_TIMEOUT = 60 * 60 * 24
+
+UNIT_FACTORS = {
+    'g': ('mass', 1),
+    'kg': ('mass', 1000),
+    'ml': ('volume', 1),
+    'L': ('volume', 1000),
+    'oz': ('ounce', 1),
+}
+
+FAMILY_UNITS = {
+    family: sorted(
+        ((unit, factor) for unit, (unit_family, factor) in UNIT_FACTORS.items() if unit_family == family),
+        key=lambda unit_factor: unit_factor[1], reverse=True
+    )
+    for family, _ in UNIT_FACTORS.values()
+}
+
+
+class IngredientVector:
+    """
+    A recipe's ingredients as parallel tuples, normalized to base units.
+
+    Attributes:
+        names (tuple): Ingredient names, in recipe order.
+        amounts (tuple): Amounts for one serving in the base unit of each family.
+        families (tuple): Unit family of each ingredient.
+    """
+
+    def __init__(self, names, amounts, families):
+        self.names = tuple(names)
+        self.amounts = tuple(amounts)
+        self.families = tuple(families)
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a vector from (name, amount, units) rows."""
+        rows = list(rows)
+        factors = [unit_factor(units) for _, _, units in rows]
+        return cls(
+            [name for name, _, _ in rows],
+            [amount * factor for (_, amount, _), (_, factor) in zip(rows, factors)],
+            [family for family, _ in factors],
+        )
+
+    @classmethod
+    def from_ingredients(cls, ingredients):
+        """Build a vector from RecipeIngredient objects."""
+        return cls.from_rows((ingredient.name, ingredient.amount, ingredient.units) for ingredient in ingredients)
+
+
+def unit_factor(units):
+    """Return the (family, factor) of a unit, treating an unknown unit as a family of its own."""
+    return UNIT_FACTORS.get(units, (units, 1))
+
+
+def get_vector(recipe_id):
+    """Return a recipe's ingredient vector, cached until the recipe's version is bumped."""
+    return versioned_cache.cached(
+        ('recipe_vector', recipe_id), [(RECIPE, recipe_id)], VECTOR_TIMEOUT, lambda: load_vector(recipe_id),
+    )
+
+
+def load_vector(recipe_id):
+    """Load a recipe's ingredient vector from its rows, for `get_vector`."""
+    rows = (
+        RecipeIngredient.objects.filter(recipe_id=recipe_id)
+        .order_by('id')
+        .values_list('name', 'amount', 'units')
+    )
+    return IngredientVector.from_rows(rows)
+
+
+def scale(vector, servings):
+    """
+    Scale every ingredient in a vector to a number of servings.
+
+    Returns:
+        List of dicts with 'name', 'amount' and 'units' keys, with each
+        amount promoted to the largest sensible unit.
+    """
+    scaled = [amount * servings for amount in vector.amounts]
+    return [
+        dict(name=name, **promote(amount, family))
+        for name, amount, family in zip(vector.names, scaled, vector.families)
+    ]
+
+
+def promote(amount, family):
+    """Express a base-unit amount in the largest unit of its family that keeps it at least 1."""
+    for units, factor in FAMILY_UNITS.get(family, [(family, 1)]):
+        if amount >= factor or factor == 1:
+            return {'amount': round_amount(amount, factor), 'units': units}
+
+
+def round_amount(amount, factor):
+    """Convert a base-unit amount to a unit, rounded to a tenth of the base unit."""
+    amount = round(round(amount * 10) / 10 / factor, len(str(factor)))
+    return int(amount) if amount.is_integer() else amount
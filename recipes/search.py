@@ -0,0 +1,91 @@
+"""
+Full-text recipe search backed by an SQLite FTS5 virtual table.
+
+Each recipe has one row in the index (its rowid is the recipe id) holding
+the recipe name, description, ingredient names and author names. Signal
+receivers keep rows in step with saves and deletes; ``rebuild_index``
+recreates the whole table, e.g. after bulk inserts that bypass signals.
+"""
+import re
+from django.db import connection, transaction
+from recipes.models import Recipe, RecipeIngredient, RecipeSearchEntry, User
+
+SEARCH_TABLE = RecipeSearchEntry._meta.db_table
+
+INDEX_SQL = f"""
+    INSERT INTO {SEARCH_TABLE} (rowid, recipe_name, description, ingredients, author)
+    SELECT recipe.id, recipe.recipe_name, recipe.description,
+        COALESCE((
+            SELECT group_concat(ingredient.name, ' ')
+            FROM {RecipeIngredient._meta.db_table} AS ingredient
+            WHERE ingredient.recipe_id = recipe.id
+        ), ''),
+        COALESCE(author.username || ' ' || author.first_name || ' ' || author.last_name, '')
+    FROM {Recipe._meta.db_table} AS recipe
+    LEFT JOIN {User._meta.db_table} AS author ON author.id = recipe.author_id
+"""
+
+
+def is_available():
+    """Return True if the database supports the FTS5 search index."""
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """
+    Turn free text into an FTS5 query.
+
+    Every word becomes a quoted prefix term, and all terms must match
+    somewhere in the recipe, so "choc cak" finds "Chocolate Cake".
+
+    Returns:
+        The FTS5 query string, or None if the text has no searchable words.
+    """
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_recipes(recipes, text):
+    """Restrict a recipe queryset to recipes matching the search text."""
+    match_query = build_match_query(text)
+    if match_query is None:
+        return recipes.none()
+    return recipes.filter(search_entry__document__match=match_query)
+
+
+def index_recipe(recipe_id):
+    """Write the search row for one recipe, removing it if the recipe is gone."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [recipe_id])
+        cursor.execute(f'{INDEX_SQL} WHERE recipe.id = %s', [recipe_id])
+
+
+def index_author_recipes(user_id):
+    """Rewrite the search rows for every recipe by one author."""
+    recipe_ids = f'SELECT id FROM {Recipe._meta.db_table} WHERE author_id = %s'
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({recipe_ids})', [user_id])
+        cursor.execute(f'{INDEX_SQL} WHERE recipe.author_id = %s', [user_id])
+
+
+def remove_recipe(recipe_id):
+    """Delete the search row for one recipe."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [recipe_id])
+
+
+def rebuild_index():
+    """
+    Recreate every row of the search index from the current tables.
+
+    Returns:
+        Number of recipes indexed.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(INDEX_SQL)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT count(*) FROM {SEARCH_TABLE}')
+        return cursor.fetchone()[0]
@@ -0,0 +1,241 @@
+"""Signal receivers that keep denormalized data in step with the models."""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from recipes import search, timeline, versioned_cache
+from recipes.versioned_cache import CATALOGUE, RECIPE, TAGS, USER
+from recipes.models import (
+    Comment, CuisineTag, DietaryTag, Favourite, Follow, Rating, Recipe, RecipeIngredient, User
+)
+
+AUTHOR_NAME_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Rating)
+def rating_saved(sender, instance, created, raw=False, **kwargs):
+    """Add a new or changed rating to its recipe's stored totals."""
+    if not raw:
+        instance.add_to_recipe_totals(created)
+
+
+@receiver(post_delete, sender=Rating)
+def rating_deleted(sender, instance, **kwargs):
+    """Remove a deleted rating from its recipe's stored totals."""
+    instance.remove_from_recipe_totals()
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    """Count a new comment on its recipe."""
+    if created and not raw:
+        Recipe.adjust_comment_count(instance.recipe_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """Stop counting a deleted comment on its recipe."""
+    Recipe.adjust_comment_count(instance.recipe_id, -1)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, raw=False, **kwargs):
+    """Reindex a saved recipe for full-text search."""
+    if not raw and search.is_available():
+        search.index_recipe(instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_published(sender, instance, created, raw=False, **kwargs):
+    """Fan a new recipe out to the timelines of its author's followers."""
+    if created and not raw:
+        timeline.publish_recipe(instance.pk)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    """Drop a deleted recipe from the search index."""
+    if search.is_available():
+        search.remove_recipe(instance.pk)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def ingredient_changed(sender, instance, raw=False, **kwargs):
+    """Reindex the recipe whose ingredient list changed."""
+    if not raw and search.is_available():
+        search.index_recipe(instance.recipe_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Reindex an author's recipes when the names searched by change."""
+    if raw or created or not search.is_available():
+        return
+    if update_fields is not None and not AUTHOR_NAME_FIELDS & set(update_fields):
+        return
+    search.index_author_recipes(instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def follow_counted(sender, instance, created, raw=False, **kwargs):
+    """Count a new follow on both users."""
+    if created and not raw:
+        User.adjust_counts(instance.follower_id, following_count=1)
+        User.adjust_counts(instance.following_id, follower_count=1)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_uncounted(sender, instance, **kwargs):
+    """Stop counting a removed follow on both users."""
+    User.adjust_counts(instance.follower_id, following_count=-1)
+    User.adjust_counts(instance.following_id, follower_count=-1)
+
+
+@receiver(post_save, sender=Favourite)
+def favourite_counted(sender, instance, created, raw=False, **kwargs):
+    """Count a new favourite on its user."""
+    if created and not raw:
+        User.adjust_counts(instance.user_id, favourite_count=1)
+
+
+@receiver(post_delete, sender=Favourite)
+def favourite_uncounted(sender, instance, **kwargs):
+    """Stop counting a removed favourite on its user."""
+    User.adjust_counts(instance.user_id, favourite_count=-1)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_counted(sender, instance, created, raw=False, **kwargs):
+    """Count a new recipe on its author."""
+    if created and not raw:
+        User.adjust_counts(instance.author_id, recipe_count=1)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_uncounted(sender, instance, **kwargs):
+    """Stop counting a deleted recipe on its author."""
+    User.adjust_counts(instance.author_id, recipe_count=-1)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_redated(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Copy an existing recipe's publication date onto its timeline entries."""
+    if created or raw:
+        return
+    if update_fields is not None and 'publication_date' not in update_fields:
+        return
+    timeline.update_publication_date(instance.pk, instance.publication_date)
+
+
+@receiver(post_save, sender=Follow)
+def follow_started(sender, instance, created, raw=False, **kwargs):
+    """Backfill a new follower's timeline with the author's recipes."""
+    if created and not raw:
+        timeline.backfill(instance.follower_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_ended(sender, instance, **kwargs):
+    """Prune an unfollowed author's recipes from the follower's timeline."""
+    timeline.prune(instance.follower_id, instance.following_id)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def recipe_version_changed(sender, instance, **kwargs):
+    """Bump the versions of a saved or deleted recipe and of its author."""
+    versioned_cache.bump(RECIPE, instance.pk)
+    versioned_cache.bump(USER, instance.author_id)
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def rating_version_changed(sender, instance, **kwargs):
+    """Bump the versions of the recipe and the user a rating belongs to."""
+    versioned_cache.bump(RECIPE, instance.recipe_id)
+    versioned_cache.bump(USER, instance.user_id)
+
+
+@receiver(post_save, sender=Favourite)
+@receiver(post_delete, sender=Favourite)
+def favourite_version_changed(sender, instance, **kwargs):
+    """
+    Bump the version of the user a favourite belongs to.
+
+    Nothing cached for a recipe shows who favourited it, so its version
+    is left alone and its card stays cached.
+    """
+    versioned_cache.bump(USER, instance.user_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_version_changed(sender, instance, **kwargs):
+    """Bump the versions of a comment's recipe and author."""
+    versioned_cache.bump(RECIPE, instance.recipe_id)
+    versioned_cache.bump(USER, instance.author_id)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def ingredient_version_changed(sender, instance, **kwargs):
+    """Bump the version of the recipe whose ingredients changed."""
+    versioned_cache.bump(RECIPE, instance.recipe_id)
+
+
+@receiver(m2m_changed, sender=Recipe.cuisine_tags.through)
+@receiver(m2m_changed, sender=Recipe.dietary_tags.through)
+def recipe_tags_version_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Bump the versions of the recipes whose tags were added, removed or cleared."""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        versioned_cache.bump(RECIPE, instance.pk)
+    else:
+        for recipe_id in pk_set or ():
+            versioned_cache.bump(RECIPE, recipe_id)
+    versioned_cache.bump(CATALOGUE)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_version_changed(sender, instance, **kwargs):
+    """Bump the version of a saved or deleted user."""
+    versioned_cache.bump(USER, instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_version_changed(sender, instance, **kwargs):
+    """Bump the versions of both users of a follow."""
+    versioned_cache.bump(USER, instance.follower_id)
+    versioned_cache.bump(USER, instance.following_id)
+
+
+@receiver(post_save, sender=CuisineTag)
+@receiver(post_delete, sender=CuisineTag)
+@receiver(post_save, sender=DietaryTag)
+@receiver(post_delete, sender=DietaryTag)
+def tags_version_changed(sender, **kwargs):
+    """Bump the version of the tag set, reloading every process's tag name maps."""
+    versioned_cache.bump(TAGS)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def catalogue_version_changed(sender, **kwargs):
+    """Bump the catalogue version when a recipe, or what recipes are searched or sorted by, changes."""
+    versioned_cache.bump(CATALOGUE)
+
+
+@receiver(post_save, sender=User)
+def author_catalogue_version_changed(sender, instance, created, update_fields=None, **kwargs):
+    """Bump the catalogue version when an author's searchable names may have changed."""
+    if created:
+        return
+    if update_fields is not None and not AUTHOR_NAME_FIELDS & set(update_fields):
+        return
+    versioned_cache.bump(CATALOGUE)
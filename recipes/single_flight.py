@@ -0,0 +1,161 @@
+"""
+Single-flight recomputation of expired cache entries.
+
+When a popular entry expires, every request that misses it would otherwise
+recompute it at once. Here the first request to miss takes a lock named
+after the key and recomputes the value. The others do not compute it too:
+
+* With a stale value to hand, the last one computed for the same name
+  whatever the versions, they serve that straight away
+  (stale-while-revalidate).
+* Without one, they poll the cache until the lock holder stores the value.
+  If it has not appeared after ``WAIT_TIMEOUT`` seconds, for instance
+  because the holder died, they compute it themselves.
+
+Locks are taken with ``cache.add``, which is atomic in the locmem backend
+and so shared by every thread of a process. The file backend writes ``add``
+as a read then a write, so with it a lock is a file created with
+``O_EXCL`` in a ``locks`` directory next to the cache files. That is
+atomic across every process sharing the directory. A lock older than
+``LOCK_TIMEOUT`` seconds is taken to be abandoned and is broken.
+"""
+import hashlib
+import os
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+
+HIT = 'hit'
+MISS = 'miss'
+STALE = 'stale'
+COALESCED = 'coalesced'
+
+LOCK_TIMEOUT = 30
+WAIT_TIMEOUT = 10
+POLL_INTERVAL = 0.01
+LOCK_DIRECTORY = 'locks'
+
+MISSING = object()
+
+
+def fetch(key, compute, ttl, stale_key=None, stale_ttl=None):
+    """
+    Return the value stored under key, letting only one caller at a time compute it.
+
+    Args:
+        key: Cache key of the value.
+        compute: Function called with no arguments to compute the value.
+        ttl: Seconds to keep the value for, or None for no expiry.
+        stale_key: Cache key under which the last computed value is also
+            kept, to be served while another caller recomputes it. Without
+            one, callers wait for the value instead.
+        stale_ttl: Seconds to keep the value under stale_key for.
+
+    Returns:
+        Tuple of (value, outcome), where outcome is HIT if the value was
+        stored, MISS if this caller computed it, STALE if it is the stale
+        value, and COALESCED if another caller computed it meanwhile.
+    """
+    value = cache.get(key, MISSING)
+    if value is not MISSING:
+        return value, HIT
+    stale = cache.get(stale_key, MISSING) if stale_key else MISSING
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while True:
+        token = acquire(key)
+        if token is not None:
+            try:
+                value = cache.get(key, MISSING)
+                if value is not MISSING:
+                    return value, COALESCED
+                return store(key, compute(), ttl, stale_key, stale_ttl), MISS
+            finally:
+                release(key, token)
+        if stale is not MISSING:
+            return stale, STALE
+        if time.monotonic() >= deadline:
+            return store(key, compute(), ttl, stale_key, stale_ttl), MISS
+        time.sleep(POLL_INTERVAL)
+        value = cache.get(key, MISSING)
+        if value is not MISSING:
+            return value, COALESCED
+
+
+def store(key, value, ttl, stale_key, stale_ttl):
+    """Store a computed value under its key and its stale key."""
+    cache.set(key, value, ttl)
+    if stale_key:
+        cache.set(stale_key, value, stale_ttl)
+    return value
+
+
+def acquire(key):
+    """Take the lock of a key without waiting, returning its token, or None if it is held."""
+    token = uuid.uuid4().hex
+    if uses_file_locks():
+        return token if acquire_file_lock(lock_path(key), token) else None
+    return token if cache.add(lock_key(key), token, LOCK_TIMEOUT) else None
+
+
+def release(key, token):
+    """Give up a lock taken with the given token, leaving it alone if it was broken and retaken."""
+    if uses_file_locks():
+        release_file_lock(lock_path(key), token)
+    elif cache.get(lock_key(key)) == token:
+        cache.delete(lock_key(key))
+
+
+def uses_file_locks():
+    """Check whether the default cache is file based, and so locked with files."""
+    return isinstance(caches['default'], FileBasedCache)
+
+
+def lock_key(key):
+    """Cache key of the lock of a key."""
+    return f'single_flight:lock:{key}'
+
+
+def lock_path(key):
+    """Path of the lock file of a key, in the file cache's directory."""
+    name = hashlib.sha256(key.encode()).hexdigest()
+    return os.path.join(settings.CACHES['default']['LOCATION'], LOCK_DIRECTORY, f'{name}.lock')
+
+
+def acquire_file_lock(path, token):
+    """Create a lock file holding the token, breaking it first if it was abandoned."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for _ in range(2):
+        try:
+            handle = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if not break_abandoned_lock(path):
+                return False
+            continue
+        with os.fdopen(handle, 'w') as file:
+            file.write(token)
+        return True
+    return False
+
+
+def break_abandoned_lock(path):
+    """Remove a lock file older than LOCK_TIMEOUT, returning whether it was removed."""
+    try:
+        if time.time() - os.path.getmtime(path) < LOCK_TIMEOUT:
+            return False
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    return True
+
+
+def release_file_lock(path, token):
+    """Remove a lock file if it still holds the token."""
+    try:
+        with open(path) as file:
+            if file.read() != token:
+                return
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,90 @@
+"""
+Tuning for the SQLite database connections.
+
+SQLite's defaults suit a single process: a rollback journal that blocks
+readers while a write commits, an fsync on every commit, and a 2 MB page
+cache. Under concurrent ratings, comments and favourites this shows up as
+``database is locked`` errors and readers queued behind writers.
+
+Every new connection runs the ``PRAGMA`` statements in ``DEFAULT_PRAGMAS``,
+or in ``settings.SQLITE_PRAGMAS`` if a project sets it:
+
+* ``journal_mode = wal`` lets readers keep reading while one writer
+  appends to the write-ahead log. The mode is stored in the database file,
+  but setting it again is cheap.
+* ``synchronous = normal`` syncs at WAL checkpoints rather than on every
+  commit. A power cut can lose the last commits but never corrupts the
+  database.
+* ``mmap_size`` and ``cache_size`` let reads come from memory-mapped pages
+  and a larger page cache. A negative ``cache_size`` is in KiB.
+* ``busy_timeout`` is how long, in milliseconds, a connection waits for a
+  lock before giving up.
+
+The pragmas are set once per connection, so they pay off with persistent
+connections (``CONN_MAX_AGE``). In-memory databases, as used by the tests,
+have no journal file and keep ``journal_mode = memory``.
+
+The single-statement writes of ``recipes.models.upsert`` use
+``INSERT ... ON CONFLICT ... RETURNING``, which SQLite supports from 3.35.
+A system check reports an older library at startup, rather than at the
+first favourite, follow or rating.
+"""
+import sqlite3
+from django.conf import settings
+from django.core.checks import Error, register
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -32 * 1024,
+    'busy_timeout': 5000,
+}
+
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+
+def get_pragmas():
+    """Return the pragmas to run on every new connection, by name."""
+    return getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_PRAGMAS)
+
+
+def pragma_statements(pragmas):
+    """Build one ``PRAGMA name = value`` statement per pragma."""
+    statements = []
+    for name, value in pragmas.items():
+        if not name.isidentifier() or not str(value).lstrip('-').isalnum():
+            raise ValueError(f'Invalid SQLite pragma {name} = {value!r}.')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def apply_pragmas(connection, pragmas):
+    """Run the pragma statements on a DB-API connection."""
+    for statement in pragma_statements(pragmas):
+        connection.execute(statement)
+
+
+@register()
+def check_sqlite_version(app_configs, **kwargs):
+    """Report an error if a SQLite database is in use and the library is too old for ``RETURNING``."""
+    if sqlite3.sqlite_version_info >= MIN_SQLITE_VERSION:
+        return []
+    if not any(connection.vendor == 'sqlite' for connection in connections.all()):
+        return []
+    required = '.'.join(map(str, MIN_SQLITE_VERSION))
+    return [Error(
+        f'SQLite {sqlite3.sqlite_version} is installed, but {required} or later is required.',
+        hint='The upsert writes use INSERT ... ON CONFLICT ... RETURNING. Upgrade the SQLite library.',
+        id='recipes.E001',
+    )]
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    """Tune every new SQLite connection with the configured pragmas."""
+    if connection.vendor == 'sqlite':
+        apply_pragmas(connection.connection, get_pragmas())
@@ -0,0 +1,119 @@
+"""
+Cache of tag names to ids for cuisine and dietary tags.
+
+Filtering the welcome page and saving a recipe's tags both need to turn tag
+names into ids. Each process keeps one map per tag model, loaded with a
+single query and reused while the shared ``versioned_cache`` TAGS version
+it was loaded at is current. Signal receivers bump that version whenever a
+tag is saved or deleted, in any process sharing the cache, and so does
+``create_tags``, whose bulk insert sends no signals. Names are looked up by
+their normalized key, so "Italian" and " italian " resolve to the same tag.
+
+A name the map does not know may belong to a tag created since it was
+loaded, for instance by a process that does not share the cache, so such
+names are looked up in the database rather than taken to match nothing.
+
+A map loaded inside a transaction may hold rows that are later rolled back,
+so it is only trusted while that transaction is still open; once it ends
+the next lookup reloads the map.
+"""
+from django.db import connection
+from recipes import versioned_cache
+from recipes.models import CuisineTag, DietaryTag, normalize_tag_name
+from recipes.versioned_cache import TAGS
+
+
+class TagMap:
+    """
+    Snapshot of one tag model's names and ids.
+
+    Attributes:
+        version (int): TAGS version the snapshot was loaded at.
+        atomic_blocks (tuple): Transactions open when it was loaded.
+        ids_by_key (dict): Normalized tag name to the id of its tag.
+    """
+
+    def __init__(self, version, atomic_blocks, tags):
+        self.version = version
+        self.atomic_blocks = atomic_blocks
+        self.ids_by_key = dict(tags)
+
+    def is_current(self, version, atomic_blocks):
+        """Check the snapshot is at the given version and its transactions are still open."""
+        return self.version == version and atomic_blocks[:len(self.atomic_blocks)] == self.atomic_blocks
+
+
+class TagCache:
+    """Versioned, lazily loaded name to id map for one tag model."""
+
+    def __init__(self, model):
+        self.model = model
+        self._map = None
+
+    def invalidate(self):
+        """Bump the shared TAGS version so every process reloads its maps."""
+        versioned_cache.bump(TAGS)
+
+    def ids_matching(self, names):
+        """
+        Return the ids of tags whose name matches any of names, ignoring case.
+
+        Names missing from the map are looked up with a single query.
+        """
+        ids_by_key = self.get_map().ids_by_key
+        keys = {normalize_tag_name(name) for name in names} - {''}
+        unknown = keys - ids_by_key.keys()
+        ids = {ids_by_key[key] for key in keys - unknown}
+        if unknown:
+            ids.update(self.model.objects.filter(key__in=unknown).order_by().values_list('id', flat=True))
+        return ids
+
+    def ids_for_names(self, names):
+        """
+        Return the ids of the tags with the given names, ignoring case, in order.
+
+        Blank and repeated names are skipped. Missing tags are created with
+        a single bulk insert and their ids read back with a single query.
+        """
+        names_by_key = {}
+        for name in names:
+            names_by_key.setdefault(normalize_tag_name(name), name.strip())
+        names_by_key.pop('', None)
+        ids_by_key = self.get_map().ids_by_key
+        missing = {key: name for key, name in names_by_key.items() if key not in ids_by_key}
+        if missing:
+            ids_by_key = {**ids_by_key, **self.create_tags(missing)}
+        return [ids_by_key[key] for key in names_by_key]
+
+    def create_tags(self, names_by_key):
+        """
+        Bulk create tags from a dict of names by key and return their ids by key.
+
+        Keys another request has inserted in the meantime are left as they
+        are, so the ids are read back rather than taken from the insert.
+        """
+        tags = [self.model(name=name, key=key) for key, name in names_by_key.items()]
+        self.model.objects.bulk_create(tags, ignore_conflicts=True)
+        self.invalidate()
+        return dict(self.model.objects.filter(key__in=names_by_key).values_list('key', 'id'))
+
+    def get_map(self):
+        """Return the current map, reloading it if it is stale."""
+        version, = versioned_cache.get_versions([(TAGS, None)])
+        atomic_blocks = tuple(connection.atomic_blocks)
+        tag_map = self._map
+        if tag_map is None or not tag_map.is_current(version, atomic_blocks):
+            tags = self.model.objects.order_by().values_list('key', 'id')
+            tag_map = self._map = TagMap(version, atomic_blocks, tags)
+        return tag_map
+
+
+cuisine_tags = TagCache(CuisineTag)
+dietary_tags = TagCache(DietaryTag)
+
+TAG_CACHES = {CuisineTag: cuisine_tags, DietaryTag: dietary_tags}
+
+
+def for_model(model):
+    """Return the cache for the given tag model."""
+    return TAG_CACHES[model]
@@ -1,3 +1,6 @@
+import tempfile
+from django.conf import settings
+from django.test import override_settings
 from django.urls import reverse
 from with_asserts.mixin import AssertHTMLMixin
 
@@ -8,6 +11,16 @@ def reverse_with_next(url_name, next_url):
     return url
 
 
+def use_file_cache(test_case):
+    """Point the default cache at an empty file cache for the rest of a test, and return its directory."""
+    directory = tempfile.TemporaryDirectory()
+    test_case.addCleanup(directory.cleanup)
+    override = override_settings(CACHES={'default': {**settings.CACHE_BACKENDS['file'], 'LOCATION': directory.name}})
+    override.enable()
+    test_case.addCleanup(override.disable)
+    return directory.name
+
+
 class LogInTester:
     """Class support login in tests."""
  
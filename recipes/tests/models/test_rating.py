@@ -1,7 +1,7 @@
 from django.core.exceptions import ValidationError
 from django.db.utils import IntegrityError
 from django.test import TestCase
-from recipes.models import User, Recipe, Rating
+from recipes.models import User, Recipe, Rating, upsert
 
 
 class RatingModelTestCase(TestCase):
@@ -64,6 +64,82 @@ class RatingModelTestCase(TestCase):
         self.user.delete()
         self.assertFalse(Rating.objects.filter(pk=self.rating.pk).exists())
 
+    def test_creating_rating_updates_recipe_totals(self):
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.rating_sum, 4)
+        self.assertEqual(self.recipe.rating_count, 1)
+        self.assertEqual(self.recipe.rating_average, 4.0)
+
+    def test_updating_rating_updates_recipe_totals(self):
+        rating = Rating.objects.get(pk=self.rating.pk)
+        rating.rating = 2
+        rating.save()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.rating_sum, 2)
+        self.assertEqual(self.recipe.rating_count, 1)
+
+    def test_deleting_rating_updates_recipe_totals(self):
+        other_user = User.objects.get(username='@janedoe')
+        Rating.objects.create(recipe=self.recipe, user=other_user, rating=1)
+        self.rating.delete()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.rating_sum, 1)
+        self.assertEqual(self.recipe.rating_count, 1)
+        self.assertEqual(self.recipe.average_rating(), 1.0)
+
+    def test_deleting_rater_updates_recipe_totals(self):
+        other_user = User.objects.get(username='@janedoe')
+        Rating.objects.create(recipe=self.recipe, user=other_user, rating=1)
+        other_user.delete()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.rating_count, 1)
+        self.assertEqual(self.recipe.average_rating(), 4.0)
+
+    def test_concurrent_updates_from_stale_ratings_keep_totals_exact(self):
+        first = Rating.objects.get(pk=self.rating.pk)
+        second = Rating.objects.get(pk=self.rating.pk)
+        first.rating = 5
+        first.save()
+        second.rating = 2
+        second.save()
+        self.recipe.refresh_from_db()
+        self.assertEqual((self.recipe.rating_sum, self.recipe.rating_count), (2, 1))
+
+    def test_deleting_stale_rating_keeps_totals_exact(self):
+        stale = Rating.objects.get(pk=self.rating.pk)
+        Rating.rate(self.user, self.recipe, 1)
+        stale.delete()
+        self.recipe.refresh_from_db()
+        self.assertEqual((self.recipe.rating_sum, self.recipe.rating_count), (0, 0))
+
+    def test_moving_rating_recounts_both_recipes(self):
+        other_recipe = Recipe.objects.create(author=self.user, recipe_name='Pie', description='Flaky')
+        rating = Rating.objects.get(pk=self.rating.pk)
+        rating.recipe = other_recipe
+        rating.save()
+        self.recipe.refresh_from_db()
+        other_recipe.refresh_from_db()
+        self.assertEqual((self.recipe.rating_sum, self.recipe.rating_count), (0, 0))
+        self.assertEqual((other_recipe.rating_sum, other_recipe.rating_count), (4, 1))
+
+    def test_rate_creates_rating_in_one_statement(self):
+        other_user = User.objects.get(username='@janedoe')
+        self.assertEqual(Rating.rate(other_user, self.recipe, 2), upsert.CREATED)
+        self.assertEqual(Rating.objects.get(user=other_user, recipe=self.recipe).rating, 2)
+        self.recipe.refresh_from_db()
+        self.assertEqual((self.recipe.rating_sum, self.recipe.rating_count), (6, 2))
+
+    def test_rate_updates_existing_rating(self):
+        self.assertEqual(Rating.rate(self.user, self.recipe, 1), upsert.UPDATED)
+        self.assertEqual(Rating.objects.get(pk=self.rating.pk).rating, 1)
+        self.recipe.refresh_from_db()
+        self.assertEqual((self.recipe.rating_sum, self.recipe.rating_count), (1, 1))
+
+    def test_rate_with_same_rating_changes_nothing(self):
+        self.assertIsNone(Rating.rate(self.user, self.recipe, 4))
+        self.recipe.refresh_from_db()
+        self.assertEqual((self.recipe.rating_sum, self.recipe.rating_count), (4, 1))
+
     def test_str(self):
         expected = f"{self.user} rated '{self.recipe}' {self.rating.rating}/5"
         self.assertEqual(str(self.rating), expected)
@@ -1,6 +1,6 @@
 from django.core.exceptions import ValidationError
 from django.test import TestCase
-from recipes.models import Recipe, User, CuisineTag, DietaryTag, Rating
+from recipes.models import Comment, Recipe, User, CuisineTag, DietaryTag, Rating
 
 
 class RecipeTestCase(TestCase):
@@ -77,6 +77,53 @@ class RecipeTestCase(TestCase):
         Rating.objects.create(recipe=self.recipe, user=self.other_user, rating=5)
         self.assertEqual(self.recipe.average_rating(), 4.5)
 
+    def test_comment_count_follows_comments(self):
+        comment = Comment.objects.create(recipe=self.recipe, author=self.user, text='Lovely')
+        Comment.objects.create(recipe=self.recipe, author=self.other_user, text='Great')
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.comment_count, 2)
+        comment.delete()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.comment_count, 1)
+
+    def test_saving_recipe_keeps_comment_count(self):
+        stale_recipe = Recipe.objects.get(pk=self.recipe.pk)
+        Comment.objects.create(recipe=self.recipe, author=self.user, text='Lovely')
+        stale_recipe.save()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.comment_count, 1)
+
+    def test_reconcile_comment_counts(self):
+        Comment.objects.create(recipe=self.recipe, author=self.user, text='Lovely')
+        Recipe.objects.filter(pk=self.recipe.pk).update(comment_count=5)
+        self.assertEqual(Recipe.reconcile_comment_counts(), 1)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.comment_count, 1)
+
+    def test_average_rating_after_rating_deleted(self):
+        rating = Rating.objects.create(recipe=self.recipe, user=self.user, rating=4)
+        rating.delete()
+        self.assertIsNone(self.recipe.average_rating())
+
+    def test_saving_recipe_keeps_rating_totals(self):
+        stale_recipe = Recipe.objects.get(pk=self.recipe.pk)
+        Rating.objects.create(recipe=self.recipe, user=self.user, rating=4)
+        stale_recipe.recipe_name = 'Renamed Cake'
+        stale_recipe.save()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.recipe_name, 'Renamed Cake')
+        self.assertEqual(self.recipe.rating_count, 1)
+
+    def test_reconcile_rating_totals(self):
+        Rating.objects.create(recipe=self.recipe, user=self.user, rating=4)
+        Rating.objects.create(recipe=self.recipe, user=self.other_user, rating=5)
+        Recipe.objects.filter(pk=self.recipe.pk).update(rating_sum=0, rating_count=0, rating_average=0)
+        self.assertEqual(Recipe.reconcile_rating_totals(), 1)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.rating_sum, 9)
+        self.assertEqual(self.recipe.rating_count, 2)
+        self.assertEqual(self.recipe.average_rating(), 4.5)
+
     def assert_recipe_is_valid(self):
         try:
             self.recipe.full_clean()
@@ -1,5 +1,6 @@
+from django.db import IntegrityError
 from django.test import TestCase
-from recipes.models import CuisineTag, DietaryTag
+from recipes.models import CuisineTag, DietaryTag, normalize_tag_name
 
 
 class CuisineTagModelTestCase(TestCase):
@@ -19,6 +20,19 @@ class CuisineTagModelTestCase(TestCase):
         self.assertEqual(tags[1].name, 'Mexican')
         self.assertEqual(tags[2].name, 'Thai')
 
+    def test_key_is_normalized_name(self):
+        self.assertEqual(self.tag.key, 'italian')
+
+    def test_names_differing_only_in_case_are_not_unique(self):
+        with self.assertRaises(IntegrityError):
+            CuisineTag.objects.create(name=' ITALIAN')
+
+    def test_renaming_with_update_fields_updates_key(self):
+        self.tag.name = 'Tuscan'
+        self.tag.save(update_fields=['name'])
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.key, 'tuscan')
+
 
 class DietaryTagModelTestCase(TestCase):
     """Unit tests for the DietaryTag model."""
@@ -36,3 +50,13 @@ class DietaryTagModelTestCase(TestCase):
         self.assertEqual(tags[0].name, 'Gluten-Free')
         self.assertEqual(tags[1].name, 'Vegan')
         self.assertEqual(tags[2].name, 'Vegetarian')
+
+    def test_key_is_normalized_name(self):
+        self.assertEqual(self.tag.key, 'vegan')
+
+
+class NormalizeTagNameTestCase(TestCase):
+    """Unit tests for normalizing tag names into keys."""
+
+    def test_lower_cases_and_collapses_whitespace(self):
+        self.assertEqual(normalize_tag_name('  Gluten   FREE '), 'gluten free')
@@ -0,0 +1,116 @@
+"""Concurrency tests for the single-statement upsert layer."""
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle
+from threading import Barrier
+from django.db import OperationalError, connection
+from django.db.models.signals import post_save
+from django.test import TestCase, TransactionTestCase
+from recipes.models import Favourite, Follow, Rating, Recipe, User, upsert
+
+THREADS = 8
+ROUNDS = 25
+
+
+class UpsertConcurrencyTestCase(TransactionTestCase):
+    """Hammer the upsert layer from several threads, each with its own connection."""
+
+    fixtures = [
+        'recipes/tests/fixtures/default_user.json',
+        'recipes/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.recipe = Recipe.objects.create(author=self.other_user, recipe_name='Cake', description='Sweet')
+
+    def test_concurrent_favourites_create_one_row(self):
+        results = self._hammer(lambda: self.user.favourite_recipe(self.recipe))
+        self.assertEqual(results.count(upsert.CREATED), 1)
+        self.assertEqual(Favourite.objects.filter(user=self.user, recipe=self.recipe).count(), 1)
+        self.assertEqual(User.objects.get(pk=self.user.pk).favourite_count, 1)
+
+    def test_concurrent_follow_toggles_keep_counts_consistent(self):
+        def toggle():
+            return self.user.follow(self.other_user) or self.user.unfollow(self.other_user)
+
+        results = self._hammer(toggle)
+        following = Follow.objects.filter(follower=self.user, following=self.other_user).count()
+        self.assertEqual(results.count(upsert.CREATED) - results.count(upsert.DELETED), following)
+        self.assertEqual(User.objects.get(pk=self.user.pk).following_count, following)
+        self.assertEqual(User.objects.get(pk=self.other_user.pk).follower_count, following)
+
+    def test_concurrent_ratings_keep_totals_consistent(self):
+        scores = cycle(range(1, 6))
+        results = self._hammer(lambda: Rating.rate(self.user, self.recipe, next(scores)))
+        self.assertEqual(results.count(upsert.CREATED), 1)
+        rating = Rating.objects.get(user=self.user, recipe=self.recipe).rating
+        recipe = Recipe.objects.get(pk=self.recipe.pk)
+        self.assertEqual((recipe.rating_sum, recipe.rating_count), (rating, 1))
+
+    def _hammer(self, write):
+        """Run write ROUNDS times on each of THREADS threads started together, returning every result."""
+        barrier = Barrier(THREADS)
+        results = []
+
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(ROUNDS):
+                    results.append(retry_while_locked(write))
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(THREADS) as executor:
+            for future in [executor.submit(worker) for _ in range(THREADS)]:
+                future.result()
+        return results
+
+
+class UpsertSignalTestCase(TestCase):
+    """Tests for the instances the upsert layer sends to post_save receivers."""
+
+    fixtures = [
+        'recipes/tests/fixtures/default_user.json',
+        'recipes/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.recipe = Recipe.objects.create(author=self.user, recipe_name='Cake', description='Sweet')
+        self.instances = []
+        post_save.connect(self._saved, sender=Rating)
+        self.addCleanup(post_save.disconnect, self._saved, sender=Rating)
+
+    def test_updated_instance_has_the_stored_created_at(self):
+        Rating.rate(self.user, self.recipe, 4)
+        stored = Rating.objects.get(user=self.user, recipe=self.recipe)
+        Rating.rate(self.user, self.recipe, 2)
+        updated = self.instances[-1]
+        self.assertEqual((updated.pk, updated.rating), (stored.pk, 2))
+        self.assertEqual(updated.created_at, stored.created_at)
+
+    def test_created_instance_has_every_written_value(self):
+        Rating.rate(self.user, self.recipe, 4)
+        created = self.instances[-1]
+        stored = Rating.objects.get(user=self.user, recipe=self.recipe)
+        with self.assertNumQueries(0):
+            self.assertEqual((created.pk, created.rating, created.created_at), (stored.pk, 4, stored.created_at))
+
+    def _saved(self, sender, instance, **kwargs):
+        self.instances.append(instance)
+
+
+def retry_while_locked(write):
+    """
+    Run a write, retrying while another connection holds the database lock.
+
+    The in-memory test database locks whole tables rather than waiting for
+    them, so a busy table is retried here; any other error fails the test.
+    """
+    while True:
+        try:
+            return write()
+        except OperationalError as error:
+            if 'locked' not in str(error):
+                raise
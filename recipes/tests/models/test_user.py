@@ -1,7 +1,9 @@
 """Unit tests for the User model."""
+from io import StringIO
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.test import TestCase
-from recipes.models import User
+from recipes.models import Follow, Recipe, User, upsert
 
 class UserModelTestCase(TestCase):
     """Unit tests for the User model."""
@@ -143,6 +145,27 @@ class UserModelTestCase(TestCase):
         expected_gravatar_url = self._gravatar_url(size=60)
         self.assertEqual(actual_gravatar_url, expected_gravatar_url)
 
+    def test_email_hash_is_set_on_create(self):
+        user = User.objects.create_user(
+            username='@newuser', email=' New.User@Example.org', first_name='New', last_name='User'
+        )
+        self.assertEqual(user.email_hash, '5e92624186dd902eaf566189ac02182c')
+        user.refresh_from_db()
+        self.assertEqual(user.email_hash, '5e92624186dd902eaf566189ac02182c')
+
+    def test_email_change_recomputes_hash(self):
+        self.user.email = 'john.doe@example.org'
+        self.user.save(update_fields=['email'])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email_hash, 'a4bf5bbb9feaa2713d99a3b52ab80024')
+
+    def test_gravatar_does_not_hash_email(self):
+        User.objects.filter(pk=self.user.pk).update(email_hash='0' * 32)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertIn('0' * 32, user.gravatar())
+        user.save()
+        self.assertEqual(User.objects.get(pk=self.user.pk).email_hash, '0' * 32)
+
     def _gravatar_url(self, size):
         gravatar_url = f"{UserModelTestCase.GRAVATAR_URL}?size={size}&default=mp"
         return gravatar_url
@@ -170,9 +193,24 @@ class UserModelTestCase(TestCase):
         self.assertFalse(self.user.is_following(other_user))
 
     def test_user_cannot_follow_self(self):
-        self.user.follow(self.user)
+        self.assertIsNone(self.user.follow(self.user))
         self.assertFalse(self.user.is_following(self.user))
 
+    def test_follow_and_unfollow_report_what_changed(self):
+        other_user = User.objects.get(username='@janedoe')
+        self.assertEqual(self.user.follow(other_user), upsert.CREATED)
+        self.assertIsNone(self.user.follow(other_user))
+        self.assertEqual(self.user.unfollow(other_user), upsert.DELETED)
+        self.assertIsNone(self.user.unfollow(other_user))
+
+    def test_favourite_and_unfavourite_report_what_changed(self):
+        recipe = Recipe.objects.create(author=self.user, recipe_name='Cake', description='Sweet')
+        self.assertEqual(self.user.favourite_recipe(recipe), upsert.CREATED)
+        self.assertIsNone(self.user.favourite_recipe(recipe))
+        self.assertEqual(self.user.unfavourite_recipe(recipe), upsert.DELETED)
+        self.assertIsNone(self.user.unfavourite_recipe(recipe))
+        self._assert_counts(self.user, favourite_count=0)
+
     def test_get_followers(self):
         other_user = User.objects.get(username='@janedoe')
         other_user.follow(self.user)
@@ -201,4 +239,66 @@ class UserModelTestCase(TestCase):
         self.user.follow(other_user)
         follow = Follow.objects.get(follower=self.user, following=other_user)
         expected = f"{self.user.username} follows {other_user.username}"
-        self.assertEqual(str(follow), expected)
\ No newline at end of file
+        self.assertEqual(str(follow), expected)
+
+    def test_follow_counts_are_stored(self):
+        other_user = User.objects.get(username='@janedoe')
+        self.user.follow(other_user)
+        self.user.follow(other_user)
+        self._assert_counts(self.user, following_count=1, follower_count=0)
+        self._assert_counts(other_user, following_count=0, follower_count=1)
+        self.assertEqual((self.user.get_following_count(), other_user.get_followers_count()), (1, 1))
+        self.user.unfollow(other_user)
+        self._assert_counts(self.user, following_count=0, follower_count=0)
+        self._assert_counts(other_user, following_count=0, follower_count=0)
+
+    def test_recipe_and_favourite_counts_are_stored(self):
+        recipe = Recipe.objects.create(author=self.user, recipe_name='Cake', description='Sweet')
+        other_user = User.objects.get(username='@janedoe')
+        other_user.favourite_recipe(recipe)
+        self._assert_counts(self.user, recipe_count=1)
+        self._assert_counts(other_user, favourite_count=1)
+        self.assertEqual(other_user.get_favourites_count(), 1)
+        recipe.delete()
+        self._assert_counts(self.user, recipe_count=0)
+        self._assert_counts(other_user, favourite_count=0)
+
+    def test_saving_user_keeps_stored_counts(self):
+        stale_user = User.objects.get(pk=self.user.pk)
+        User.objects.get(username='@janedoe').follow(self.user)
+        stale_user.first_name = 'Johnny'
+        stale_user.save()
+        self.assertEqual(User.objects.get(pk=self.user.pk).follower_count, 1)
+
+    def test_reconcile_user_counts_command(self):
+        other_user = User.objects.get(username='@janedoe')
+        self.user.follow(other_user)
+        Recipe.objects.create(author=self.user, recipe_name='Cake', description='Sweet')
+        User.objects.update(follower_count=7, following_count=7, favourite_count=7, recipe_count=7)
+        out = StringIO()
+        call_command('reconcile_user_counts', stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'Reconciled counts for 4 users.')
+        self._assert_counts(self.user, follower_count=0, following_count=1, favourite_count=0, recipe_count=1)
+        self._assert_counts(other_user, follower_count=1, following_count=0, favourite_count=0, recipe_count=0)
+
+    def test_get_follow_relations(self):
+        jane = User.objects.get(username='@janedoe')
+        petra = User.objects.get(username='@petrapickles')
+        peter = User.objects.get(username='@peterpickles')
+        self.user.follow(jane)
+        jane.follow(self.user)
+        petra.follow(self.user)
+        self.user.follow(peter)
+        peter.follow(jane)
+        with self.assertNumQueries(1):
+            relations = self.user.get_follow_relations([jane, petra, peter])
+        self.assertEqual(relations.following, {jane.id, peter.id})
+        self.assertEqual(relations.followed_by, {jane.id, petra.id})
+
+    def test_get_follow_relations_of_no_users(self):
+        with self.assertNumQueries(0):
+            relations = self.user.get_follow_relations([])
+        self.assertEqual(relations, (set(), set()))
+
+    def _assert_counts(self, user, **counts):
+        self.assertEqual(User.objects.values(*counts).get(pk=user.pk), counts)
@@ -0,0 +1,81 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+from django.test import TestCase, override_settings
+from PIL import Image
+from recipes import avatars
+from recipes.models import User
+
+EMAIL_HASH = '363c1b0cd64dadffb867236a00e62986'
+
+
+class AvatarTestCase(TestCase):
+    """Test suite for locally generated avatars."""
+
+    fixtures = ['recipes/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, AVATAR_BACKEND='local')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.get(username='@johndoe')
+
+    def test_local_avatar_urls(self):
+        self.assertEqual(self.user.gravatar(), f'/avatars/{EMAIL_HASH}/120.png')
+        self.assertEqual(self.user.mini_gravatar(), f'/avatars/{EMAIL_HASH}/60.png')
+        self.assertEqual(self.user.gravatar(size=100), f'/avatars/{EMAIL_HASH}/120.png')
+
+    @override_settings(AVATAR_BACKEND='gravatar')
+    def test_gravatar_backend_urls(self):
+        self.assertEqual(
+            self.user.mini_gravatar(),
+            f'https://www.gravatar.com/avatar/{EMAIL_HASH}?size=60&default=mp'
+        )
+
+    def test_avatar_view_serves_png_with_long_cache_headers(self):
+        response = self.client.get(self.user.mini_gravatar())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertIn(f'max-age={avatars.AVATAR_MAX_AGE}', response['Cache-Control'])
+        image = Image.open(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(image.size, (60, 60))
+
+    def test_avatar_is_stored_and_reused(self):
+        self.client.get(self.user.gravatar()).close()
+        self.assertTrue(os.path.exists(avatars.avatar_path(EMAIL_HASH, 120)))
+        with mock.patch('recipes.avatars.draw_identicon') as draw_identicon:
+            self.client.get(self.user.gravatar()).close()
+        draw_identicon.assert_not_called()
+
+    def test_identicon_is_deterministic_and_symmetric(self):
+        image = avatars.draw_identicon(EMAIL_HASH, 120)
+        self.assertEqual(image.tobytes(), avatars.draw_identicon(EMAIL_HASH, 120).tobytes())
+        self.assertEqual(image.tobytes(), image.transpose(Image.Transpose.FLIP_LEFT_RIGHT).tobytes())
+        self.assertNotEqual(image.tobytes(), avatars.draw_identicon('f' * 32, 120).tobytes())
+
+    def test_unknown_hash_is_not_found_and_not_stored(self):
+        response = self.client.get(f'/avatars/{"0" * 32}/120.png')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(os.path.exists(avatars.avatar_path('0' * 32, 120)))
+
+    def test_stored_avatar_is_served_without_queries(self):
+        self.client.get(self.user.gravatar()).close()
+        with self.assertNumQueries(0):
+            self.client.get(self.user.gravatar()).close()
+
+    def test_user_without_email_hash_gets_default_avatar(self):
+        self.user.email_hash = ''
+        self.assertEqual(self.user.gravatar(), '/avatars/default/120.png')
+        response = self.client.get(self.user.mini_gravatar())
+        self.assertEqual(response.status_code, 200)
+        image = Image.open(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(image.size, (60, 60))
+
+    def test_unsupported_size_is_not_found(self):
+        response = self.client.get(f'/avatars/{EMAIL_HASH}/100.png')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get('/avatars/default/100.png').status_code, 404)
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipes import card_cache, versioned_cache
+from recipes.helpers import build_recipe_cards
+from recipes.models import Rating, Recipe, User
+from recipes.tests.helpers import use_file_cache
+
+
+class RecipeCardCacheTestCase(TestCase):
+    """Test suite for the recipe card fragment cache."""
+
+    fixtures = [
+        'recipes/tests/fixtures/default_user.json',
+        'recipes/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        use_file_cache(self)
+        versioned_cache.stats.reset()
+        self.author = User.objects.get(username='@johndoe')
+        self.viewer = User.objects.get(username='@janedoe')
+        self.recipe = Recipe.objects.create(
+            author=self.author, recipe_name='Chocolate Cake', description='Rich and sweet'
+        )
+
+    def test_first_render_misses_and_second_hits(self):
+        self._render()
+        self.assertEqual(self._counts(), (0, 1))
+        self._render()
+        self.assertEqual(self._counts(), (1, 1))
+
+    def test_saving_recipe_invalidates_card(self):
+        self._render()
+        self.recipe.recipe_name = 'Lemon Drizzle'
+        self.recipe.save()
+        self.assertIn('Lemon Drizzle', self._render())
+        self.assertEqual(self._counts()[1], 2)
+
+    def test_rating_change_invalidates_card(self):
+        self.assertIn('No ratings', self._render())
+        rating = Rating.objects.create(user=self.viewer, recipe=self.recipe, rating=4)
+        self.assertNotIn('No ratings', self._render())
+        rating.delete()
+        self.assertIn('No ratings', self._render())
+
+    def test_author_rename_invalidates_card(self):
+        self._render()
+        self.author.last_name = 'Smith'
+        self.author.save()
+        self.assertIn('John Smith', self._render())
+
+    def test_other_user_update_keeps_card(self):
+        self._render()
+        self.viewer.last_name = 'Smith'
+        self.viewer.save()
+        self._render()
+        self.assertEqual(self._counts()[0], 1)
+
+    def test_card_rendered_before_commit_is_not_served_after(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.recipe_name = 'Lemon Drizzle'
+            self.recipe.save()
+            self._render()
+        self._render()
+        self.assertEqual(self._counts(), (0, 2))
+
+    def test_owner_controls_are_not_cached(self):
+        self.client.login(username=self.author.username, password='Password123')
+        response = self.client.get(reverse('welcome'))
+        self.assertContains(response, f'deleteModal{self.recipe.id}')
+        self.client.login(username=self.viewer.username, password='Password123')
+        response = self.client.get(reverse('welcome'))
+        self.assertNotContains(response, f'deleteModal{self.recipe.id}')
+        self.assertEqual(self._counts()[0], 1)
+
+    def test_favourite_heart_is_not_cached(self):
+        self.client.login(username=self.viewer.username, password='Password123')
+        self.client.get(reverse('welcome'))
+        self.viewer.favourite_recipe(self.recipe)
+        response = self.client.get(reverse('welcome'))
+        self.assertContains(response, 'bi-heart-fill')
+        self.assertEqual(self._counts()[0], 1)
+
+    def test_cards_are_rendered_every_time_with_a_process_local_cache(self):
+        with override_settings(CACHES={'default': settings.CACHE_BACKENDS['locmem']}):
+            cache.clear()
+            self._render()
+            self.recipe.recipe_name = 'Lemon Drizzle'
+            self.recipe.save()
+            self.assertIn('Lemon Drizzle', self._render())
+        self.assertEqual(self._counts(), (0, 2))
+
+    def _counts(self):
+        return versioned_cache.stats.counts(card_cache.FRAGMENT_NAME)
+
+    def _render(self):
+        recipes = Recipe.objects.select_related('author').filter(id=self.recipe.id)
+        return build_recipe_cards(recipes, self.viewer)[0]['card_html']
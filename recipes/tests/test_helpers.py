@@ -1,6 +1,10 @@
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
 from django.test import TestCase
-from recipes.models import User, Recipe
-from recipes.helpers import build_recipe_list
+from django.test.utils import CaptureQueriesContext
+from recipes import scaling, search
+from recipes.models import User, Recipe, Rating, RecipeIngredient
+from recipes.helpers import build_recipe_cards, build_recipe_list, save_ingredients_to_recipe
 
 
 class BuildRecipeListTest(TestCase):
@@ -72,3 +76,145 @@ class BuildRecipeListTest(TestCase):
         self.assertFalse(result[1]['is_favourite'])
 
 
+
+class BuildRecipeCardsTest(TestCase):
+    """Test suite for build_recipe_cards helper function."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='@testuser',
+            email='test@example.com',
+            password='Password123',
+            first_name='Test',
+            last_name='User'
+        )
+        self.recipes = [
+            Recipe.objects.create(author=self.user, recipe_name=f'Recipe {i}', description='Description')
+            for i in range(3)
+        ]
+        self.user.favourite_recipe(self.recipes[1])
+        Rating.objects.create(user=self.user, recipe=self.recipes[2], rating=4)
+
+    def test_build_recipe_cards_uses_one_query_per_lookup(self):
+        with self.assertNumQueries(2):
+            build_recipe_cards(self.recipes, self.user)
+
+    def test_build_recipe_cards_marks_favourites(self):
+        result = build_recipe_cards(self.recipes, self.user)
+        self.assertEqual([card['is_favourite'] for card in result], [False, True, False])
+
+    def test_build_recipe_cards_prefills_existing_rating(self):
+        result = build_recipe_cards(self.recipes, self.user)
+        self.assertFalse(result[0]['rating_form'].is_bound)
+        self.assertEqual(result[2]['rating_form']['rating'].value(), 4)
+        self.assertEqual(result[2]['stars'], ['full'] * 4 + ['empty'])
+
+    def test_build_recipe_cards_for_anonymous_user_makes_no_queries(self):
+        with self.assertNumQueries(0):
+            result = build_recipe_cards(self.recipes, AnonymousUser())
+        self.assertFalse(any(card['is_favourite'] for card in result))
+        self.assertIsNone(result[0]['rating_form'])
+
+    def test_build_recipe_cards_with_empty_recipes(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(build_recipe_cards([], self.user), [])
+
+
+class SaveIngredientsToRecipeTest(TestCase):
+    """Tests for saving posted ingredients as a diff against the stored ones."""
+
+    fixtures = ['recipes/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.recipe = Recipe.objects.create(author=self.user, recipe_name='Pancakes', description='Fluffy')
+        self.flour = RecipeIngredient.objects.create(recipe=self.recipe, name='Flour', amount=200, units='g')
+        self.milk = RecipeIngredient.objects.create(recipe=self.recipe, name='Milk', amount=300, units='ml')
+
+    def test_unchanged_ingredients_keep_their_rows(self):
+        save_ingredients_to_recipe(self.recipe, [
+            {'id': str(self.flour.id), 'name': 'Flour', 'amount': '200', 'units': 'g'},
+            {'id': str(self.milk.id), 'name': 'Milk', 'amount': '300', 'units': 'ml'},
+        ])
+        self.assertEqual(self._stored(), [(self.flour.id, 'Flour', 200), (self.milk.id, 'Milk', 300)])
+
+    def test_unchanged_ingredients_write_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            save_ingredients_to_recipe(self.recipe, [
+                {'id': str(self.flour.id), 'name': 'Flour', 'amount': '200', 'units': 'g'},
+                {'id': str(self.milk.id), 'name': 'Milk', 'amount': '300', 'units': 'ml'},
+            ])
+        self.assertEqual(self._writes(queries), [])
+
+    def test_each_kind_of_change_is_one_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            save_ingredients_to_recipe(self.recipe, [
+                {'id': str(self.flour.id), 'name': 'Flour', 'amount': '250', 'units': 'g'},
+                {'id': '', 'name': 'Eggs', 'amount': '2', 'units': 'g'},
+                {'id': '', 'name': 'Sugar', 'amount': '50', 'units': 'g'},
+            ])
+        table = f'"{RecipeIngredient._meta.db_table}"'
+        writes = [sql.split()[0] for sql in self._writes(queries) if table in sql.split()[1:3]]
+        self.assertEqual(sorted(writes), ['DELETE', 'INSERT', 'UPDATE'])
+
+    def test_changed_ingredient_is_updated_in_place(self):
+        save_ingredients_to_recipe(self.recipe, [
+            {'id': str(self.flour.id), 'name': 'Flour', 'amount': '250', 'units': 'g'},
+            {'id': str(self.milk.id), 'name': 'Milk', 'amount': '300', 'units': 'ml'},
+        ])
+        self.assertEqual(self._stored(), [(self.flour.id, 'Flour', 250), (self.milk.id, 'Milk', 300)])
+
+    def test_missing_ingredient_is_deleted_and_new_one_created(self):
+        save_ingredients_to_recipe(self.recipe, [
+            {'id': str(self.flour.id), 'name': 'Flour', 'amount': '200', 'units': 'g'},
+            {'id': '', 'name': 'Eggs', 'amount': '2', 'units': 'g'},
+        ])
+        stored = self._stored()
+        self.assertEqual(stored[0], (self.flour.id, 'Flour', 200))
+        self.assertEqual(stored[1][1:], ('Eggs', 2))
+        self.assertFalse(RecipeIngredient.objects.filter(id=self.milk.id).exists())
+
+    def test_ids_of_other_recipes_are_not_updated(self):
+        other = Recipe.objects.create(author=self.user, recipe_name='Omelette', description='Quick')
+        save_ingredients_to_recipe(other, [
+            {'id': str(self.flour.id), 'name': 'Eggs', 'amount': '3', 'units': 'g'},
+        ])
+        self.flour.refresh_from_db()
+        self.assertEqual(self.flour.name, 'Flour')
+        self.assertEqual(RecipeIngredient.objects.get(recipe=other).name, 'Eggs')
+
+    def test_repeated_id_creates_a_second_ingredient(self):
+        save_ingredients_to_recipe(self.recipe, [
+            {'id': str(self.flour.id), 'name': 'Flour', 'amount': '200', 'units': 'g'},
+            {'id': str(self.flour.id), 'name': 'Sugar', 'amount': '50', 'units': 'g'},
+        ])
+        self.assertEqual([name for _, name, _ in self._stored()], ['Flour', 'Sugar'])
+
+    def test_empty_names_are_skipped(self):
+        save_ingredients_to_recipe(self.recipe, [{'name': '  ', 'amount': '1', 'units': 'g'}])
+        self.assertEqual(self._stored(), [])
+
+    def test_new_recipe_ingredients_are_inserted_together(self):
+        recipe = Recipe.objects.create(author=self.user, recipe_name='Toast', description='Crunchy')
+        ingredients = [{'name': name, 'amount': '1', 'units': 'g'} for name in ('Bread', 'Butter', 'Jam')]
+        save_ingredients_to_recipe(recipe, ingredients)
+        self.assertEqual(list(RecipeIngredient.objects.filter(recipe=recipe).values_list('name', flat=True)), ['Bread', 'Butter', 'Jam'])
+
+    def test_scaling_vector_is_refreshed(self):
+        scaling.get_vector(self.recipe.id)
+        save_ingredients_to_recipe(self.recipe, [
+            {'id': str(self.flour.id), 'name': 'Flour', 'amount': '500', 'units': 'g'},
+        ])
+        self.assertEqual(scaling.get_vector(self.recipe.id).amounts, (500,))
+
+    def test_search_index_is_refreshed(self):
+        save_ingredients_to_recipe(self.recipe, [
+            {'id': str(self.flour.id), 'name': 'Buckwheat', 'amount': '200', 'units': 'g'},
+        ])
+        self.assertEqual(list(search.search_recipes(Recipe.objects.all(), 'buckwheat')), [self.recipe])
+
+    def _writes(self, queries):
+        return [query['sql'] for query in queries if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+
+    def _stored(self):
+        return list(RecipeIngredient.objects.filter(recipe=self.recipe).values_list('id', 'name', 'amount'))
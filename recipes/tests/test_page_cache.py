@@ -0,0 +1,153 @@
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from recipes import versioned_cache
+from recipes.models import CuisineTag, Rating, Recipe, User
+from recipes.page_cache import cache_anonymous_page
+from recipes.tests.helpers import use_file_cache
+from recipes.versioned_cache import TAGS
+from recipes.views import welcome
+
+
+class AnonymousPageCacheTestCase(TestCase):
+    """Test suite for the full-page cache of the welcome page for logged-out visitors."""
+
+    fixtures = [
+        'recipes/tests/fixtures/default_user.json',
+        'recipes/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        use_file_cache(self)
+        versioned_cache.stats.reset()
+        self.user = User.objects.get(username='@johndoe')
+        self.rater = User.objects.get(username='@janedoe')
+        self.cake = Recipe.objects.create(author=self.user, recipe_name='Chocolate Cake', description='Sweet')
+        self.pasta = Recipe.objects.create(author=self.user, recipe_name='Tuna Pasta', description='Quick')
+        Rating.rate(self.rater, self.cake, 5)
+        self.url = reverse('welcome')
+
+    def test_repeat_visit_is_served_from_cache_without_queries(self):
+        first = self.client.get(self.url, {'sort': 'highest'})
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, {'sort': 'highest'})
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(versioned_cache.stats.counts('welcome'), (1, 1))
+
+    def test_cached_page_is_public_and_varies_on_cookie(self):
+        for _ in range(2):
+            response = self.client.get(self.url)
+            self.assertIn('public', response['Cache-Control'])
+            self.assertIn('max-age=60', response['Cache-Control'])
+            self.assertIn('Cookie', response['Vary'])
+
+    def test_parameter_order_and_empty_parameters_share_an_entry(self):
+        self.client.get(self.url + '?sort=highest&q=&cuisine_tags=')
+        self.client.get(self.url + '?q=&sort=highest')
+        self.assertEqual(versioned_cache.stats.counts('welcome'), (1, 1))
+
+    def test_each_page_and_filter_is_cached_separately(self):
+        self.client.get(self.url, {'sort': 'highest'})
+        self.client.get(self.url, {'sort': 'lowest'})
+        self.client.get(self.url, {'sort': 'highest', 'page': '2'})
+        self.assertEqual(versioned_cache.stats.counts('welcome'), (0, 3))
+
+    def test_unknown_or_repeated_parameters_are_not_cached(self):
+        response = self.client.get(self.url, {'utm_source': 'newsletter'})
+        self.assertIn('private', response['Cache-Control'])
+        self.client.get(self.url + '?sort=highest&sort=lowest')
+        self.assertEqual(versioned_cache.stats.counts('welcome'), (0, 0))
+
+    def test_rating_change_invalidates_page(self):
+        self.assertLess(self.client.get(self.url, {'sort': 'highest'}).content.find(b'Chocolate Cake'),
+                        self.client.get(self.url, {'sort': 'highest'}).content.find(b'Tuna Pasta'))
+        Rating.rate(self.rater, self.pasta, 5)
+        Rating.rate(self.user, self.pasta, 5)
+        Rating.rate(self.user, self.cake, 1)
+        content = self.client.get(self.url, {'sort': 'highest'}).content
+        self.assertLess(content.find(b'Tuna Pasta'), content.find(b'Chocolate Cake'))
+
+    def test_new_recipe_invalidates_page(self):
+        self.client.get(self.url)
+        Recipe.objects.create(author=self.user, recipe_name='Lemon Tart', description='Tangy')
+        self.assertContains(self.client.get(self.url), 'Lemon Tart')
+
+    def test_tag_change_invalidates_page(self):
+        self.client.get(self.url, {'cuisine_tags': 'italian'})
+        tag = CuisineTag.objects.create(name='Italian')
+        self.pasta.cuisine_tags.add(tag)
+        self.assertContains(self.client.get(self.url, {'cuisine_tags': 'italian'}), 'Tuna Pasta')
+        before = versioned_cache.get_versions([(TAGS, None)])
+        tag.name = 'Sicilian'
+        tag.save()
+        self.assertNotEqual(versioned_cache.get_versions([(TAGS, None)]), before)
+
+    def test_pages_are_not_cached_with_a_process_local_cache(self):
+        with override_settings(CACHES={'default': settings.CACHE_BACKENDS['locmem']}):
+            cache.clear()
+            for _ in range(2):
+                response = self.client.get(self.url)
+            self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(versioned_cache.stats.counts('welcome'), (0, 0))
+
+    @override_settings(PAGE_CACHE=False)
+    def test_pages_are_not_cached_when_disabled(self):
+        for _ in range(2):
+            response = self.client.get(self.url)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(versioned_cache.stats.counts('welcome'), (0, 0))
+
+    def test_logged_in_user_is_never_served_the_cached_page(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Welcome to Recipify, John Doe')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        self.assertEqual(versioned_cache.stats.counts('welcome'), (1, 1))
+
+    def test_logged_in_page_is_not_stored_for_visitors(self):
+        self.client.login(username=self.user.username, password='Password123')
+        self.client.get(self.url)
+        self.client.logout()
+        self.assertNotContains(self.client.get(self.url), 'John Doe</h2>')
+        self.assertEqual(versioned_cache.stats.counts('welcome'), (0, 1))
+
+    def test_page_with_pending_messages_is_not_cached(self):
+        request = self._anonymous_request(self.url)
+        messages.info(request, 'You have been logged out.')
+        response = welcome(request)
+        self.assertContains(response, 'You have been logged out.')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(versioned_cache.stats.counts('welcome'), (0, 0))
+
+    def test_error_and_cookie_setting_responses_are_not_stored(self):
+        @cache_anonymous_page('test_page', (), [(TAGS, None)])
+        def missing(request):
+            return HttpResponse('Missing', status=404)
+
+        @cache_anonymous_page('test_page', ('step',), [(TAGS, None)])
+        def personal(request):
+            response = HttpResponse('Hello')
+            response.set_cookie('visitor', 'one')
+            return response
+
+        request = self._anonymous_request('/')
+        self.assertEqual(missing(request).status_code, 404)
+        self.assertEqual(personal(request).cookies['visitor'].value, 'one')
+        self.assertEqual(missing(request).status_code, 404)
+        self.assertEqual(versioned_cache.stats.counts('test_page'), (0, 0))
+
+    def _anonymous_request(self, path):
+        request = RequestFactory().get(path)
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        request._messages = FallbackStorage(request)
+        return request
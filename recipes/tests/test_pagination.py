@@ -0,0 +1,135 @@
+from django.core.paginator import Page, Paginator
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipes import pagination
+from recipes.models import Recipe, User
+from recipes.pagination import CursorPaginator
+
+
+class CursorPaginatorTestCase(TestCase):
+    """Test suite for keyset (cursor) pagination."""
+
+    fixtures = ['recipes/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        for index in range(11):
+            Recipe.objects.create(author=self.user, recipe_name=f'Recipe {index}', description='Description')
+        Recipe.objects.filter(id__in=Recipe.objects.order_by('id').values('id')[:6]).update(
+            rating_average=F('id') % 3, rating_count=1
+        )
+
+    def test_walks_forward_through_every_row_once(self):
+        recipes = Recipe.objects.order_by('-publication_date', '-id')
+        pages = self._walk(CursorPaginator(recipes, 4))
+        self.assertEqual([len(page) for page in pages], [4, 4, 3])
+        self.assertEqual([recipe for page in pages for recipe in page], list(recipes))
+
+    def test_walks_rating_ordering_with_ties(self):
+        recipes = Recipe.objects.order_by('-rating_average', '-publication_date', '-id')
+        pages = self._walk(CursorPaginator(recipes, 3))
+        self.assertEqual([recipe for page in pages for recipe in page], list(recipes))
+
+    def test_walks_ascending_ordering(self):
+        recipes = Recipe.objects.order_by('rating_average', '-publication_date', '-id')
+        pages = self._walk(CursorPaginator(recipes, 5))
+        self.assertEqual([recipe for page in pages for recipe in page], list(recipes))
+
+    def test_previous_cursor_returns_preceding_page(self):
+        paginator = CursorPaginator(Recipe.objects.order_by('-publication_date', '-id'), 4)
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+        third = paginator.get_page(second.next_cursor)
+        self.assertEqual(list(paginator.get_page(third.previous_cursor)), list(second))
+        back_to_first = paginator.get_page(second.previous_cursor)
+        self.assertEqual(list(back_to_first), list(first))
+        self.assertFalse(back_to_first.has_previous())
+        self.assertTrue(back_to_first.has_next())
+
+    def test_first_and_last_pages_have_one_neighbour(self):
+        paginator = CursorPaginator(Recipe.objects.order_by('-publication_date', '-id'), 6)
+        first = paginator.get_page()
+        last = paginator.get_page(first.next_cursor)
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_other_pages())
+        self.assertFalse(last.has_next())
+        self.assertTrue(last.has_previous())
+
+    def test_page_is_one_query_without_count(self):
+        paginator = CursorPaginator(Recipe.objects.order_by('-publication_date', '-id'), 4)
+        cursor = paginator.get_page().next_cursor
+        with self.assertNumQueries(1) as queries:
+            list(paginator.get_page(cursor))
+        self.assertNotIn('COUNT', queries.captured_queries[0]['sql'])
+
+    def test_invalid_cursor_returns_first_page(self):
+        paginator = CursorPaginator(Recipe.objects.order_by('-publication_date', '-id'), 4)
+        first = list(paginator.get_page())
+        for cursor in ['not-a-cursor', 'W10', 'WyJuZXh0IixbIngiLCJ5Il1d', 'WyJuZXh0IixbbnVsbCwxXV0']:
+            self.assertEqual(list(paginator.get_page(cursor)), first)
+
+    def test_unordered_queryset_is_rejected(self):
+        with self.assertRaises(ValueError):
+            CursorPaginator(Recipe.objects.all(), 4)
+
+    def test_paginate_uses_page_numbers_by_default(self):
+        page = pagination.paginate(Recipe.objects.order_by('-publication_date', '-id'), 4, '2')
+        self.assertIsInstance(page, Page)
+        self.assertEqual(page.number, 2)
+
+    @override_settings(CURSOR_PAGINATION=True)
+    def test_paginate_uses_cursors_when_enabled(self):
+        page = pagination.paginate(Recipe.objects.order_by('-publication_date', '-id'), 4, '2')
+        self.assertTrue(page.is_cursor)
+        self.assertEqual(list(page), list(Recipe.objects.order_by('-publication_date', '-id')[:4]))
+
+    @override_settings(CURSOR_PAGINATION=True)
+    def test_welcome_page_links_to_next_cursor(self):
+        for index in range(3):
+            Recipe.objects.create(author=self.user, recipe_name=f'Extra {index}', description='Description')
+        response = self.client.get(reverse('welcome'), {'sort': 'highest'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), 12)
+        self.assertContains(response, f'?sort=highest&amp;cursor={page_obj.next_cursor}')
+        self.assertNotContains(response, 'Page 1 of')
+        response = self.client.get(reverse('welcome'), {'sort': 'highest', 'cursor': page_obj.next_cursor})
+        self.assertEqual(len(response.context['page_obj']), 2)
+        self.assertTrue(response.context['page_obj'].has_previous())
+
+    @override_settings(CURSOR_PAGINATION=True)
+    def test_profile_page_recipes_tab_uses_its_own_cursor(self):
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(reverse('profile_page'), {'tab': 'recipes'})
+        page_obj = response.context['recipes_page_obj']
+        self.assertContains(response, f'?tab=recipes&recipes_cursor={page_obj.next_cursor}#recipes')
+        response = self.client.get(reverse('profile_page'), {'tab': 'recipes', 'recipes_cursor': page_obj.next_cursor})
+        self.assertEqual(len(response.context['recipes_page_obj']), 5)
+
+    def test_frozen_numbered_page_thaws_without_count_query(self):
+        page = Paginator(Recipe.objects.order_by('-publication_date', '-id'), 4).get_page(2)
+        frozen = pagination.freeze_page(page)
+        with self.assertNumQueries(1):
+            thawed = pagination.thaw_page(frozen, Recipe.objects.all())
+            self.assertEqual((thawed.number, thawed.paginator.count, thawed.paginator.num_pages), (2, 11, 3))
+        self.assertEqual(list(thawed), list(page))
+        self.assertTrue(thawed.has_next() and thawed.has_previous())
+
+    def test_frozen_cursor_page_keeps_its_cursors(self):
+        page = CursorPaginator(Recipe.objects.order_by('-publication_date', '-id'), 4).get_page()
+        thawed = pagination.thaw_page(pagination.freeze_page(page), Recipe.objects.all())
+        self.assertEqual(list(thawed), list(page))
+        self.assertEqual(thawed.next_cursor, page.next_cursor)
+        self.assertFalse(thawed.has_previous())
+
+    def test_thawed_page_leaves_out_deleted_rows(self):
+        page = Paginator(Recipe.objects.order_by('-publication_date', '-id'), 4).get_page(1)
+        frozen = pagination.freeze_page(page)
+        page[1].delete()
+        self.assertEqual(list(pagination.thaw_page(frozen, Recipe.objects.all())), [page[0], page[2], page[3]])
+
+    def _walk(self, paginator):
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return pages
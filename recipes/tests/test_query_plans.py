@@ -0,0 +1,106 @@
+import re
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipes.models import Comment, CuisineTag, Follow, Rating, Recipe, User
+from recipes.views.profile_page_view import get_favourite_recipes
+from recipes.views.recipe_view import get_viewer_ratings
+from recipes.views.welcome_view import sort_recipes
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+class QueryPlanTestCase(TestCase):
+    """Check with EXPLAIN QUERY PLAN that the hot read paths never scan a whole table."""
+
+    fixtures = [
+        'recipes/tests/fixtures/default_user.json',
+        'recipes/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.author = User.objects.get(username='@janedoe')
+        self.recipe = Recipe.objects.create(author=self.author, recipe_name='Cake', description='Sweet')
+        self.recipe.cuisine_tags.add(CuisineTag.objects.create(name='Italian'))
+        Comment.objects.create(recipe=self.recipe, author=self.user, text='Lovely')
+        Rating.rate(self.user, self.recipe, 4)
+        self.user.favourite_recipe(self.recipe)
+        self.user.follow(self.author)
+        self.author.follow(self.user)
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_welcome_page_queries_use_indexes(self):
+        for query in ['', '?sort=highest', '?sort=lowest', '?filter=following', '?cuisine_tags=italian', '?q=cake']:
+            with self.subTest(query=query):
+                self.assert_no_full_scans(reverse('welcome') + query)
+
+    def test_recipe_page_queries_use_indexes(self):
+        self.assert_no_full_scans(reverse('recipe', kwargs={'recipe_id': self.recipe.id}))
+        self.assert_no_full_scans(reverse('recipe_comments', kwargs={'recipe_id': self.recipe.id}))
+
+    def test_profile_page_queries_use_indexes(self):
+        for tab in ['account', 'recipes', 'favourites', 'followers', 'following']:
+            with self.subTest(tab=tab):
+                self.assert_no_full_scans(f"{reverse('profile_page')}?tab={tab}")
+
+    def test_other_user_profile_queries_use_indexes(self):
+        self.assert_no_full_scans(reverse('user_profile', kwargs={'user_id': self.author.id}))
+
+    def test_author_recipes_use_author_index(self):
+        recipes = Recipe.objects.filter(author=self.author).order_by('-publication_date', '-id')
+        self.assertIn('USING INDEX recipe_author_published_idx', recipes.explain())
+        self.assertNotIn('TEMP B-TREE', recipes.explain())
+
+    def test_comment_page_uses_recipe_timestamp_index(self):
+        comments = Comment.objects.filter(recipe=self.recipe).order_by('-timestamp', '-id')
+        self.assertIn('USING INDEX comment_recipe_timestamp_idx', comments.explain())
+        self.assertNotIn('TEMP B-TREE', comments.explain())
+
+    def test_rating_sorts_read_the_rating_average_index_in_order(self):
+        for sort in ('highest', 'lowest'):
+            with self.subTest(sort=sort):
+                recipes = sort_recipes(Recipe.objects.select_related('author'), sort)
+                self.assertIn('USING INDEX recipe_rating_average_idx', recipes.explain())
+                self.assertNotIn('TEMP B-TREE', recipes.explain())
+
+    def test_favourites_tab_searches_favourites_by_user(self):
+        favourites = get_favourite_recipes(self.user)
+        self.assertIn('SEARCH recipes_favourite USING COVERING INDEX', favourites.explain())
+
+    def test_viewer_rating_searches_by_user_and_recipe(self):
+        ratings = get_viewer_ratings(self.user).filter(recipe=self.recipe)
+        self.assertIn('SEARCH recipes_rating USING INDEX', ratings.explain())
+
+    def test_follower_lists_search_by_user(self):
+        followers = Follow.objects.filter(following=self.user).order_by('-id')
+        following = Follow.objects.filter(follower=self.user).order_by('-id')
+        for follows in (followers, following):
+            self.assertIn('SEARCH recipes_follow USING', follows.explain())
+            self.assertNotIn('TEMP B-TREE', follows.explain())
+
+    def test_full_scan_is_detected(self):
+        sql = str(Recipe.objects.filter(difficulty=3).order_by().query)
+        self.assertIn('SCAN recipes_recipe', [line for line in query_plan(sql) if FULL_SCAN.match(line)])
+
+    def assert_no_full_scans(self, url):
+        """Request a page and fail if the plan of any SELECT it ran scans a whole table."""
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        tables = set(connection.introspection.table_names())
+        for query in queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            scanned = [
+                match.group(1) for match in map(FULL_SCAN.match, query_plan(query['sql']))
+                if match and match.group(1) in tables
+            ]
+            self.assertEqual(scanned, [], f"{url} scans {scanned}: {query['sql']}")
+
+
+def query_plan(sql):
+    """Return the detail line of each step in SQLite's plan for a statement."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
@@ -0,0 +1,73 @@
+from django.test import TestCase
+from recipes import scaling, versioned_cache
+from recipes.models import Recipe, RecipeIngredient, User
+from recipes.tests.helpers import use_file_cache
+from recipes.versioned_cache import RECIPE
+
+
+class ScalingTestCase(TestCase):
+    """Test suite for servings scaling and unit promotion."""
+
+    fixtures = ['recipes/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        use_file_cache(self)
+        self.user = User.objects.get(username='@johndoe')
+        self.recipe = Recipe.objects.create(author=self.user, recipe_name='Bread', description='Crusty')
+        self.flour = RecipeIngredient.objects.create(recipe=self.recipe, name='Flour', amount=500, units='g')
+        RecipeIngredient.objects.create(recipe=self.recipe, name='Water', amount=350, units='ml')
+        RecipeIngredient.objects.create(recipe=self.recipe, name='Butter', amount=2, units='oz')
+
+    def test_scale_multiplies_every_ingredient(self):
+        scaled = scaling.scale(scaling.get_vector(self.recipe.id), 1)
+        self.assertEqual(scaled, [
+            {'name': 'Flour', 'amount': 500, 'units': 'g'},
+            {'name': 'Water', 'amount': 350, 'units': 'ml'},
+            {'name': 'Butter', 'amount': 2, 'units': 'oz'},
+        ])
+
+    def test_scale_promotes_to_larger_units(self):
+        scaled = scaling.scale(scaling.get_vector(self.recipe.id), 3)
+        self.assertEqual(
+            [(item['amount'], item['units']) for item in scaled],
+            [(1.5, 'kg'), (1.05, 'L'), (6, 'oz')]
+        )
+
+    def test_larger_units_are_kept_when_scaled(self):
+        vector = scaling.IngredientVector.from_rows([('Stock', 2, 'L'), ('Potatoes', 1, 'kg')])
+        self.assertEqual(
+            [(item['amount'], item['units']) for item in scaling.scale(vector, 2)],
+            [(4, 'L'), (2, 'kg')]
+        )
+
+    def test_unknown_units_are_scaled_but_not_converted(self):
+        vector = scaling.IngredientVector.from_rows([('Eggs', 2, 'pcs'), ('Salt', 1, ''), ('Milk', 600, 'ml')])
+        self.assertEqual(scaling.scale(vector, 2), [
+            {'name': 'Eggs', 'amount': 4, 'units': 'pcs'},
+            {'name': 'Salt', 'amount': 2, 'units': ''},
+            {'name': 'Milk', 'amount': 1.2, 'units': 'L'},
+        ])
+
+    def test_vector_is_cached(self):
+        scaling.get_vector(self.recipe.id)
+        with self.assertNumQueries(0):
+            vector = scaling.get_vector(self.recipe.id)
+        self.assertEqual(len(vector), 3)
+
+    def test_ingredient_change_invalidates_vector(self):
+        scaling.get_vector(self.recipe.id)
+        self.flour.amount = 250
+        self.flour.save()
+        self.assertEqual(scaling.scale(scaling.get_vector(self.recipe.id), 1)[0]['amount'], 250)
+        self.flour.delete()
+        self.assertEqual(len(scaling.get_vector(self.recipe.id)), 2)
+
+    def test_recipe_version_bump_invalidates_vector(self):
+        scaling.get_vector(self.recipe.id)
+        RecipeIngredient.objects.filter(pk=self.flour.pk).update(amount=250)
+        versioned_cache.bump(RECIPE, self.recipe.id)
+        self.assertEqual(scaling.get_vector(self.recipe.id).amounts[0], 250)
+
+    def test_every_unit_choice_has_a_factor(self):
+        for units, _ in RecipeIngredient.UNIT_CHOICES:
+            self.assertIn(units, scaling.UNIT_FACTORS)
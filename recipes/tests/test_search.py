@@ -0,0 +1,70 @@
+from django.test import TestCase
+from recipes import search
+from recipes.models import Recipe, RecipeIngredient, User
+
+
+class RecipeSearchTestCase(TestCase):
+    """Test suite for the full-text recipe search index."""
+
+    fixtures = ['recipes/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.cake = Recipe.objects.create(
+            author=self.user, recipe_name='Chocolate Cake', description='Rich and sweet'
+        )
+        self.pasta = Recipe.objects.create(
+            author=self.user, recipe_name='Tomato Pasta', description='Quick dinner with chocolate notes'
+        )
+        RecipeIngredient.objects.create(recipe=self.pasta, name='basil', amount=5, units='g')
+
+    def test_build_match_query_quotes_prefix_terms(self):
+        self.assertEqual(search.build_match_query('choc cake'), '"choc"* "cake"*')
+
+    def test_build_match_query_ignores_punctuation(self):
+        self.assertEqual(search.build_match_query('"pasta" OR @john'), '"pasta"* "OR"* "john"*')
+        self.assertIsNone(search.build_match_query('@!?'))
+
+    def test_search_matches_prefix_of_recipe_name(self):
+        self.assertEqual(self._search('choc cak'), [self.cake])
+
+    def test_search_matches_ingredient(self):
+        self.assertEqual(self._search('basil'), [self.pasta])
+
+    def test_search_matches_author_names(self):
+        self.assertEqual(set(self._search('john doe')), {self.cake, self.pasta})
+
+    def test_search_ranks_name_matches_above_description_matches(self):
+        self.assertEqual(self._search('chocolate'), [self.cake, self.pasta])
+
+    def test_search_without_words_returns_nothing(self):
+        self.assertEqual(self._search('@@@'), [])
+
+    def test_renamed_recipe_is_reindexed(self):
+        self.cake.recipe_name = 'Lemon Drizzle'
+        self.cake.save()
+        self.assertEqual(self._search('lemon'), [self.cake])
+        self.assertNotIn(self.cake, self._search('cake'))
+
+    def test_deleted_ingredient_is_removed_from_index(self):
+        self.pasta.recipeingredient_set.all().delete()
+        self.assertEqual(self._search('basil'), [])
+
+    def test_deleted_recipe_is_removed_from_index(self):
+        self.cake.delete()
+        self.assertEqual(self._search('cake'), [])
+
+    def test_renamed_author_is_reindexed(self):
+        self.user.last_name = 'Smith'
+        self.user.save()
+        self.assertEqual(set(self._search('smith')), {self.cake, self.pasta})
+
+    def test_rebuild_index_restores_missing_rows(self):
+        search.remove_recipe(self.cake.id)
+        self.assertEqual(self._search('cake'), [])
+        self.assertEqual(search.rebuild_index(), 2)
+        self.assertEqual(self._search('cake'), [self.cake])
+
+    def _search(self, text):
+        recipes = search.search_recipes(Recipe.objects.all(), text)
+        return list(recipes.order_by('search_entry__rank'))
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from recipes import single_flight
+from recipes.single_flight import COALESCED, HIT, MISS, STALE
+
+
+class SingleFlightTestCase(SimpleTestCase):
+    """Test suite for coalescing the recomputation of cache misses."""
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def compute(self, delay=0):
+        with self.calls_lock:
+            self.calls += 1
+        time.sleep(delay)
+        return 'fresh'
+
+    def fetch_concurrently(self, threads, **kwargs):
+        """Fetch one key from several threads at once and return their outcomes."""
+        barrier = threading.Barrier(threads)
+        outcomes = []
+
+        def worker():
+            barrier.wait()
+            outcomes.append(single_flight.fetch('key', lambda: self.compute(0.2), 60, **kwargs))
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return outcomes
+
+    def test_miss_computes_and_hit_reuses(self):
+        self.assertEqual(single_flight.fetch('key', self.compute, 60), ('fresh', MISS))
+        self.assertEqual(single_flight.fetch('key', self.compute, 60), ('fresh', HIT))
+        self.assertEqual(self.calls, 1)
+
+    def test_concurrent_misses_compute_once(self):
+        outcomes = self.fetch_concurrently(8)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(sorted(outcome for _, outcome in outcomes), [COALESCED] * 7 + [MISS])
+        self.assertEqual({value for value, _ in outcomes}, {'fresh'})
+
+    def test_concurrent_misses_serve_stale_value(self):
+        cache.set('stale', 'old')
+        outcomes = self.fetch_concurrently(8, stale_key='stale')
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(sorted(outcomes), [('fresh', MISS)] + [('old', STALE)] * 7)
+        self.assertEqual(cache.get('stale'), 'fresh')
+
+    def test_waits_for_value_while_lock_is_held(self):
+        token = single_flight.acquire('key')
+        threading.Timer(0.05, lambda: cache.set('key', 'theirs')).start()
+        self.assertEqual(single_flight.fetch('key', self.compute, 60), ('theirs', COALESCED))
+        self.assertEqual(self.calls, 0)
+        single_flight.release('key', token)
+
+    def test_computes_after_waiting_too_long(self):
+        single_flight.acquire('key')
+        with mock.patch.object(single_flight, 'WAIT_TIMEOUT', 0.05):
+            self.assertEqual(single_flight.fetch('key', self.compute, 60), ('fresh', MISS))
+
+    def test_lock_is_released_when_compute_fails(self):
+        with self.assertRaises(ZeroDivisionError):
+            single_flight.fetch('key', lambda: 1 / 0, 60)
+        self.assertEqual(single_flight.fetch('key', self.compute, 60), ('fresh', MISS))
+
+    def test_release_leaves_a_retaken_lock_alone(self):
+        token = single_flight.acquire('key')
+        single_flight.release('key', 'someone else')
+        self.assertIsNone(single_flight.acquire('key'))
+        single_flight.release('key', token)
+        self.assertIsNotNone(single_flight.acquire('key'))
+
+
+class FileLockSingleFlightTestCase(SingleFlightTestCase):
+    """Run the single-flight tests against the file backend, locked with lock files."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        override = override_settings(CACHES={'default': {**settings.CACHE_BACKENDS['file'], 'LOCATION': self.directory}})
+        override.enable()
+        self.addCleanup(override.disable)
+        super().setUp()
+
+    def test_lock_is_a_file_in_the_cache_directory(self):
+        token = single_flight.acquire('key')
+        path = single_flight.lock_path('key')
+        self.assertEqual(os.path.dirname(path), os.path.join(self.directory, single_flight.LOCK_DIRECTORY))
+        with open(path) as file:
+            self.assertEqual(file.read(), token)
+        single_flight.release('key', token)
+        self.assertFalse(os.path.exists(path))
+
+    def test_lock_file_from_another_process_serves_stale_value(self):
+        os.makedirs(os.path.join(self.directory, single_flight.LOCK_DIRECTORY))
+        with open(single_flight.lock_path('key'), 'w') as file:
+            file.write('another process')
+        cache.set('stale', 'old')
+        self.assertEqual(single_flight.fetch('key', self.compute, 60, stale_key='stale'), ('old', STALE))
+        self.assertEqual(self.calls, 0)
+
+    def test_abandoned_lock_file_is_broken(self):
+        single_flight.acquire('key')
+        abandoned = time.time() - single_flight.LOCK_TIMEOUT - 1
+        os.utime(single_flight.lock_path('key'), (abandoned, abandoned))
+        self.assertEqual(single_flight.fetch('key', self.compute, 60), ('fresh', MISS))
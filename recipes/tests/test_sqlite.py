@@ -0,0 +1,85 @@
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from recipes import sqlite
+
+
+class PragmaStatementsTest(SimpleTestCase):
+    """Tests for building the PRAGMA statements from settings."""
+
+    def test_builds_one_statement_per_pragma(self):
+        statements = sqlite.pragma_statements({'journal_mode': 'wal', 'cache_size': -2000})
+        self.assertEqual(statements, ['PRAGMA journal_mode = wal', 'PRAGMA cache_size = -2000'])
+
+    def test_rejects_values_that_are_not_plain_words_or_numbers(self):
+        with self.assertRaises(ValueError):
+            sqlite.pragma_statements({'journal_mode': 'wal; DROP TABLE recipes_recipe'})
+        with self.assertRaises(ValueError):
+            sqlite.pragma_statements({'cache size': 100})
+
+    @override_settings(SQLITE_PRAGMAS={'synchronous': 'off'})
+    def test_pragmas_come_from_settings(self):
+        self.assertEqual(sqlite.get_pragmas(), {'synchronous': 'off'})
+
+    def test_pragmas_default_to_the_module_defaults(self):
+        self.assertIs(sqlite.get_pragmas(), sqlite.DEFAULT_PRAGMAS)
+
+    def test_apply_pragmas_switches_a_file_database_to_wal(self):
+        with tempfile.TemporaryDirectory() as directory:
+            database = sqlite3.connect(os.path.join(directory, 'test.sqlite3'))
+            sqlite.apply_pragmas(database, sqlite.DEFAULT_PRAGMAS)
+            self.assertEqual(database.execute('PRAGMA journal_mode').fetchone(), ('wal',))
+            self.assertEqual(database.execute('PRAGMA synchronous').fetchone(), (1,))
+            self.assertEqual(database.execute('PRAGMA busy_timeout').fetchone(), (5000,))
+            database.close()
+
+
+class SqliteVersionCheckTest(SimpleTestCase):
+    """Tests for the system check of the SQLite library version."""
+
+    def test_supported_version_passes(self):
+        self.assertEqual(sqlite.check_sqlite_version(None), [])
+
+    def test_version_without_returning_is_an_error(self):
+        with mock.patch.object(sqlite.sqlite3, 'sqlite_version_info', (3, 34, 1)), \
+                mock.patch.object(sqlite.sqlite3, 'sqlite_version', '3.34.1'):
+            errors = sqlite.check_sqlite_version(None)
+        self.assertEqual([error.id for error in errors], ['recipes.E001'])
+        self.assertIn('3.34.1', errors[0].msg)
+
+
+class ConfigureConnectionTest(TestCase):
+    """Tests that new Django connections are tuned as they are opened."""
+
+    def test_connection_runs_the_configured_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone(), (1,))
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone(), (-32 * 1024,))
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone(), (5000,))
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234})
+    def test_pragmas_are_read_when_the_connection_opens(self):
+        database = connection.copy()
+        try:
+            database.ensure_connection()
+            self.assertEqual(database.connection.execute('PRAGMA busy_timeout').fetchone(), (1234,))
+        finally:
+            database.close()
+
+
+class BenchmarkSqliteCommandTest(SimpleTestCase):
+    """Tests for the SQLite benchmark command."""
+
+    def test_reports_default_and_tuned_settings(self):
+        out = StringIO()
+        call_command('benchmark_sqlite', readers=1, writers=1, recipes=50, seconds=0.2, stdout=out)
+        rows = [line.split()[0] for line in out.getvalue().splitlines()[2:]]
+        self.assertEqual(rows, ['default', 'tuned'])
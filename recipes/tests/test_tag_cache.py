@@ -0,0 +1,90 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+from recipes import tag_cache, versioned_cache
+from recipes.models import CuisineTag, DietaryTag
+from recipes.versioned_cache import TAGS
+
+
+class TagCacheTestCase(TestCase):
+    """Test suite for the tag name cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.italian = CuisineTag.objects.create(name='Italian')
+        self.vegan = DietaryTag.objects.create(name='Vegan')
+        self.cache = tag_cache.cuisine_tags
+        self.cache.get_map()
+
+    def test_for_model_returns_cache_of_each_tag_model(self):
+        self.assertIs(tag_cache.for_model(CuisineTag), tag_cache.cuisine_tags)
+        self.assertIs(tag_cache.for_model(DietaryTag), tag_cache.dietary_tags)
+
+    def test_ids_matching_ignores_case_with_no_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.ids_matching([' italian ', 'ITALIAN', ' ']), {self.italian.id})
+
+    def test_ids_matching_looks_up_unknown_names_in_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cache.ids_matching(['Italian', 'Thai', 'Greek']), {self.italian.id})
+
+    def test_ids_for_names_ignores_case(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.ids_for_names(['ITALIAN', ' italian ']), [self.italian.id])
+
+    def test_saving_a_tag_bumps_the_shared_tags_version(self):
+        version = versioned_cache.get_versions([(TAGS, None)])
+        mexican = CuisineTag.objects.create(name='Mexican')
+        self.assertNotEqual(versioned_cache.get_versions([(TAGS, None)]), version)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cache.ids_matching(['mexican']), {mexican.id})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.ids_matching(['mexican']), {mexican.id})
+
+    def test_tag_created_without_signals_is_still_matched(self):
+        greek, = CuisineTag.objects.bulk_create([CuisineTag(name='Greek', key='greek')])
+        self.assertEqual(self.cache.ids_matching(['greek']), {greek.id})
+
+    def test_map_reloads_when_another_process_bumps_the_version(self):
+        CuisineTag.objects.filter(pk=self.italian.pk).update(name='Tuscan', key='tuscan')
+        versioned_cache.bump(TAGS)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cache.ids_matching(['tuscan']), {self.italian.id})
+
+    def test_renamed_tag_is_found_by_new_name(self):
+        self.italian.name = 'Tuscan'
+        self.italian.save()
+        self.assertEqual(self.cache.ids_matching(['italian']), set())
+        self.assertEqual(self.cache.ids_matching(['tuscan']), {self.italian.id})
+
+    def test_deleted_tag_is_no_longer_matched(self):
+        self.italian.delete()
+        self.assertEqual(self.cache.ids_matching(['italian']), set())
+
+    def test_ids_for_known_names_uses_no_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.ids_for_names(['Italian', ' ', 'Italian']), [self.italian.id])
+
+    def test_ids_for_names_creates_missing_tags_in_one_insert_and_one_fetch(self):
+        version = versioned_cache.get_versions([(TAGS, None)])
+        with self.assertNumQueries(2):
+            ids = self.cache.ids_for_names(['Thai', 'Italian', 'Greek', 'thai'])
+        names = dict(CuisineTag.objects.values_list('id', 'name'))
+        self.assertEqual([names[tag_id] for tag_id in ids], ['Thai', 'Italian', 'Greek'])
+        self.assertNotEqual(versioned_cache.get_versions([(TAGS, None)]), version)
+        self.assertEqual(self.cache.ids_matching(['thai', 'greek']), set(ids) - {self.italian.id})
+
+    def test_ids_for_names_resolves_tags_another_process_created(self):
+        greek, = CuisineTag.objects.bulk_create([CuisineTag(name='Greek', key='greek')])
+        self.assertEqual(self.cache.ids_for_names(['greek']), [greek.id])
+        self.assertEqual(CuisineTag.objects.filter(key='greek').count(), 1)
+
+    def test_map_loaded_in_rolled_back_transaction_is_not_trusted(self):
+        try:
+            with transaction.atomic():
+                CuisineTag.objects.create(name='Phantom')
+                self.assertTrue(self.cache.ids_matching(['phantom']))
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(self.cache.ids_matching(['phantom']), set())
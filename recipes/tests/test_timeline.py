@@ -0,0 +1,121 @@
+import datetime
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from recipes import timeline
+from recipes.models import Recipe, TimelineEntry, User
+
+
+class TimelineTestCase(TestCase):
+    """Test suite for materialized following timelines."""
+
+    fixtures = [
+        'recipes/tests/fixtures/default_user.json',
+        'recipes/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.author = User.objects.get(username='@janedoe')
+        self.other_author = User.objects.get(username='@petrapickles')
+        self.old_recipe = self._create_recipe(self.author, 'Old Recipe')
+
+    def test_follow_backfills_existing_recipes(self):
+        self.user.follow(self.author)
+        self.assertEqual(self._timeline(self.user), [self.old_recipe])
+
+    def test_published_recipe_reaches_followers(self):
+        self.user.follow(self.author)
+        new_recipe = self._create_recipe(self.author, 'New Recipe')
+        self.assertEqual(set(self._timeline(self.user)), {self.old_recipe, new_recipe})
+        self.assertEqual(self._timeline(self.author), [])
+
+    def test_recipes_of_unfollowed_authors_are_not_added(self):
+        self.user.follow(self.author)
+        self._create_recipe(self.other_author, 'Unfollowed Recipe')
+        self.assertEqual(self._timeline(self.user), [self.old_recipe])
+
+    def test_unfollow_prunes_only_that_author(self):
+        self.user.follow(self.author)
+        self.user.follow(self.other_author)
+        other_recipe = self._create_recipe(self.other_author, 'Other Recipe')
+        self.user.unfollow(self.author)
+        self.assertEqual(self._timeline(self.user), [other_recipe])
+
+    def test_deleted_recipe_is_pruned(self):
+        self.user.follow(self.author)
+        self.old_recipe.delete()
+        self.assertEqual(self._timeline(self.user), [])
+
+    def test_following_recipes_does_not_join_follows(self):
+        self.user.follow(self.author)
+        recipes = timeline.following_recipes(Recipe.objects.all(), self.user)
+        self.assertEqual(list(recipes), [self.old_recipe])
+        self.assertNotIn('recipes_follow', str(recipes.query))
+
+    def test_entries_copy_publication_date(self):
+        self.user.follow(self.author)
+        new_recipe = self._create_recipe(self.author, 'New Recipe')
+        dates = dict(TimelineEntry.objects.filter(user=self.user).values_list('recipe_id', 'publication_date'))
+        self.assertEqual(dates, {
+            self.old_recipe.id: self.old_recipe.publication_date, new_recipe.id: new_recipe.publication_date,
+        })
+
+    def test_changed_publication_date_is_copied_to_entries(self):
+        self.user.follow(self.author)
+        self.old_recipe.publication_date = datetime.date(2020, 1, 1)
+        self.old_recipe.save()
+        entry = TimelineEntry.objects.get(user=self.user, recipe=self.old_recipe)
+        self.assertEqual(entry.publication_date, datetime.date(2020, 1, 1))
+
+    def test_following_page_is_newest_first(self):
+        self.user.follow(self.author)
+        self.user.follow(self.other_author)
+        newer = self._create_recipe(self.other_author, 'Newer Recipe')
+        self._redate(self.old_recipe, datetime.date(2020, 1, 1))
+        same_day = self._create_recipe(self.author, 'Same Day Recipe')
+        page = timeline.following_page(self.user, 10)
+        self.assertEqual(list(page.object_list), [same_day, newer, self.old_recipe])
+
+    def test_following_page_reads_entries_in_one_query(self):
+        self.user.follow(self.author)
+        self._create_recipe(self.author, 'New Recipe')
+        with self.assertNumQueries(2):
+            page = timeline.following_page(self.user, 10)
+            [recipe.author.username for recipe in page.object_list]
+
+    def test_following_page_uses_timeline_index(self):
+        entries = TimelineEntry.objects.filter(user=self.user).order_by('-publication_date', '-recipe_id')
+        plan = entries.explain()
+        self.assertIn('timeline_user_published_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    @override_settings(CURSOR_PAGINATION=True)
+    def test_following_page_by_cursor(self):
+        self.user.follow(self.author)
+        recipes = [self._create_recipe(self.author, f'Recipe {number}') for number in range(3)]
+        first = timeline.following_page(self.user, 2)
+        second = timeline.following_page(self.user, 2, cursor=first.next_cursor)
+        self.assertEqual(list(first) + list(second), [*reversed(recipes), self.old_recipe])
+        self.assertFalse(second.has_next())
+
+    def test_rebuild_timelines_restores_entries(self):
+        self.user.follow(self.author)
+        self.author.follow(self.other_author)
+        other_recipe = self._create_recipe(self.other_author, 'Other Recipe')
+        TimelineEntry.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_timelines', stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'Wrote 2 timeline entries.')
+        self.assertEqual(self._timeline(self.user), [self.old_recipe])
+        self.assertEqual(self._timeline(self.author), [other_recipe])
+
+    def _redate(self, recipe, publication_date):
+        recipe.publication_date = publication_date
+        recipe.save()
+
+    def _create_recipe(self, author, name):
+        return Recipe.objects.create(author=author, recipe_name=name, description='Description')
+
+    def _timeline(self, user):
+        return list(Recipe.objects.filter(timeline_entries__user=user).order_by('id'))
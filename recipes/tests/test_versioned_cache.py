@@ -0,0 +1,169 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipes import single_flight, versioned_cache
+from recipes.models import Comment, CuisineTag, Favourite, Follow, Rating, Recipe, RecipeIngredient, User
+from recipes.tests.helpers import use_file_cache
+from recipes.versioned_cache import RECIPE, TAGS, USER
+
+
+class VersionedCacheTestCase(TestCase):
+    """Test suite for the versioned cache and the signals that bump its versions."""
+
+    fixtures = [
+        'recipes/tests/fixtures/default_user.json',
+        'recipes/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        use_file_cache(self)
+        versioned_cache.stats.reset()
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.recipe = Recipe.objects.create(author=self.user, recipe_name='Cake', description='Sweet')
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return {'calls': self.calls}
+
+    def lookup(self, versions=None, key_parts=('test_value', 1)):
+        return versioned_cache.cached(key_parts, versions or [(RECIPE, self.recipe.id)], 60, self.compute)
+
+    def test_first_lookup_misses_and_second_hits(self):
+        self.assertEqual(self.lookup(), {'calls': 1})
+        self.assertEqual(self.lookup(), {'calls': 1})
+        self.assertEqual((versioned_cache.stats.hits, versioned_cache.stats.misses), (1, 1))
+        self.assertEqual(versioned_cache.stats.counts('test_value'), (1, 1))
+
+    def test_key_parts_tell_values_apart(self):
+        self.lookup(key_parts=('test_value', 1))
+        self.lookup(key_parts=('test_value', 2))
+        self.assertEqual(self.calls, 2)
+
+    def test_none_is_cached(self):
+        versioned_cache.cached(('test_none',), [(TAGS, None)], 60, lambda: None)
+        versioned_cache.cached(('test_none',), [(TAGS, None)], 60, self.compute)
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(versioned_cache.stats.counts('test_none'), (1, 1))
+
+    def test_process_local_cache_computes_every_lookup(self):
+        with override_settings(CACHES={'default': settings.CACHE_BACKENDS['locmem']}):
+            cache.clear()
+            self.assertFalse(versioned_cache.is_shared())
+            self.lookup()
+            self.lookup()
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(versioned_cache.stats.counts('test_value'), (0, 2))
+
+    def test_bump_invalidates_only_values_of_that_entity(self):
+        self.lookup([(USER, self.user.id)], ('user_value',))
+        self.lookup([(USER, self.other_user.id)], ('other_value',))
+        versioned_cache.bump(USER, self.user.id)
+        self.lookup([(USER, self.user.id)], ('user_value',))
+        self.lookup([(USER, self.other_user.id)], ('other_value',))
+        self.assertEqual(versioned_cache.stats.counts('user_value'), (0, 2))
+        self.assertEqual(versioned_cache.stats.counts('other_value'), (1, 1))
+
+    def test_evicted_version_restarts_newer(self):
+        version = versioned_cache.get_versions([(RECIPE, self.recipe.id)])[0]
+        cache.delete(versioned_cache.version_key(RECIPE, self.recipe.id))
+        self.assertGreater(versioned_cache.get_versions([(RECIPE, self.recipe.id)])[0], version)
+
+    def test_version_is_bumped_again_on_commit(self):
+        key = versioned_cache.version_key(RECIPE, self.recipe.id)
+        version = versioned_cache.get_versions([(RECIPE, self.recipe.id)])[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            versioned_cache.bump(RECIPE, self.recipe.id)
+            self.assertEqual(cache.get(key), version + 1)
+        self.assertEqual(cache.get(key), version + 2)
+
+    def test_stale_value_is_served_while_another_request_recomputes(self):
+        versioned_cache.cached(('test_value',), [(RECIPE, self.recipe.id)], 60, self.compute, stale=True)
+        versioned_cache.bump(RECIPE, self.recipe.id)
+        single_flight.acquire(versioned_cache.value_key(('test_value',), [(RECIPE, self.recipe.id)]))
+        value = versioned_cache.cached(('test_value',), [(RECIPE, self.recipe.id)], 60, self.compute, stale=True)
+        self.assertEqual(value, {'calls': 1})
+        self.assertEqual(versioned_cache.stats.count('test_value', single_flight.STALE), 1)
+
+    def assert_bumps(self, versions, change):
+        """Check that a change moves on every one of the given versions."""
+        before = versioned_cache.get_versions(versions)
+        change()
+        after = versioned_cache.get_versions(versions)
+        for pair, old, new in zip(versions, before, after):
+            self.assertNotEqual(old, new, pair)
+
+    def test_recipe_changes_bump_recipe_and_author(self):
+        self.recipe.recipe_name = 'Pie'
+        self.assert_bumps([(RECIPE, self.recipe.id), (USER, self.user.id)], self.recipe.save)
+
+    def test_rating_bumps_recipe_and_user(self):
+        versions = [(RECIPE, self.recipe.id), (USER, self.other_user.id)]
+        self.assert_bumps(versions, lambda: Rating.rate(self.other_user, self.recipe, 4))
+
+    def test_favourite_bumps_user_only(self):
+        recipe_version = versioned_cache.get_versions([(RECIPE, self.recipe.id)])
+        self.assert_bumps([(USER, self.other_user.id)], lambda: self.other_user.favourite_recipe(self.recipe))
+        self.assert_bumps([(USER, self.other_user.id)], lambda: Favourite.objects.filter(user=self.other_user).delete())
+        self.assertEqual(versioned_cache.get_versions([(RECIPE, self.recipe.id)]), recipe_version)
+
+    def test_comment_bumps_recipe_and_author(self):
+        self.assert_bumps(
+            [(RECIPE, self.recipe.id), (USER, self.other_user.id)],
+            lambda: Comment.objects.create(recipe=self.recipe, author=self.other_user, text='Yum')
+        )
+
+    def test_ingredient_bumps_recipe(self):
+        self.assert_bumps(
+            [(RECIPE, self.recipe.id)],
+            lambda: RecipeIngredient.objects.create(recipe=self.recipe, name='flour', amount=100)
+        )
+
+    def test_follow_bumps_both_users(self):
+        versions = [(USER, self.user.id), (USER, self.other_user.id)]
+        self.assert_bumps(versions, lambda: self.user.follow(self.other_user))
+        self.assert_bumps(versions, lambda: Follow.objects.filter(follower=self.user).delete())
+
+    def test_tag_changes_bump_tags_and_tagged_recipe(self):
+        tag = CuisineTag.objects.create(name='Italian')
+        self.assert_bumps([(RECIPE, self.recipe.id)], lambda: self.recipe.cuisine_tags.add(tag))
+        self.assert_bumps([(RECIPE, self.recipe.id)], lambda: self.recipe.cuisine_tags.clear())
+        tag.name = 'Tuscan'
+        self.assert_bumps([(TAGS, None)], tag.save)
+
+    def test_recipe_page_reuses_cached_data(self):
+        self.recipe.cuisine_tags.add(CuisineTag.objects.create(name='Italian'))
+        self.client.login(username=self.user.username, password='Password123')
+        url = reverse('recipe', kwargs={'recipe_id': self.recipe.id})
+        self.client.get(url)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertContains(response, 'Italian')
+        self.assertEqual(versioned_cache.stats.counts('recipe_data'), (1, 1))
+
+    def test_recipe_page_shows_renamed_tag(self):
+        tag = CuisineTag.objects.create(name='Italian')
+        self.recipe.cuisine_tags.add(tag)
+        self.client.login(username=self.user.username, password='Password123')
+        url = reverse('recipe', kwargs={'recipe_id': self.recipe.id})
+        self.client.get(url)
+        tag.name = 'Tuscan'
+        tag.save()
+        self.assertContains(self.client.get(url), 'Tuscan')
+
+
+class FileBasedVersionedCacheTestCase(TestCase):
+    """Test the versioned cache against the file-based backend option."""
+
+    def setUp(self):
+        use_file_cache(self)
+        versioned_cache.stats.reset()
+
+    def test_values_and_versions_are_stored_in_files(self):
+        for _ in range(2):
+            self.assertEqual(versioned_cache.cached(('tag_names',), [(TAGS, None)], 60, lambda: ['Italian']), ['Italian'])
+        versioned_cache.bump(TAGS)
+        versioned_cache.cached(('tag_names',), [(TAGS, None)], 60, lambda: ['Italian'])
+        self.assertEqual(versioned_cache.stats.counts('tag_names'), (1, 2))
@@ -101,6 +101,25 @@ class CreateRecipeTestCase(TestCase):
         ingredients = RecipeIngredient.objects.filter(recipe=recipe)
         self.assertEqual(ingredients.count(), 2)
 
+    def test_post_without_units_saves_default_units(self):
+        self.client.login(username='@johndoe', password='Password123')
+        del self.form_input['ingredient_units_0']
+        self.client.post(self.url, self.form_input)
+        recipe = Recipe.objects.last()
+        self.assertEqual(RecipeIngredient.objects.get(recipe=recipe).units, 'g')
+        response = self.client.get(reverse('recipe', kwargs={'recipe_id': recipe.id}))
+        self.assertEqual(response.status_code, 200)
+
+    def test_post_with_unknown_units_renders_recipe(self):
+        self.client.login(username='@johndoe', password='Password123')
+        self.form_input['ingredient_units_0'] = 'pcs'
+        self.client.post(self.url, self.form_input)
+        recipe = Recipe.objects.last()
+        response = self.client.get(reverse('recipe', kwargs={'recipe_id': recipe.id}), {'servings': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['ingredients_list'][0]['units'], 'pcs')
+        self.assertEqual(response.context['ingredients_list'][0]['amount'], 400)
+
     def test_post_combines_instruction_steps(self):
         self.client.login(username='@johndoe', password='Password123')
         self.form_input['instruction_step_1'] = 'Bake for 20 minutes'
@@ -95,6 +95,18 @@ class EditRecipeViewTest(TestCase):
         self.assertEqual(ingredients.count(), 1)
         self.assertEqual(ingredients.first().name, 'Sugar')
 
+    def test_post_keeps_rows_of_posted_ingredient_ids(self):
+        flour = RecipeIngredient.objects.get(recipe=self.recipe)
+        self.client.login(username='@johndoe', password='Password123')
+        self.form_input.update({
+            'ingredient_id_0': str(flour.id), 'ingredient_name_0': 'Flour', 'ingredient_amount_0': '250',
+            'ingredient_name_1': 'Sugar', 'ingredient_amount_1': '100', 'ingredient_units_1': 'g',
+        })
+        self.client.post(self.url, self.form_input)
+        ingredients = list(RecipeIngredient.objects.filter(recipe=self.recipe))
+        self.assertEqual([ingredient.name for ingredient in ingredients], ['Flour', 'Sugar'])
+        self.assertEqual((ingredients[0].id, ingredients[0].amount), (flour.id, 250))
+
     def test_post_saves_cuisine_tags(self):
         self.client.login(username='@johndoe', password='Password123')
         self.form_input['cuisine_tag_0'] = 'Italian'
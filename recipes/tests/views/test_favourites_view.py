@@ -97,4 +97,76 @@ class FavouritesViewTest(TestCase):
         self.assertRedirects(response, f'{reverse("profile_page")}?tab=favourites')
     
     def _login_user(self):
-        self.client.login(username=self.user.username, password='Password123')
\ No newline at end of file
+        self.client.login(username=self.user.username, password='Password123')
+
+
+class ToggleFavouriteViewTest(TestCase):
+    """Test suite for the favourite toggle endpoint."""
+
+    fixtures = [
+        'recipes/tests/fixtures/default_user.json',
+        'recipes/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.recipe = Recipe.objects.create(author=self.user, recipe_name='Test Recipe', description='Test description')
+        self.url = reverse('toggle_favourite', kwargs={'recipe_id': self.recipe.id})
+
+    def test_toggle_favourite_url(self):
+        self.assertEqual(self.url, f'/recipe/{self.recipe.id}/favourite/toggle/')
+
+    def test_toggle_favourite_requires_authentication(self):
+        response = self.client.post(self.url)
+        self.assertRedirects(response, reverse_with_next('log_in', self.url), status_code=302)
+
+    def test_toggle_favourite_rejects_get(self):
+        self._login_user()
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_json_response_holds_new_state_and_count(self):
+        self._login_user()
+        response = self.client.post(f'{self.url}?format=json', {'favourite': '1'})
+        data = response.json()
+        self.assertEqual((data['is_favourite'], data['favourite_count']), (True, 1))
+        self.assertIn('bi-heart-fill', data['html'])
+        self.assertIn('name="favourite" value="0"', data['html'])
+        self.assertTrue(self.user.has_favourited(self.recipe))
+
+    def test_wanted_state_is_idempotent(self):
+        self._login_user()
+        self.client.post(f'{self.url}?format=json', {'favourite': '1'})
+        data = self.client.post(f'{self.url}?format=json', {'favourite': '1'}).json()
+        self.assertEqual((data['is_favourite'], data['favourite_count']), (True, 1))
+
+    def test_without_wanted_state_flips_favourite(self):
+        self._login_user()
+        self.user.favourite_recipe(self.recipe)
+        data = self.client.post(f'{self.url}?format=json').json()
+        self.assertEqual((data['is_favourite'], data['favourite_count']), (False, 0))
+
+    def test_script_request_gets_button_fragment(self):
+        self._login_user()
+        response = self.client.post(self.url, {'favourite': '1'}, headers={'X-Requested-With': 'XMLHttpRequest'})
+        self.assertTemplateUsed(response, 'partials/favourite_button.html')
+        self.assertNotContains(response, '<html')
+
+    def test_form_post_redirects_back_with_message(self):
+        self._login_user()
+        response = self.client.post(self.url, {'favourite': '1'}, headers={'Referer': reverse('welcome')}, follow=True)
+        self.assertRedirects(response, reverse('welcome'))
+        self.assertIn('Added Test Recipe to favourites', [str(message) for message in response.context['messages']])
+
+    def test_toggle_nonexistent_recipe_returns_404(self):
+        self._login_user()
+        url = reverse('toggle_favourite', kwargs={'recipe_id': 9999})
+        self.assertEqual(self.client.post(url).status_code, 404)
+
+    def test_cards_post_to_toggle_endpoint(self):
+        self._login_user()
+        response = self.client.get(reverse('welcome'))
+        self.assertContains(response, f'action="{self.url}"')
+        self.assertContains(response, 'toggles.js')
+
+    def _login_user(self):
+        self.client.login(username=self.user.username, password='Password123')
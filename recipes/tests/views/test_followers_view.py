@@ -113,3 +113,76 @@ class UnfollowUserViewTest(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class ToggleFollowViewTest(TestCase):
+    """Tests for the follow toggle endpoint."""
+
+    fixtures = [
+        'recipes/tests/fixtures/default_user.json',
+        'recipes/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.url = reverse('toggle_follow', kwargs={'user_id': self.other_user.id})
+
+    def test_toggle_follow_url(self):
+        self.assertEqual(self.url, f'/user/{self.other_user.id}/follow/toggle/')
+
+    def test_toggle_follow_requires_authentication(self):
+        response = self.client.post(self.url)
+        self.assertRedirects(response, reverse_with_next('log_in', self.url), status_code=302)
+
+    def test_toggle_follow_rejects_get(self):
+        self.client.login(username='@johndoe', password='Password123')
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_json_response_holds_new_state_and_counts(self):
+        self.client.login(username='@johndoe', password='Password123')
+        data = self.client.post(f'{self.url}?format=json', {'follow': '1'}).json()
+        self.assertEqual(data['user_id'], self.other_user.id)
+        self.assertEqual((data['is_following'], data['follower_count'], data['following_count']), (True, 1, 1))
+        self.assertIn('Unfollow', data['html'])
+        self.assertTrue(self.user.is_following(self.other_user))
+
+    def test_unfollow_with_wanted_state(self):
+        self.user.follow(self.other_user)
+        self.client.login(username='@johndoe', password='Password123')
+        data = self.client.post(f'{self.url}?format=json', {'follow': '0'}).json()
+        self.assertEqual((data['is_following'], data['follower_count']), (False, 0))
+        self.assertFalse(self.user.is_following(self.other_user))
+
+    def test_without_wanted_state_flips_follow(self):
+        self.client.login(username='@johndoe', password='Password123')
+        self.assertTrue(self.client.post(f'{self.url}?format=json').json()['is_following'])
+        self.assertFalse(self.client.post(f'{self.url}?format=json').json()['is_following'])
+
+    def test_script_request_gets_button_fragment(self):
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.post(self.url, {'follow': '1'}, headers={'X-Requested-With': 'XMLHttpRequest'})
+        self.assertTemplateUsed(response, 'partials/follow_button.html')
+        self.assertContains(response, 'Unfollow')
+
+    def test_form_post_redirects_to_profile(self):
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.post(self.url, {'follow': '1'})
+        self.assertRedirects(response, reverse('user_profile', kwargs={'user_id': self.other_user.id}))
+
+    def test_cannot_toggle_follow_on_self(self):
+        self.client.login(username='@johndoe', password='Password123')
+        url = reverse('toggle_follow', kwargs={'user_id': self.user.id})
+        self.assertEqual(self.client.post(url).status_code, 400)
+        self.assertFalse(self.user.is_following(self.user))
+
+    def test_profile_header_posts_to_toggle_endpoint(self):
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.get(reverse('user_profile', kwargs={'user_id': self.other_user.id}))
+        self.assertContains(response, f'action="{self.url}"')
+        self.assertContains(response, f'data-follower-count="{self.other_user.id}"')
+
+    def test_compact_button_stays_compact_when_toggled(self):
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.post(self.url, {'follow': '1', 'compact': '1'}, headers={'X-Requested-With': 'XMLHttpRequest'})
+        self.assertContains(response, 'btn-sm')
+        self.assertContains(response, 'name="compact"')
+        self.assertTrue(self.user.is_following(self.other_user))
@@ -1,5 +1,7 @@
 """Tests for the other user profile view."""
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from recipes.models import User, Follow, Recipe
 from recipes.tests.helpers import reverse_with_next
@@ -105,9 +107,32 @@ class OtherUserProfileViewTest(TestCase):
         self.assertEqual(response.context['recipes_count'], 0)
         self.assertContains(response, "hasn't shared any recipes")
 
+    def test_query_count_does_not_grow_with_page_size(self):
+        self._login_user()
+        self._create_recipes_for_user(self.other_user, 1)
+        small_count = self._count_profile_queries()
+        self._create_recipes_for_user(self.other_user, 11)
+        for recipe in Recipe.objects.all():
+            self.user.favourite_recipe(recipe)
+        self.assertEqual(self._count_profile_queries(), small_count)
+
+    def test_recipe_cards_mark_favourites(self):
+        self._login_user()
+        self._create_recipes_for_user(self.other_user, 2)
+        favourite = Recipe.objects.get(recipe_name='Recipe 1')
+        self.user.favourite_recipe(favourite)
+        response = self.client.get(self.url)
+        favourites = {item['recipe'] for item in response.context['recipes_with_fav'] if item['is_favourite']}
+        self.assertEqual(favourites, {favourite})
+
     def _login_user(self):
         self.client.login(username=self.user.username, password='Password123')
 
+    def _count_profile_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        return len(queries)
+
     def _create_recipes_for_user(self, user, count):
         for i in range(count):
             Recipe.objects.create(
@@ -1,8 +1,11 @@
 """Tests for the profile page view."""
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from recipes.models import User, Follow, Recipe, Rating
 from recipes.tests.helpers import reverse_with_next
+from recipes.views.profile_page_view import FOLLOWS_PER_PAGE
 
 
 class ProfilePageViewTest(TestCase):
@@ -61,9 +64,9 @@ class ProfilePageViewTest(TestCase):
 
     def test_profile_page_shows_user_recipes(self):
         self._login_user()
-        response = self.client.get(self.url)
+        response = self.client.get(self.url, {'tab': 'recipes'})
         
-        user_recipes = response.context['user_recipes']
+        user_recipes = list(response.context['recipes_page_obj'])
         self.assertEqual(len(user_recipes), 2)
         self.assertIn(self.recipe1, user_recipes)
         self.assertIn(self.recipe2, user_recipes)
@@ -79,11 +82,10 @@ class ProfilePageViewTest(TestCase):
 
     def test_profile_page_shows_followers_and_following(self):
         self._login_user()
-        response = self.client.get(self.url)
-        context = response.context
-        
-        self.assertIn(self.other_user, context['followers'])
-        self.assertIn(self.other_user, context['following'])
+        response = self.client.get(self.url, {'tab': 'followers'})
+        self.assertIn(self.other_user, response.context['followers'])
+        response = self.client.get(self.url, {'tab': 'following'})
+        self.assertIn(self.other_user, response.context['following'])
 
     def test_profile_page_with_recipes_tab(self):
         self._login_user()
@@ -102,7 +104,7 @@ class ProfilePageViewTest(TestCase):
         
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.context['selected_tab'], 'favourites')
-        self.assertEqual(len(response.context['favourites']), 1)
+        self.assertEqual(len(response.context['favourites_page_obj']), 1)
 
     def test_profile_page_with_followers_tab(self):
         self._login_user()
@@ -149,7 +151,7 @@ class ProfilePageViewTest(TestCase):
         self.other_user.favourite_recipe(self.recipe2)
         
         response = self.client.get(f'{self.url}?tab=favourites')
-        favourites = response.context['favourites']
+        favourites = list(response.context['favourites_page_obj'])
         
         self.assertEqual(len(favourites), 1)
         self.assertIn(self.recipe1, favourites)
@@ -159,7 +161,7 @@ class ProfilePageViewTest(TestCase):
         self._login_user()
         response = self.client.get(f'{self.url}?tab=favourites')
         
-        self.assertEqual(len(response.context['favourites']), 0)
+        self.assertEqual(len(response.context['favourites_page_obj']), 0)
         self.assertEqual(response.context['favourites_count'], 0)
         self.assertContains(response, 'No favourite recipes yet')
     
@@ -167,10 +169,10 @@ class ProfilePageViewTest(TestCase):
         new_user = self._create_test_user('@norecipes')
         self.client.login(username='@norecipes', password='Password123')
         
-        response = self.client.get(reverse('profile_page'))
+        response = self.client.get(reverse('profile_page'), {'tab': 'recipes'})
         
         self.assertEqual(response.context['recipes_count'], 0)
-        self.assertEqual(len(response.context['user_recipes']), 0)
+        self.assertEqual(len(response.context['recipes_page_obj']), 0)
 
     def test_profile_page_user_with_no_follows(self):
         new_user = self._create_test_user('@nofollows')
@@ -256,9 +258,107 @@ class ProfilePageViewTest(TestCase):
         response = self.client.get(f'{self.url}?tab=favourites&favourites_page=invalid')
         self.assertEqual(response.context['favourites_page_obj'].number, 1)
     
+    def test_query_count_does_not_grow_with_page_size(self):
+        self._login_user()
+        self.user.favourite_recipe(self.recipe1)
+        small_count = self._count_profile_queries()
+        self._create_additional_recipes_for_user(self.user, 4)
+        self._create_and_favourite_recipes(6)
+        for recipe in Recipe.objects.all():
+            Rating.objects.get_or_create(user=self.user, recipe=recipe, defaults={'rating': 4})
+        self.assertEqual(self._count_profile_queries(), small_count)
+
+    def test_recipe_cards_mark_favourites(self):
+        self._login_user()
+        self.user.favourite_recipe(self.recipe2)
+        response = self.client.get(self.url, {'tab': 'recipes'})
+        favourites = {item['recipe'] for item in response.context['recipes_with_fav'] if item['is_favourite']}
+        self.assertEqual(favourites, {self.recipe2})
+        response = self.client.get(self.url, {'tab': 'favourites'})
+        self.assertEqual([item['recipe'] for item in response.context['favourite_cards']], [self.recipe2])
+
+    def test_only_selected_tab_is_rendered(self):
+        self._login_user()
+        response = self.client.get(self.url)
+        for key in ['user_recipes', 'favourites', 'followers', 'following']:
+            self.assertNotIn(key, response.context)
+        self.assertNotContains(response, 'Chocolate Cake')
+        self.assertContains(response, reverse('profile_tab', args=['followers']))
+
+    def test_profile_tab_renders_tab_fragment(self):
+        self._login_user()
+        response = self.client.get(reverse('profile_tab', args=['followers']))
+        self.assertTemplateUsed(response, 'partials/profile_followers_tab.html')
+        self.assertTemplateNotUsed(response, 'profile_page.html')
+        self.assertContains(response, '@janedoe')
+
+    def test_profile_tab_rejects_unknown_tab(self):
+        self._login_user()
+        response = self.client.get(reverse('profile_tab', args=['account']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_followers_are_paginated_by_cursor(self):
+        self._login_user()
+        followers = [self._create_test_user(f'@follower{index}') for index in range(FOLLOWS_PER_PAGE)]
+        for follower in followers:
+            follower.follow(self.user)
+        response = self.client.get(self.url, {'tab': 'followers'})
+        page = response.context['followers']
+        self.assertEqual(list(page), followers[::-1])
+        self.assertContains(response, f'?tab=followers&followers_cursor={page.next_cursor}#followers')
+        response = self.client.get(self.url, {'tab': 'followers', 'followers_cursor': page.next_cursor})
+        self.assertEqual(list(response.context['followers']), [self.other_user])
+
+    def test_follow_back_and_follows_you_badges(self):
+        self._login_user()
+        petra = User.objects.get(username='@petrapickles')
+        petra.follow(self.user)
+        response = self.client.get(self.url, {'tab': 'followers'})
+        self.assertContains(response, 'Mutual', count=1)
+        self.assertContains(response, f'<form method="post" action="{reverse("toggle_follow", args=[petra.id])}"')
+        self.assertContains(response, 'Follow back', count=1)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertNotContains(response, f'href="{reverse("follow_user", args=[petra.id])}"')
+        self.assertNotContains(response, reverse('toggle_follow', args=[self.other_user.id]))
+        self.user.follow(petra)
+        response = self.client.get(self.url, {'tab': 'following'})
+        self.assertContains(response, 'Follows you', count=2)
+
+    def test_followers_query_count_does_not_grow(self):
+        self._login_user()
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url, {'tab': 'followers'})
+        for index in range(30):
+            self._create_test_user(f'@follower{index}').follow(self.user)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(self.url, {'tab': 'followers'})
+        self.assertEqual(len(large), len(small))
+
+    def test_recipe_tabs_only_select_one_page_of_recipes(self):
+        self._login_user()
+        extra = Recipe.objects.bulk_create(
+            Recipe(author=self.user, recipe_name=f'Extra {index}', description='More') for index in range(20)
+        )
+        for recipe in extra:
+            self.user.favourite_recipe(recipe)
+        for tab in ('recipes', 'favourites'):
+            with self.subTest(tab=tab), CaptureQueriesContext(connection) as queries:
+                self.client.get(self.url, {'tab': tab})
+            selects = [
+                query['sql'] for query in queries
+                if query['sql'].startswith('SELECT "recipes_recipe"."id"')
+            ]
+            self.assertTrue(selects)
+            self.assertTrue(all('LIMIT' in sql for sql in selects), selects)
+
     def _login_user(self):
         self.client.login(username=self.user.username, password='Password123')
     
+    def _count_profile_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'tab': 'recipes'})
+        return len(queries)
+
     def _create_test_user(self, username):
         return User.objects.create_user(
             username=username,
@@ -61,6 +61,15 @@ class RatingViewTestCase(TestCase):
         rating =Rating.objects.get(user=self.user, recipe=self.recipe)
         self.assertEqual(rating.rating, 5)
     
+    def test_rating_submission_updates_recipe_totals(self):
+        Rating.objects.create(user=self.user, recipe=self.recipe, rating=2)
+        self.client.login(username=self.user.username, password="Password123")
+        self.client.post(self.url, {'rating': 5})
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.rating_sum, 5)
+        self.assertEqual(self.recipe.rating_count, 1)
+
     def test_invalid_rating_does_not_save(self):
         self.client.login(username=self.user.username, password="Password123")
         response = self.client.post(self.url, {'rating': 10})
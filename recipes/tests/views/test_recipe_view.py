@@ -1,7 +1,11 @@
+from unittest import mock
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
+from recipes import scaling
 from recipes.models import User, Recipe, Comment, RecipeIngredient, Rating, CuisineTag
 from recipes.models.favourite import Favourite
+from recipes.views.recipe_view import COMMENTS_PER_PAGE
 
 
 class RecipeViewTestCase(TestCase):
@@ -269,6 +273,49 @@ class RecipeViewTestCase(TestCase):
         self.assertEqual(ingredients[0]['amount'], 200)
         self.assertEqual(ingredients[1]['amount'], 400)
 
+    def test_servings_promotes_units(self):
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.get(self.url + '?servings=10')
+        ingredients = response.context['ingredients_list']
+        self.assertEqual((ingredients[0]['amount'], ingredients[0]['units']), (1, 'kg'))
+        self.assertEqual((ingredients[1]['amount'], ingredients[1]['units']), (2, 'kg'))
+
+    def test_scale_endpoint_returns_scaled_ingredients(self):
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.get(reverse('scale_recipe', args=[self.recipe.id]), {'servings': 15})
+        self.assertEqual(response.json(), {
+            'servings': 15,
+            'ingredients': [
+                {'name': 'Ingredient 1', 'amount': 1.5, 'units': 'kg'},
+                {'name': 'Ingredient 2', 'amount': 3, 'units': 'kg'},
+            ],
+        })
+
+    def test_scale_endpoint_uses_default_for_invalid_servings(self):
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.get(reverse('scale_recipe', args=[self.recipe.id]), {'servings': 'invalid'})
+        self.assertEqual(response.json()['servings'], 1)
+        self.assertEqual(response.json()['ingredients'][0]['amount'], 100)
+
+    def test_scale_endpoint_for_missing_recipe_is_not_found(self):
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.get(reverse('scale_recipe', args=[self.recipe.id + 1]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_scale_endpoint_for_missing_recipe_caches_nothing(self):
+        self.client.login(username='@johndoe', password='Password123')
+        with mock.patch.object(scaling, 'get_vector') as get_vector:
+            self.client.get(reverse('scale_recipe', args=[self.recipe.id + 1]))
+        get_vector.assert_not_called()
+
+    def test_ingredient_without_units_renders(self):
+        cache.clear()
+        RecipeIngredient.objects.filter(recipe=self.recipe).update(units='')
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['ingredients_list'][0]['units'], '')
+
     def test_invalid_servings_uses_default(self):
         self.client.login(username='@johndoe', password='Password123')
         response = self.client.get(self.url + '?servings=invalid')
@@ -282,4 +329,83 @@ class RecipeViewTestCase(TestCase):
     def test_rating_keeps_servings_param(self):
         self.client.login(username='@johndoe', password='Password123')
         response = self.client.post(self.url + '?servings=2', {'rating': 4, 'submit_rating': True})
-        self.assertRedirects(response, self.url + '?servings=2')
\ No newline at end of file
+        self.assertRedirects(response, self.url + '?servings=2')
+
+    def test_query_count_is_fixed(self):
+        self.client.login(username='@johndoe', password='Password123')
+        self.recipe.cuisine_tags.add(CuisineTag.objects.create(name='Italian'))
+        Rating.objects.create(user=self.user, recipe=self.recipe, rating=4)
+        Favourite.objects.create(user=self.user, recipe=self.recipe)
+        for index in range(5):
+            commenter = User.objects.create_user(
+                username=f'@commenter{index}', email=f'commenter{index}@example.com', password='Password123'
+            )
+            Comment.objects.create(recipe=self.recipe, author=commenter, text=f'Comment {index}')
+        with self.assertNumQueries(8):
+            response = self.client.get(self.url)
+        self.assertContains(response, '@commenter4')
+        self.assertContains(response, 'Italian')
+        self.assertTrue(response.context['has_favourited'])
+        self.assertEqual(response.context['user_rating'].rating, 4)
+
+    def test_comment_count_badge_uses_stored_count(self):
+        Comment.objects.create(recipe=self.recipe, author=self.user, text='Lovely')
+        Recipe.objects.filter(pk=self.recipe.pk).update(comment_count=42)
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.get(self.url)
+        self.assertContains(response, '<span class="badge bg-secondary">42</span>', html=True)
+
+    def test_first_page_of_comments_is_shown_inline(self):
+        self._create_comments(COMMENTS_PER_PAGE + 2)
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.get(self.url)
+        comments = response.context['comments']
+        self.assertEqual(len(comments), COMMENTS_PER_PAGE)
+        self.assertEqual(comments[0].text, f'Comment {COMMENTS_PER_PAGE + 1}')
+        self.assertContains(response, f'?comments_cursor={comments.next_cursor}#comments')
+        self.assertContains(response, reverse('recipe_comments', args=[self.recipe.id]))
+
+    def test_comments_cursor_shows_next_page(self):
+        self._create_comments(COMMENTS_PER_PAGE + 2)
+        self.client.login(username='@johndoe', password='Password123')
+        cursor = self.client.get(self.url).context['comments'].next_cursor
+        response = self.client.get(self.url, {'comments_cursor': cursor})
+        self.assertEqual([comment.text for comment in response.context['comments']], ['Comment 1', 'Comment 0'])
+        self.assertContains(response, 'Newest comments')
+
+    def test_comments_endpoint_renders_next_page(self):
+        self._create_comments(COMMENTS_PER_PAGE + 2)
+        self.client.login(username='@johndoe', password='Password123')
+        cursor = self.client.get(self.url).context['comments'].next_cursor
+        comments_url = reverse('recipe_comments', args=[self.recipe.id])
+        response = self.client.get(comments_url, {'cursor': cursor})
+        self.assertTemplateUsed(response, 'partials/comment_page.html')
+        self.assertContains(response, 'Comment 1')
+        self.assertContains(response, 'Comment 0')
+        self.assertNotContains(response, 'Comment 2<')
+        self.assertNotContains(response, 'Load more comments')
+
+    def test_comments_endpoint_returns_json(self):
+        self._create_comments(COMMENTS_PER_PAGE + 2)
+        self.client.login(username='@johndoe', password='Password123')
+        comments_url = reverse('recipe_comments', args=[self.recipe.id])
+        data = self.client.get(comments_url, {'format': 'json'}).json()
+        self.assertEqual(data['count'], COMMENTS_PER_PAGE + 2)
+        self.assertEqual(len(data['comments']), COMMENTS_PER_PAGE)
+        self.assertEqual(data['comments'][0]['author'], '@johndoe')
+        data = self.client.get(comments_url, {'format': 'json', 'cursor': data['next_cursor']}).json()
+        self.assertEqual([comment['text'] for comment in data['comments']], ['Comment 1', 'Comment 0'])
+        self.assertIsNone(data['next_cursor'])
+
+    def test_comments_endpoint_for_missing_recipe_is_not_found(self):
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.get(reverse('recipe_comments', args=[self.recipe.id + 1]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_comments_endpoint_redirects_when_not_logged_in(self):
+        response = self.client.get(reverse('recipe_comments', args=[self.recipe.id]))
+        self.assertEqual(response.status_code, 302)
+
+    def _create_comments(self, count):
+        for index in range(count):
+            Comment.objects.create(recipe=self.recipe, author=self.user, text=f'Comment {index}')
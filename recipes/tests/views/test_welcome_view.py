@@ -1,8 +1,11 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from recipes import versioned_cache
 from recipes.models import User, Recipe, Rating, RecipeIngredient
 from recipes.forms import RatingForm
-from recipes.tests.helpers import reverse_with_next
+from recipes.tests.helpers import reverse_with_next, use_file_cache
 
 
 class WelcomeViewTestCase(TestCase):
@@ -196,4 +199,69 @@ class WelcomeViewTestCase(TestCase):
         response = self.client.get(self.url, {'cuisine_tags': 'Mexican', 'dietary_tags': 'Gluten-Free'})
         context_data = response.context['recipe_data']
         self.assertEqual(len(context_data), 1)
-        self.assertEqual(context_data[0]['recipe'].recipe_name, 'Vanilla Cupcakes')
\ No newline at end of file
+        self.assertEqual(context_data[0]['recipe'].recipe_name, 'Vanilla Cupcakes')
+
+    def test_sort_by_highest_rated_across_pages(self):
+        for index in range(12):
+            Recipe.objects.create(author=self.user, recipe_name=f'Unrated {index}', description='Plain')
+        response = self.client.get(self.url, {'sort': 'highest', 'page': '2'})
+        context_data = response.context['recipe_data']
+
+        self.assertEqual(len(context_data), 3)
+        self.assertNotIn('Chocolate Cake', [item['recipe'].recipe_name for item in context_data])
+        self.assertTrue(all(item['avg'] is None for item in context_data))
+
+    def test_average_rating_in_recipe_data(self):
+        response = self.client.get(self.url, {'sort': 'highest'})
+        context_data = response.context['recipe_data']
+
+        self.assertEqual(context_data[0]['avg'], 5.0)
+        self.assertEqual(context_data[1]['avg'], 3.5)
+
+    def test_query_count_does_not_grow_with_recipe_count(self):
+        small_count = self._count_welcome_queries()
+        for index in range(30):
+            recipe = Recipe.objects.create(author=self.testUser, recipe_name=f'Extra {index}', description='More')
+            Rating.objects.create(user=self.user, recipe=recipe, rating=index % 5 + 1)
+        self.assertEqual(self._count_welcome_queries(), small_count)
+
+    def test_logged_in_query_count_does_not_grow_with_page_size(self):
+        self.client.login(username=self.user.username, password="Password123")
+        small_count = self._count_welcome_queries()
+        for index in range(12):
+            recipe = Recipe.objects.create(author=self.testUser, recipe_name=f'Extra {index}', description='More')
+            Rating.objects.create(user=self.user, recipe=recipe, rating=index % 5 + 1)
+            self.user.favourite_recipe(recipe)
+        self.assertEqual(self._count_welcome_queries(), small_count)
+
+    def test_recipe_data_marks_favourites(self):
+        self.client.login(username=self.user.username, password="Password123")
+        self.user.favourite_recipe(self.midRatedRecipe)
+        response = self.client.get(self.url)
+        favourites = {item['recipe'] for item in response.context['recipe_data'] if item['is_favourite']}
+        self.assertEqual(favourites, {self.midRatedRecipe})
+
+    def test_recipe_page_is_cached_until_a_rating_changes(self):
+        use_file_cache(self)
+        versioned_cache.stats.reset()
+        self.client.login(username=self.user.username, password="Password123")
+        self.client.get(self.url, {'sort': 'highest'})
+        response = self.client.get(self.url, {'sort': 'highest'})
+        self.assertEqual(versioned_cache.stats.counts('welcome_page'), (1, 1))
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
+        Rating.objects.create(user=self.testUser, recipe=self.lowRatedRecipe, rating=5)
+        Rating.objects.create(user=self.user, recipe=self.lowRatedRecipe, rating=5)
+        response = self.client.get(self.url, {'sort': 'highest'})
+        self.assertEqual(response.context['recipe_data'][0]['recipe'], self.lowRatedRecipe)
+        self.assertEqual(versioned_cache.stats.counts('welcome_page'), (1, 2))
+
+    def test_following_filter_is_not_cached(self):
+        versioned_cache.stats.reset()
+        self.client.login(username=self.user.username, password="Password123")
+        self.client.get(self.url, {'filter': 'following'})
+        self.assertEqual(versioned_cache.stats.counts('welcome_page'), (0, 0))
+
+    def _count_welcome_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'sort': 'highest'})
+        return len(queries)
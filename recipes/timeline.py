@@ -0,0 +1,98 @@
+"""
+Materialized following timelines.
+
+Each user's timeline holds one ``TimelineEntry`` per recipe by an author they
+follow. Entries are fanned out when a recipe is published, backfilled when a
+follow starts and pruned when it ends; deleting a recipe or user cascades to
+its entries. ``rebuild_timelines`` recreates every entry from Follow, e.g.
+after bulk inserts that bypass signals.
+
+Entries carry their recipe's publication date, so the newest-first timeline
+is paginated on the entry table alone, reading one range of its user/date
+index per page.
+"""
+from django.db import connection, transaction
+from recipes import pagination
+from recipes.models import Follow, Recipe, TimelineEntry
+
+TIMELINE_TABLE = TimelineEntry._meta.db_table
+
+INSERT_SQL = f"""
+    INSERT INTO {TIMELINE_TABLE} (user_id, recipe_id, publication_date)
+    SELECT follow.follower_id, recipe.id, recipe.publication_date
+    FROM {Follow._meta.db_table} AS follow
+    INNER JOIN {Recipe._meta.db_table} AS recipe ON recipe.author_id = follow.following_id
+"""
+
+MISSING_SQL = f"""
+    NOT EXISTS (
+        SELECT 1 FROM {TIMELINE_TABLE} AS entry
+        WHERE entry.user_id = follow.follower_id AND entry.recipe_id = recipe.id
+    )
+"""
+
+
+def following_recipes(recipes, user):
+    """Restrict a recipe queryset to recipes in the user's following timeline."""
+    return recipes.filter(timeline_entries__user=user)
+
+
+def following_page(user, per_page, page_number=None, cursor=None):
+    """
+    Return a page of the recipes in the user's timeline, newest first.
+
+    The entries are ordered and paginated on their own table, and each
+    page's recipes and authors are fetched in the same query.
+    """
+    entries = (
+        TimelineEntry.objects.filter(user=user)
+        .select_related('recipe__author')
+        .order_by('-publication_date', '-recipe_id')
+    )
+    page = pagination.paginate(entries, per_page, page_number, cursor)
+    page.object_list = [entry.recipe for entry in page.object_list]
+    return page
+
+
+def update_publication_date(recipe_id, publication_date):
+    """Copy a recipe's changed publication date onto its timeline entries."""
+    TimelineEntry.objects.filter(recipe_id=recipe_id).exclude(
+        publication_date=publication_date
+    ).update(publication_date=publication_date)
+
+
+def publish_recipe(recipe_id):
+    """Add a recipe to the timeline of every follower of its author."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'{INSERT_SQL} WHERE recipe.id = %s AND {MISSING_SQL}', [recipe_id])
+
+
+def backfill(follower_id, author_id):
+    """Add every recipe by an author to a new follower's timeline."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{INSERT_SQL} WHERE follow.follower_id = %s AND follow.following_id = %s AND {MISSING_SQL}',
+            [follower_id, author_id]
+        )
+
+
+def prune(follower_id, author_id):
+    """Remove an unfollowed author's recipes from a user's timeline."""
+    TimelineEntry.objects.filter(
+        user_id=follower_id,
+        recipe__in=Recipe.objects.filter(author_id=author_id).values('id')
+    ).delete()
+
+
+def rebuild_timelines():
+    """
+    Recreate every timeline entry from the current follows and recipes.
+
+    Returns:
+        Number of timeline entries written.
+    """
+    with transaction.atomic():
+        TimelineEntry.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(INSERT_SQL)
+        return TimelineEntry.objects.count()
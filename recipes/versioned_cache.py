@@ -0,0 +1,186 @@
+"""
+Versioned cache for data derived from several models.
+
+Every cached value is stored under a key built from its name, its key parts
+and the current version of each entity it was computed from: a recipe, a
+user, the set of all tags, or the catalogue, which changes whenever what
+recipe lists show or how they sort does. Signal receivers bump an entity's version
+whenever one of its rows, or a row that belongs to it, is saved or deleted.
+The next lookup then builds a key nobody has stored under, recomputes the
+value, and the stale one is left to expire.
+
+Versions live in the default cache next to the values, so with the file
+backend every process on the machine sees the same versions. A version that
+was evicted starts again from the current time in nanoseconds, which is
+always newer than any version it had before.
+
+Nothing is cached unless the default cache is shared between processes.
+With the process-local ``LocMemCache`` a bump would only reach the process
+that made it, and the others would go on serving values computed from the
+old rows until they expired, so there ``cached`` computes every value and
+callers storing values themselves check ``is_shared`` first. Deployments
+running more than one process set ``CACHE_BACKEND`` to ``'file'``.
+
+A version is bumped when a row changes and again when the transaction
+commits. Without the second bump, a request that reads the version between
+the first bump and the commit would store a value computed from the old
+rows under the new version.
+
+Recomputation goes through ``recipes.single_flight``, so only one request
+at a time computes a missing value. With ``stale=True`` the others are
+served the value last computed for the same key parts meanwhile.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from recipes import single_flight
+
+RECIPE = 'recipe'
+USER = 'user'
+TAGS = 'tags'
+CATALOGUE = 'catalogue'
+
+STALE_TIMEOUT = 60 * 60 * 24
+
+
+class CacheStats:
+    """
+    Thread-safe counters of lookup outcomes, in total and per cached name.
+
+    A lookup is a miss if it computed the value, and a hit otherwise,
+    including when it was served a stale value or one another request
+    computed while it waited.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.by_name = Counter()
+
+    def record(self, name, outcome):
+        """Count one lookup of a cached name with a single_flight outcome."""
+        with self._lock:
+            if outcome == single_flight.MISS:
+                self.misses += 1
+            else:
+                self.hits += 1
+            self.by_name[(name, outcome)] += 1
+
+    def counts(self, name):
+        """Return the (hits, misses) of one cached name."""
+        with self._lock:
+            outcomes = {outcome: count for (counted, outcome), count in self.by_name.items() if counted == name}
+        misses = outcomes.pop(single_flight.MISS, 0)
+        return sum(outcomes.values()), misses
+
+    def count(self, name, outcome):
+        """Return how many lookups of a cached name had an outcome."""
+        with self._lock:
+            return self.by_name[(name, outcome)]
+
+    def reset(self):
+        """Set every count back to zero."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.by_name.clear()
+
+
+stats = CacheStats()
+
+
+def is_shared():
+    """Check whether the default cache is shared between processes, so every process sees each bump."""
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def version_key(entity, pk=None):
+    """Cache key of the version of one entity, or of an entity with no id such as TAGS."""
+    return f'versioned:version:{entity}' if pk is None else f'versioned:version:{entity}:{pk}'
+
+
+def get_versions(versions):
+    """
+    Return the current version of each (entity, pk) pair, in order.
+
+    Missing versions are started at the current time in nanoseconds.
+    """
+    keys = [version_key(entity, pk) for entity, pk in versions]
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def bump(entity, pk=None):
+    """Invalidate every value computed from an entity, now and when the transaction commits."""
+    key = version_key(entity, pk)
+    increment(key)
+    transaction.on_commit(lambda: increment(key))
+
+
+def increment(key):
+    """Move a version on by one, leaving it to restart if it is not stored."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def value_key(key_parts, versions):
+    """Cache key of a value at the current versions of the given (entity, pk) pairs."""
+    return value_key_at(key_parts, get_versions(versions))
+
+
+def value_key_at(key_parts, current_versions):
+    """
+    Cache key of a value at version numbers already read with `get_versions`.
+
+    Lets callers building many keys read every version in one cache call.
+    The parts after the name are hashed.
+    """
+    name, *parts = key_parts
+    digest = hashlib.sha256(repr((parts, current_versions)).encode()).hexdigest()
+    return f'versioned:value:{name}:{digest}'
+
+
+def stale_key(key_parts):
+    """Cache key of the value last computed for the key parts, at whatever versions."""
+    name, *parts = key_parts
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()
+    return f'versioned:stale:{name}:{digest}'
+
+
+def cached(key_parts, versions, ttl, compute, stale=False):
+    """
+    Return a cached value, computing and storing it on a miss.
+
+    Without a shared cache the value is computed on every call and counted
+    as a miss.
+
+    Args:
+        key_parts: Tuple of a name for the value followed by anything else
+            that tells values of that name apart, e.g. ``('recipe_data', 7)``.
+        versions: (entity, pk) pairs of the entities the value is computed
+            from, e.g. ``[(RECIPE, 7), (TAGS, None)]``.
+        ttl: Seconds to keep the value for, or None for no expiry.
+        compute: Function called with no arguments to compute the value.
+        stale: Whether, while another request recomputes the value, to
+            serve the one last computed rather than wait for it.
+    """
+    if not is_shared():
+        stats.record(key_parts[0], single_flight.MISS)
+        return compute()
+    value, outcome = single_flight.fetch(
+        value_key(key_parts, versions), compute, ttl,
+        stale_key=stale_key(key_parts) if stale else None, stale_ttl=STALE_TIMEOUT,
+    )
+    stats.record(key_parts[0], outcome)
+    return value
@@ -14,3 +14,4 @@ from .followers_view import *
 from .favourites_view import *
 from .delete_recipe_view import *
 from .edit_recipe_view import *
+from .avatar_view import *
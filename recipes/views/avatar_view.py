@@ -0,0 +1,30 @@
+from django.http import FileResponse, Http404
+from recipes.avatars import AVATAR_MAX_AGE, AVATAR_SIZES, get_avatar_path, get_default_avatar_path
+
+
+def avatar(request, email_hash, size):
+    """Serve the locally generated avatar of a user's email hash, drawing it on first request."""
+    path = get_avatar_path(email_hash, check_size(size))
+    if path is None:
+        raise Http404('No user has this email hash.')
+    return image_response(path)
+
+
+def default_avatar(request, size):
+    """Serve the default avatar shown for users without an email hash."""
+    return image_response(get_default_avatar_path(check_size(size)))
+
+
+def check_size(size):
+    """Return a requested avatar size as an int, raising Http404 if it is not generated."""
+    size = int(size)
+    if size not in AVATAR_SIZES:
+        raise Http404('Unsupported avatar size.')
+    return size
+
+
+def image_response(path):
+    """Stream a stored avatar with headers letting it be cached for a year."""
+    response = FileResponse(open(path, 'rb'), content_type='image/png')
+    response['Cache-Control'] = f'public, max-age={AVATAR_MAX_AGE}, immutable'
+    return response
@@ -1,4 +1,5 @@
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.http import HttpResponseRedirect
 from django.shortcuts import render
 from django.urls import reverse
@@ -198,9 +199,10 @@ def save_recipe(
             ingredient_error=ingredient_error, instruction_error=instruction_error
         )
 
-    recipe = form.save()
-    save_ingredients_to_recipe(recipe, ingredients)
-    save_tags_to_recipe(recipe, cuisine_tags, dietary_tags)
+    with transaction.atomic():
+        recipe = form.save()
+        save_ingredients_to_recipe(recipe, ingredients)
+        save_tags_to_recipe(recipe, cuisine_tags, dietary_tags)
     return HttpResponseRedirect(reverse('recipe', kwargs={'recipe_id': recipe.id}))
 
 
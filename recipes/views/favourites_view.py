@@ -1,8 +1,10 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse
-from recipes.models import Recipe
+from recipes.models import Recipe, upsert
 
 
 @login_required
@@ -10,11 +12,10 @@ def favourite_recipe(request, recipe_id):
     """Add a recipe to the current user's favourites."""
     recipe = get_object_or_404(Recipe, id=recipe_id)
 
-    if request.user.has_favourited(recipe):
-        messages.info(request, f"You already favourited {recipe.recipe_name}")
-    else:
-        request.user.favourite_recipe(recipe)
+    if request.user.favourite_recipe(recipe):
         messages.success(request, f"Added {recipe.recipe_name} to favourites")
+    else:
+        messages.info(request, f"You already favourited {recipe.recipe_name}")
     return redirect(request.META.get('HTTP_REFERER', 'home'))
 
 
@@ -23,14 +24,55 @@ def unfavourite_recipe(request, recipe_id):
     """Remove a recipe from the current user's favourites."""
     recipe = get_object_or_404(Recipe, id=recipe_id)
 
-    if not request.user.has_favourited(recipe):
+    if request.user.unfavourite_recipe(recipe):
+        messages.success(request, f"Removed {recipe.recipe_name} from favourites")
+    else:
         messages.info(request, f"{recipe.recipe_name} is not in your favourites")
+    return redirect(request.META.get('HTTP_REFERER', 'home'))
+
+
+@login_required
+def toggle_favourite(request, recipe_id):
+    """
+    Add a recipe to or remove it from the current user's favourites.
+
+    The posted `favourite` field, '1' or '0', gives the state wanted; without
+    it the current state is flipped. Responds with JSON holding the new state,
+    count and heart button when `format=json` is given, with just the button
+    to scripts, and otherwise redirects back with a message.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    recipe = get_object_or_404(Recipe.objects.only('id', 'recipe_name'), id=recipe_id)
+    result = set_favourite(request.user, recipe, request.POST.get('favourite'))
+    is_favourite = result == upsert.CREATED or (result is None and request.POST.get('favourite') == '1')
+    html = render_to_string(
+        'partials/favourite_button.html', {'recipe_id': recipe.id, 'is_favourite': is_favourite}, request
+    )
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'recipe_id': recipe.id, 'is_favourite': is_favourite,
+            'favourite_count': request.user.favourite_count, 'html': html,
+        })
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return HttpResponse(html)
+    if is_favourite:
+        messages.success(request, f"Added {recipe.recipe_name} to favourites")
     else:
-        request.user.unfavourite_recipe(recipe)
         messages.success(request, f"Removed {recipe.recipe_name} from favourites")
     return redirect(request.META.get('HTTP_REFERER', 'home'))
 
 
+def set_favourite(user, recipe, wanted):
+    """Favourite or unfavourite a recipe as wanted ('1', '0' or None to flip), returning the upsert result."""
+    if wanted == '1':
+        return user.favourite_recipe(recipe)
+    if wanted == '0':
+        return user.unfavourite_recipe(recipe)
+    return user.favourite_recipe(recipe) or user.unfavourite_recipe(recipe)
+
+
 @login_required
 def favourites_list(request):
     """Redirect to the profile page with favourites tab selected."""
@@ -1,7 +1,10 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
-from recipes.models import User
+from django.template.loader import render_to_string
+from django.urls import reverse
+from recipes.models import User, upsert
 
 
 @login_required
@@ -11,11 +14,10 @@ def follow_user(request, user_id):
 
     if request.user == user_to_follow:
         messages.error(request, "You cannot follow yourself.")
-    elif request.user.is_following(user_to_follow):
-        messages.info(request, f"You are already following {user_to_follow.username}")
-    else:
-        request.user.follow(user_to_follow)
+    elif request.user.follow(user_to_follow):
         messages.success(request, f"You are now following {user_to_follow.username}")
+    else:
+        messages.info(request, f"You are already following {user_to_follow.username}")
     return redirect('user_profile', user_id=user_id)
 
 
@@ -26,9 +28,56 @@ def unfollow_user(request, user_id):
 
     if request.user == user_to_unfollow:
         messages.error(request, "You cannot unfollow yourself.")
-    elif not request.user.is_following(user_to_unfollow):
-        messages.info(request, f"You are not following {user_to_unfollow.username}")
-    else:
-        request.user.unfollow(user_to_unfollow)
+    elif request.user.unfollow(user_to_unfollow):
         messages.success(request, f"You have unfollowed {user_to_unfollow.username}")
+    else:
+        messages.info(request, f"You are not following {user_to_unfollow.username}")
     return redirect('user_profile', user_id=user_id)
+
+
+@login_required
+def toggle_follow(request, user_id):
+    """
+    Follow or unfollow another user.
+
+    The posted `follow` field, '1' or '0', gives the state wanted; without it
+    the current state is flipped. Responds with JSON holding the new state,
+    both users' counts and the follow button when `format=json` is given,
+    with just the button to scripts, and otherwise redirects back with a
+    message.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    profile_user = get_object_or_404(User, id=user_id)
+    if request.user == profile_user:
+        return HttpResponseBadRequest('You cannot follow yourself.')
+    result = set_following(request.user, profile_user, request.POST.get('follow'))
+    is_following = result == upsert.CREATED or (result is None and request.POST.get('follow') == '1')
+    html = render_to_string(
+        'partials/follow_button.html',
+        {'profile_user': profile_user, 'is_following': is_following, 'compact': request.POST.get('compact') == '1'},
+        request
+    )
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'user_id': profile_user.id, 'is_following': is_following,
+            'follower_count': profile_user.follower_count,
+            'following_count': request.user.following_count, 'html': html,
+        })
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return HttpResponse(html)
+    if is_following:
+        messages.success(request, f"You are now following {profile_user.username}")
+    else:
+        messages.success(request, f"You have unfollowed {profile_user.username}")
+    return redirect(request.META.get('HTTP_REFERER') or reverse('user_profile', kwargs={'user_id': user_id}))
+
+
+def set_following(user, profile_user, wanted):
+    """Follow or unfollow a user as wanted ('1', '0' or None to flip), returning the upsert result."""
+    if wanted == '1':
+        return user.follow(profile_user)
+    if wanted == '0':
+        return user.unfollow(profile_user)
+    return user.follow(profile_user) or user.unfollow(profile_user)
@@ -1,46 +1,113 @@
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import Http404
 from django.shortcuts import render
-from recipes.helpers import build_recipe_list
-from recipes.models import Recipe
+from recipes import pagination
+from recipes.helpers import build_recipe_cards
+from recipes.models import Follow, Recipe
+
+FOLLOWS_PER_PAGE = 20
 
 
 @login_required
 def profile_page_view(request):
-    """Display the logged-in user's profile with tabbed sections."""
+    """
+    Display the logged-in user's profile with tabbed sections.
+
+    Only the selected tab's data is loaded and rendered; the other tabs are
+    fetched from `profile_tab` when opened.
+    """
     user = request.user
     tab = request.GET.get('tab', 'account')
-    user_recipes = Recipe.objects.filter(author=user).order_by('-publication_date')
-    favourites = user.get_favourites().order_by('-publication_date')
+    context = build_profile_context(user, tab)
+    if tab in TAB_BUILDERS:
+        context.update(TAB_BUILDERS[tab](request))
+    return render(request, 'profile_page.html', context)
 
-    recipes_page_obj = paginate(user_recipes, request, 'recipes_page')
-    favourites_page_obj = paginate(favourites, request, 'favourites_page')
 
-    favourite_ids = set(user.get_favourites().values_list('id', flat=True))
-    recipes_with_fav = build_recipe_list(recipes_page_obj, favourite_ids)
+@login_required
+def profile_tab(request, tab):
+    """Render the contents of one profile tab on its own, for loading a tab on demand."""
+    if tab not in TAB_BUILDERS:
+        raise Http404('Unknown profile tab.')
+    context = build_profile_context(request.user, tab)
+    context.update(TAB_BUILDERS[tab](request))
+    return render(request, f'partials/profile_{tab}_tab.html', context)
 
-    context = build_profile_context(
-        user, tab, user_recipes, recipes_page_obj, recipes_with_fav,
-        favourites, favourites_page_obj
-    )
-    return render(request, 'profile_page.html', context)
+
+def paginate(queryset, request, page_param, cursor_param):
+    """Paginate a queryset using the given page or cursor parameter."""
+    return pagination.paginate(queryset, 6, request.GET.get(page_param, 1), request.GET.get(cursor_param))
 
 
-def paginate(queryset, request, page_param):
-    """Paginate a queryset using the given page parameter."""
-    paginator = Paginator(queryset, 6)
-    page_number = request.GET.get(page_param, 1)
-    return paginator.get_page(page_number)
+def paginate_follows(follows, request, cursor_param, user_field):
+    """
+    Return one page of follow relationships by keyset on the Follow id, as a page of users.
 
+    Args:
+        follows: Follow queryset to page through.
+        request: The current request, holding the cursor parameter.
+        cursor_param: Name of the query parameter carrying the cursor.
+        user_field: 'follower' or 'following', the side of each Follow to list.
+    """
+    follows = follows.select_related(user_field).order_by('-id')
+    page = pagination.CursorPaginator(follows, FOLLOWS_PER_PAGE).get_page(request.GET.get(cursor_param))
+    users = [getattr(follow, user_field) for follow in page]
+    return pagination.CursorPage(users, page.next_cursor, page.previous_cursor)
 
-def build_profile_context(user, tab, user_recipes, recipes_page_obj, recipes_with_fav, favourites, favourites_page_obj):
-    """Build the context dict for the profile page."""
+
+def build_profile_context(user, tab):
+    """Build the context dict shared by every tab of the profile page."""
     return {
         'profile_user': user, 'selected_tab': tab, 'is_own_profile': True,
-        'followers': user.get_followers(), 'following': user.get_following(),
-        'user_recipes': user_recipes, 'recipes_page_obj': recipes_page_obj,
-        'recipes_with_fav': recipes_with_fav, 'favourites_page_obj': favourites_page_obj,
-        'followers_count': user.get_followers_count(), 'following_count': user.get_following_count(),
-        'recipes_count': user_recipes.count(), 'favourites': favourites,
-        'favourites_count': user.get_favourites_count(),
+        'followers_count': user.follower_count, 'following_count': user.following_count,
+        'recipes_count': user.recipe_count, 'favourites_count': user.favourite_count,
+    }
+
+
+def build_recipes_tab(request):
+    """Build the context of the recipes tab."""
+    user_recipes = (
+        Recipe.objects.filter(author=request.user).select_related('author').order_by('-publication_date', '-id')
+    )
+    recipes_page_obj = paginate(user_recipes, request, 'recipes_page', 'recipes_cursor')
+    return {
+        'recipes_page_obj': recipes_page_obj,
+        'recipes_with_fav': build_recipe_cards(recipes_page_obj, request.user),
     }
+
+
+def get_favourite_recipes(user):
+    """Build the queryset of a user's favourite recipes as the favourites tab lists them, newest first."""
+    return user.get_favourites().select_related('author').order_by('-publication_date', '-id')
+
+
+def build_favourites_tab(request):
+    """Build the context of the favourites tab."""
+    favourites = get_favourite_recipes(request.user)
+    favourites_page_obj = paginate(favourites, request, 'favourites_page', 'favourites_cursor')
+    return {
+        'favourites_page_obj': favourites_page_obj,
+        'favourite_cards': build_recipe_cards(favourites_page_obj, request.user),
+    }
+
+
+def build_followers_tab(request):
+    """Build the context of the followers tab."""
+    follows = Follow.objects.filter(following=request.user)
+    followers = paginate_follows(follows, request, 'followers_cursor', 'follower')
+    return {'followers': followers, 'follow_relations': request.user.get_follow_relations(followers)}
+
+
+def build_following_tab(request):
+    """Build the context of the following tab."""
+    follows = Follow.objects.filter(follower=request.user)
+    following = paginate_follows(follows, request, 'following_cursor', 'following')
+    return {'following': following, 'follow_relations': request.user.get_follow_relations(following)}
+
+
+TAB_BUILDERS = {
+    'recipes': build_recipes_tab,
+    'favourites': build_favourites_tab,
+    'followers': build_followers_tab,
+    'following': build_following_tab,
+}
@@ -3,7 +3,7 @@ from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseNotAllowed
 from django.shortcuts import redirect, get_object_or_404
 from recipes.forms import RatingForm
-from recipes.models import Recipe, Rating
+from recipes.models import Recipe, Rating, upsert
 
 
 @login_required
@@ -13,15 +13,11 @@ def rate_recipe(request, pk):
         return HttpResponseNotAllowed(['POST'])
 
     recipe = get_object_or_404(Recipe, pk=pk)
-    existing_rating = Rating.objects.filter(user=request.user, recipe=recipe).first()
 
-    form = RatingForm(request.POST, instance=existing_rating)
+    form = RatingForm(request.POST)
     if form.is_valid():
-        rating = form.save(commit=False)
-        rating.recipe = recipe
-        rating.user = request.user
-        rating.save()
-        action = "updated" if existing_rating else "submitted"
+        result = Rating.rate(request.user, recipe, form.cleaned_data['rating'])
+        action = "submitted" if result == upsert.CREATED else "updated"
         messages.success(request, f'Your rating has been successfully {action}')
     else:
         messages.error(request, "Invalid rating submission. Please try again!")
@@ -1,20 +1,26 @@
 from django.contrib.auth.decorators import login_required
-from django.db.models import Avg
-from django.http import HttpResponseRedirect
-from django.shortcuts import render, redirect
+from django.db.models import Exists, OuterRef, Prefetch, Value
+from django.http import HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404, render, redirect
 from django.urls import reverse
+from recipes import scaling, versioned_cache
 from recipes.forms import CommentForm, RatingForm
-from recipes.models import Recipe, Comment, Rating
+from recipes.models import Recipe, Comment, Favourite, Rating
+from recipes.pagination import CursorPaginator
+from recipes.versioned_cache import RECIPE, TAGS
+
+COMMENTS_PER_PAGE = 10
+RECIPE_DATA_TIMEOUT = 60 * 60
 
 
 @login_required
 def recipe_view(request, recipe_id):
     """Display a recipe with its comments and ratings."""
-    recipe = Recipe.objects.filter(id=recipe_id).first()
+    recipe = load_recipe(recipe_id, request.user)
     if not recipe:
         return render(request, 'recipe.html', get_not_found_context())
 
-    user_rating = Rating.objects.filter(user=request.user, recipe=recipe).first()
+    user_rating = recipe.viewer_ratings[0] if recipe.viewer_ratings else None
     forms_result = get_forms_for_request(request, recipe, user_rating)
 
     if isinstance(forms_result, HttpResponseRedirect):
@@ -25,31 +31,111 @@ def recipe_view(request, recipe_id):
     return render(request, 'recipe.html', context)
 
 
-def get_recipe_data(recipe, servings=1):
-    """Get ingredients and instructions, adjusting amounts for servings."""
-    ingredients_list = recipe.recipeingredient_set.all()
-    instructions = recipe.instructions.splitlines() if recipe.instructions else []
-    adjusted_ingredients = [adjust_ingredient(ing, servings) for ing in ingredients_list]
-    return adjusted_ingredients, instructions
+@login_required
+def recipe_comments(request, recipe_id):
+    """
+    Return the page of a recipe's comments after a cursor.
+
+    Responds with the rendered comments and their "Load more" link, which the
+    recipe page appends in place, or with JSON when `format=json` is given.
+    """
+    recipe = get_object_or_404(Recipe.objects.only('id', 'comment_count'), id=recipe_id)
+    comments = get_comment_page(recipe, request.GET.get('cursor'))
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [serialize_comment(comment) for comment in comments],
+            'next_cursor': comments.next_cursor,
+            'count': recipe.comment_count,
+        })
+    return render(request, 'partials/comment_page.html', {'recipe': recipe, 'comments': comments})
+
+
+@login_required
+def scale_recipe(request, recipe_id):
+    """
+    Return a recipe's ingredient list scaled to `servings`, as JSON.
+
+    The recipe page calls this to update its ingredients card in place
+    instead of reloading the whole page.
+    """
+    get_object_or_404(Recipe.objects.only('id'), id=recipe_id)
+    vector = scaling.get_vector(recipe_id)
+    servings = get_servings_from_request(request)
+    return JsonResponse({'servings': servings, 'ingredients': scaling.scale(vector, servings)})
+
+
+def load_recipe(recipe_id, user):
+    """
+    Load a recipe with everything the recipe page shows, in a fixed number of queries.
+
+    The author and the viewer's favourite status come with the recipe row
+    and the viewer's own rating is prefetched. Rating totals and the comment
+    count are stored on the recipe itself, the ingredients are cached by
+    `scaling.get_vector` and the tags by `build_recipe_data`, and comments are loaded a page at a time by
+    `get_comment_page`.
+
+    Returns:
+        The Recipe, with `is_favourited` and `viewer_ratings` attributes,
+        or None if it does not exist.
+    """
+    return (
+        Recipe.objects.filter(id=recipe_id)
+        .select_related('author')
+        .annotate(is_favourited=get_favourited_expression(user))
+        .prefetch_related(Prefetch('ratings', queryset=get_viewer_ratings(user), to_attr='viewer_ratings'))
+        .first()
+    )
+
+
+def get_favourited_expression(user):
+    """Build an annotation telling whether the user has favourited each recipe."""
+    if not user.is_authenticated:
+        return Value(False)
+    return Exists(Favourite.objects.filter(recipe=OuterRef('pk'), user=user))
+
+
+def get_viewer_ratings(user):
+    """Build the queryset of the user's own ratings to prefetch onto a recipe."""
+    if not user.is_authenticated:
+        return Rating.objects.none()
+    return Rating.objects.filter(user=user)
+
 
+def build_recipe_data(recipe):
+    """
+    Return the tag names of the recipe page, which need queries of their own.
 
-def adjust_ingredient(ingredient, servings):
-    """Adjust ingredient amount for the given number of servings."""
-    adjusted_amount = round(ingredient.amount * servings * 10) / 10
+    Cached until the recipe, its tags, or any tag changes. While one
+    request reloads a changed recipe's data, others are served the data
+    loaded before.
+
+    Returns:
+        Dict with 'cuisine_tags' and 'dietary_tags', lists of tag names.
+    """
+    return versioned_cache.cached(
+        ('recipe_data', recipe.id), [(RECIPE, recipe.id), (TAGS, None)], RECIPE_DATA_TIMEOUT,
+        lambda: load_recipe_data(recipe), stale=True,
+    )
+
+
+def load_recipe_data(recipe):
+    """Load the tag names of a recipe, for `build_recipe_data`."""
     return {
-        'name': ingredient.name,
-        'amount': adjusted_amount,
-        'units': ingredient.units,
-        'base_amount': ingredient.amount,
+        'cuisine_tags': list(recipe.cuisine_tags.values_list('name', flat=True)),
+        'dietary_tags': list(recipe.dietary_tags.values_list('name', flat=True)),
     }
 
 
+def get_recipe_data(recipe, vector, servings=1):
+    """Get ingredients and instructions, adjusting amounts for servings."""
+    instructions = recipe.instructions.splitlines() if recipe.instructions else []
+    return scaling.scale(vector, servings), instructions
+
+
 def get_rating_data(recipe):
-    """Calculate average rating and total count for a recipe."""
-    avg_rating = Rating.objects.filter(recipe=recipe).aggregate(Avg('rating'))['rating__avg']
-    avg_rating = round(avg_rating, 1) if avg_rating else None
-    total_ratings = Rating.objects.filter(recipe=recipe).count()
-    return avg_rating, total_ratings
+    """Read the stored average rating and total count for a recipe."""
+    avg_rating = round(recipe.rating_average, 1) if recipe.rating_count else None
+    return avg_rating, recipe.rating_count
 
 
 def handle_rating_submission(request, recipe, user_rating):
@@ -58,10 +144,7 @@ def handle_rating_submission(request, recipe, user_rating):
     if not rating_form.is_valid():
         return None, rating_form, CommentForm()
 
-    rating = rating_form.save(commit=False)
-    rating.recipe = recipe
-    rating.user = request.user
-    rating.save()
+    Rating.rate(request.user, recipe, rating_form.cleaned_data['rating'])
     return build_redirect(request, recipe), None, None
 
 
@@ -104,22 +187,41 @@ def get_not_found_context():
     }
 
 
-def get_comments(recipe):
-    """Get all comments for a recipe, newest first."""
-    return Comment.objects.filter(recipe=recipe).order_by('-timestamp', '-id')
+def get_comment_page(recipe, cursor=None):
+    """Get one page of a recipe's comments with their authors, newest first."""
+    comments = (
+        Comment.objects.filter(recipe=recipe)
+        .select_related('author')
+        .order_by('-timestamp', '-id')
+    )
+    return CursorPaginator(comments, COMMENTS_PER_PAGE).get_page(cursor)
+
+
+def serialize_comment(comment):
+    """Build the JSON representation of a comment."""
+    return {
+        'id': comment.id,
+        'author': comment.author.username,
+        'author_url': reverse('user_profile', args=[comment.author_id]),
+        'avatar': comment.author.mini_gravatar(),
+        'text': comment.text,
+        'timestamp': comment.timestamp.isoformat(),
+    }
 
 
 def build_context(recipe, comment_form, rating_form, user_rating, request):
     """Build the full context dict for the recipe template."""
     servings = get_servings_from_request(request)
-    ingredients_list, instructions_list = get_recipe_data(recipe, servings)
+    recipe_data = build_recipe_data(recipe)
+    ingredients_list, instructions_list = get_recipe_data(recipe, scaling.get_vector(recipe.id), servings)
     avg_rating, total_ratings = get_rating_data(recipe)
-    has_fav = request.user.has_favourited(recipe) if request.user.is_authenticated else False
     return {
-        'recipe': recipe, 'comments': get_comments(recipe), 'ingredients_list': ingredients_list,
+        'recipe': recipe, 'comments': get_comment_page(recipe, request.GET.get('comments_cursor')),
+        'ingredients_list': ingredients_list,
+        'cuisine_tags': recipe_data['cuisine_tags'], 'dietary_tags': recipe_data['dietary_tags'],
         'form': comment_form, 'rating_form': rating_form, 'user_rating': user_rating,
         'avg_rating': avg_rating, 'total_ratings': total_ratings,
-        'instructions_list': instructions_list, 'has_favourited': has_fav, 'servings': servings,
+        'instructions_list': instructions_list, 'has_favourited': recipe.is_favourited, 'servings': servings,
     }
 
 
@@ -1,20 +1,70 @@
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.shortcuts import render
-from recipes.forms import CuisineTagForm, DietaryTagForm, RatingForm
-from recipes.models import CuisineTag, DietaryTag, Rating, Recipe
+from recipes import pagination, search, tag_cache, timeline, versioned_cache
+from recipes.page_cache import cache_anonymous_page
+from recipes.forms import CuisineTagForm, DietaryTagForm
+from recipes.helpers import build_recipe_cards
+from recipes.models import Recipe
+from recipes.versioned_cache import CATALOGUE, TAGS
 
+RECIPE_PAGE_TIMEOUT = 60 * 5
+WELCOME_PARAMS = ('q', 'sort', 'filter', 'cuisine_tags', 'dietary_tags', 'page', 'cursor')
 
+
+@cache_anonymous_page('welcome', WELCOME_PARAMS, [(CATALOGUE, None), (TAGS, None)])
 def welcome(request):
-    """Display the welcome page with filtered, sorted, paginated recipes."""
+    """
+    Display the welcome page with filtered, sorted, paginated recipes.
+
+    Logged-out visitors are served the whole page from the cache until a
+    recipe, rating or tag changes, when the page cache is enabled.
+    """
     params = extract_request_params(request)
-    recipes = get_filtered_recipes(params, request.user)
-    recipe_data = sort_recipes(build_recipe_data(recipes, request.user), params['sort'])
-    page_obj = paginate_recipes(recipe_data, request)
+    page_obj = get_recipe_page(params, request)
+    page_obj.object_list = build_recipe_cards(page_obj.object_list, request.user)
     context = build_welcome_context(params, page_obj, request)
     return render(request, 'welcome.html', context)
 
 
+def get_recipe_page(params, request):
+    """
+    Return the requested page of filtered and sorted recipes.
+
+    With a shared cache, a page that looks the same to every viewer is
+    cached as its recipe ids until a recipe, rating or tag changes. Once it
+    expires, one request recomputes it while the others are served the
+    previous page. The following filter depends on the viewer, so its pages
+    are never cached.
+    """
+    if uses_following_filter(params, request.user):
+        return build_recipe_page(params, request)
+    key_parts = (
+        'welcome_page', params['q'], params['sort'], params['cuisine_tags'], params['dietary_tags'],
+        request.GET.get('page'), request.GET.get('cursor'), pagination.cursor_pagination_enabled(),
+    )
+    built = {}
+
+    def build_frozen_page():
+        built['page'] = build_recipe_page(params, request)
+        return pagination.freeze_page(built['page'])
+
+    frozen = versioned_cache.cached(
+        key_parts, [(CATALOGUE, None), (TAGS, None)], RECIPE_PAGE_TIMEOUT, build_frozen_page, stale=True,
+    )
+    if 'page' in built:
+        return built['page']
+    return pagination.thaw_page(frozen, Recipe.objects.select_related('author'))
+
+
+def build_recipe_page(params, request):
+    """Filter, sort and paginate the recipes for the request."""
+    if uses_following_filter(params, request.user) and is_plain_timeline(params):
+        return timeline.following_page(request.user, 12, request.GET.get('page'), request.GET.get('cursor'))
+    recipes = get_filtered_recipes(params, request.user)
+    recipes = sort_recipes(recipes, params['sort'], ranked=uses_search_index(params))
+    return paginate_recipes(recipes, request)
+
+
 def extract_request_params(request):
     """Extract search and filter parameters from request."""
     return {
@@ -43,26 +93,37 @@ def extract_comma_separated_tags(tags_string):
     return [tag.strip() for tag in tags_string.split(',') if tag.strip()]
 
 
-def paginate_recipes(recipe_data, request):
-    """Paginate recipe data, 12 per page."""
-    paginator = Paginator(recipe_data, 12)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+def paginate_recipes(recipes, request):
+    """Paginate the recipe queryset, 12 per page, so only one page is fetched."""
+    return pagination.paginate(recipes, 12, request.GET.get('page'), request.GET.get('cursor'))
 
 
 def build_page_url_prefix(request):
     """Build the URL prefix for pagination links, preserving other params."""
+    page_param = 'cursor' if pagination.cursor_pagination_enabled() else 'page'
     query_params = request.GET.copy()
-    if 'page' in query_params:
-        query_params.pop('page')
+    for param in ('page', 'cursor'):
+        query_params.pop(param, None)
     query_string = query_params.urlencode()
-    return f'?{query_string}&page=' if query_string else '?page='
+    return f'?{query_string}&{page_param}=' if query_string else f'?{page_param}='
+
+
+def uses_search_index(params):
+    """Check whether the search query is answered by the full-text index."""
+    return bool(params['q']) and search.is_available()
 
 
 def apply_query_filter(recipes, query):
-    """Filter recipes by search query."""
+    """Filter recipes by search query, using the full-text index when available."""
     if not query:
         return recipes
+    if search.is_available():
+        return search.search_recipes(recipes, query)
+    return apply_substring_filter(recipes, query)
+
+
+def apply_substring_filter(recipes, query):
+    """Filter recipes by case-insensitive substring matches on every searched field."""
     return recipes.filter(
         Q(recipe_name__icontains=query) |
         Q(author__username__icontains=query) |
@@ -87,99 +148,74 @@ def apply_cuisine_filter(recipes, tag_names):
     """Filter recipes by cuisine tags."""
     if not tag_names:
         return recipes
-    matching_tags = get_matching_cuisine_tags(tag_names)
-    if not matching_tags:
+    matching_tag_ids = get_matching_cuisine_tags(tag_names)
+    if not matching_tag_ids:
         return recipes.none()
-    return recipes.filter(cuisine_tags__in=matching_tags).distinct()
+    return recipes.filter(cuisine_tags__in=matching_tag_ids).distinct()
 
 
 def apply_dietary_filter(recipes, tag_names):
     """Filter recipes by dietary tags."""
     if not tag_names:
         return recipes
-    matching_tags = get_matching_dietary_tags(tag_names)
-    if not matching_tags:
+    matching_tag_ids = get_matching_dietary_tags(tag_names)
+    if not matching_tag_ids:
         return recipes.none()
-    return recipes.filter(dietary_tags__in=matching_tags).distinct()
+    return recipes.filter(dietary_tags__in=matching_tag_ids).distinct()
 
 
 def get_matching_cuisine_tags(tag_names):
-    """Find cuisine tags matching the given names."""
-    all_tags = CuisineTag.objects.all()
-    lower_names = [name.strip().lower() for name in tag_names]
-    return [tag for tag in all_tags if tag.name.lower() in lower_names]
+    """Find the ids of cuisine tags matching the given names, ignoring case."""
+    return tag_cache.cuisine_tags.ids_matching(tag_names)
 
 
 def get_matching_dietary_tags(tag_names):
-    """Find dietary tags matching the given names."""
-    all_tags = DietaryTag.objects.all()
-    lower_names = [name.strip().lower() for name in tag_names]
-    return [tag for tag in all_tags if tag.name.lower() in lower_names]
-
-
-def apply_following_filter(recipes, filter_type, user):
-    """Filter to show only recipes from users the current user follows."""
-    if filter_type == 'following' and user.is_authenticated:
-        followed_users = user.get_following()
-        return recipes.filter(author__in=followed_users)
-    return recipes
+    """Find the ids of dietary tags matching the given names, ignoring case."""
+    return tag_cache.dietary_tags.ids_matching(tag_names)
 
 
-def build_recipe_data(recipes, user):
-    """Build a list of recipe data dicts with ratings and favourite status."""
-    return [build_single_recipe_data(recipe, user) for recipe in recipes]
+def uses_following_filter(params, user):
+    """Check whether only recipes from users the viewer follows are shown."""
+    return params['filter'] == 'following' and user.is_authenticated
 
 
-def build_single_recipe_data(recipe, user):
-    """Build the data dict for a single recipe card."""
-    avg_rating = recipe.average_rating()
-    is_fav = user.has_favourited(recipe) if user.is_authenticated else False
-    return {
-        'recipe': recipe,
-        'stars': build_stars(avg_rating),
-        'rating_form': get_rating_form(recipe, user),
-        'avg': avg_rating,
-        'is_favourite': is_fav,
-    }
-
+def is_plain_timeline(params):
+    """Check whether the following filter is the only filter and recipes are shown newest first."""
+    if params['sort'] in ('highest', 'lowest'):
+        return False
+    return not (params['q'] or params['cuisine_tags'] or params['dietary_tags'])
 
-def build_stars(avg_rating):
-    """Convert a rating to a list of star types for display."""
-    if avg_rating is None:
-        return []
-    full = int(avg_rating)
-    half = 1 if avg_rating - full >= 0.5 else 0
-    empty = 5 - full - half
-    return ['full'] * full + ['half'] * half + ['empty'] * empty
 
+def apply_following_filter(recipes, filter_type, user):
+    """Filter to show only recipes from users the current user follows."""
+    if filter_type == 'following' and user.is_authenticated:
+        return timeline.following_recipes(recipes, user)
+    return recipes
 
-def get_rating_form(recipe, user):
-    """Get a rating form pre-filled with the user's existing rating if any."""
-    if not user.is_authenticated:
-        return None
-    rating = Rating.objects.filter(recipe=recipe, user=user).first()
-    return RatingForm(instance=rating)
 
+def sort_recipes(recipes, sort_type, ranked=False):
+    """
+    Order recipes by their stored average rating if a sort type is specified.
 
-def sort_recipes(recipe_data, sort_type):
-    """Sort recipes by rating if a sort type is specified."""
+    Lowest rated is the exact reverse of highest rated, ties included, so
+    both are read in order from ``recipe_rating_average_idx``. Otherwise
+    full-text search results are ordered by bm25 relevance, and everything
+    else newest first.
+    """
     if sort_type == 'highest':
-        return sorted(recipe_data, key=rating_key, reverse=True)
+        return recipes.order_by('-rating_average', '-publication_date', '-id')
     if sort_type == 'lowest':
-        return sorted(recipe_data, key=rating_key)
-    return recipe_data
-
-
-def rating_key(item):
-    """Get rating value for sorting."""
-    return item['avg'] or 0
+        return recipes.order_by('rating_average', 'publication_date', 'id')
+    if ranked:
+        return recipes.order_by('search_entry__rank', '-publication_date', '-id')
+    return recipes.order_by('-publication_date', '-id')
 
 
 def get_filtered_recipes(params, user):
     """Apply all filters to get the final recipe queryset."""
     cuisine_tags = extract_comma_separated_tags(params['cuisine_tags'])
     dietary_tags = extract_comma_separated_tags(params['dietary_tags'])
-    recipes = Recipe.objects.all()
+    recipes = Recipe.objects.select_related('author')
     recipes = apply_query_filter(recipes, params['q'])
     recipes = apply_tag_filter(recipes, cuisine_tags, dietary_tags)
     recipes = apply_following_filter(recipes, params['filter'], user)
@@ -96,9 +96,60 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep each connection open across requests, so the pragmas below
+        # are set once per connection rather than once per request
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock when a transaction begins. A deferred
+            # transaction that reads and then writes fails at once with
+            # "database is locked" if another connection wrote in between,
+            # without waiting out the busy timeout.
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Every new SQLite connection runs the PRAGMA statements in
+# recipes.sqlite.DEFAULT_PRAGMAS: WAL so readers never wait for writers,
+# fsync only at checkpoints, a 128 MB memory map, a 32 MB page cache and
+# 5 seconds of waiting for locks. Set SQLITE_PRAGMAS to a dict of pragma
+# names and values to run those instead.
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Where cached data lives: 'locmem' keeps it in the memory of each process,
+# 'file' shares it between the processes on one machine through files under
+# CACHE_DIRECTORY. Values derived from several models, such as recipe cards,
+# recipe lists and pages, are only cached with 'file', since under 'locmem' a
+# change made through one process would not invalidate the others' copies.
+# Use 'file' whenever more than one process serves the site
+CACHE_BACKEND = 'locmem'
+CACHE_DIRECTORY = BASE_DIR / 'cache'
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'recipify',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIRECTORY,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
+}
+
+# Cache whole pages for logged-out visitors. Like every value derived from
+# several models, pages are only cached with the 'file' backend
+PAGE_CACHE = True
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -158,6 +209,14 @@ LOGIN_URL = 'log_in'
 # URL where @login_prohibited redirects to
 REDIRECT_URL_WHEN_LOGGED_IN = 'welcome'
 
+# Paginate recipe lists by opaque cursor (next/previous links, no total
+# count) instead of by page number
+CURSOR_PAGINATION = False
+
+# Where avatar images come from: 'gravatar' for gravatar.com, or 'local' for
+# identicons generated from the email hash and stored under MEDIA_ROOT
+AVATAR_BACKEND = 'gravatar'
+
 # CSRF and Session settings for PythonAnywhere
 # PythonAnywhere uses HTTPS, so we need secure cookies
 CSRF_TRUSTED_ORIGINS = [
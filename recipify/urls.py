@@ -17,7 +17,7 @@ Including another URLconf
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, re_path
 from recipes import views
 
 
@@ -31,17 +31,24 @@ urlpatterns = [
     path('sign_up/', views.SignUpView.as_view(), name='sign_up'),
     path('create_recipe/', views.create_recipe, name='create_recipe'),
     path("recipes/<int:recipe_id>/", views.recipe_view, name="recipe"),
+    path("recipes/<int:recipe_id>/comments/", views.recipe_comments, name="recipe_comments"),
+    path("recipes/<int:recipe_id>/scale/", views.scale_recipe, name="scale_recipe"),
     path('welcome/', views.welcome, name="welcome"),
     path('recipes/<int:pk>/rate/', views.rate_recipe, name='rate_recipe'),
     path('profile_page/', views.profile_page_view, name='profile_page'),
+    path('profile_page/<str:tab>/', views.profile_tab, name='profile_tab'),
     path('user/<int:user_id>/', views.other_user_profile_view, name='user_profile'),
     path('user/<int:user_id>/follow/', views.follow_user, name='follow_user'),
     path('user/<int:user_id>/unfollow/', views.unfollow_user, name='unfollow_user'),
+    path('user/<int:user_id>/follow/toggle/', views.toggle_follow, name='toggle_follow'),
     path('recipe/<int:recipe_id>/favourite/', views.favourite_recipe, name='favourite_recipe'),
     path('recipe/<int:recipe_id>/unfavourite/', views.unfavourite_recipe, name='unfavourite_recipe'),
+    path('recipe/<int:recipe_id>/favourite/toggle/', views.toggle_favourite, name='toggle_favourite'),
     path('favourites/', views.favourites_list, name='favourites_list'),
     path('recipe/<int:recipe_id>/edit/', views.edit_recipe, name='edit_recipe'),
     path('recipe/<int:recipe_id>/delete/', views.delete_recipe, name='delete_recipe'),
+    re_path(r'^avatars/(?P<email_hash>[0-9a-f]{32})/(?P<size>[0-9]+)\.png$', views.avatar, name='avatar'),
+    re_path(r'^avatars/default/(?P<size>[0-9]+)\.png$', views.default_avatar, name='default_avatar'),
 ]
 
 
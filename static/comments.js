@@ -0,0 +1,22 @@
+// Replace a comment list's "Load more" link with the next page of comments.
+// Without JavaScript the link loads the recipe page at that page instead.
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('[data-load-comments]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.dataset.loadComments, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.text();
+    })
+    .then(function (html) {
+      link.closest('.comment-more').outerHTML = html;
+    })
+    .catch(function () {
+      window.location = link.href;
+    });
+});
@@ -0,0 +1,53 @@
+// Switch profile tabs without reloading, fetching each tab's contents the
+// first time it is opened. Without JavaScript the tab links reload the page.
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('[data-profile-tab]');
+  if (!link) {
+    return;
+  }
+  var pane = document.getElementById(link.dataset.profileTab);
+  if (!pane) {
+    return;
+  }
+  event.preventDefault();
+  loadPane(pane)
+    .then(function () {
+      showTab(link, pane);
+      window.history.pushState(null, '', link.href);
+    })
+    .catch(function () {
+      window.location = link.href;
+    });
+});
+
+function loadPane(pane) {
+  if (!pane.dataset.tabUrl || pane.children.length) {
+    return Promise.resolve();
+  }
+  return fetch(pane.dataset.tabUrl, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.text();
+    })
+    .then(function (html) {
+      pane.innerHTML = html;
+    });
+}
+
+function showTab(link, pane) {
+  document.querySelectorAll('[data-profile-tab]').forEach(function (other) {
+    other.classList.toggle('active', other === link);
+  });
+  pane.parentElement.querySelectorAll(':scope > div').forEach(function (other) {
+    var selected = other === pane;
+    other.classList.toggle('show', selected);
+    other.classList.toggle('active', selected);
+    other.classList.toggle('d-none', !selected);
+  });
+}
+
+window.addEventListener('popstate', function () {
+  window.location.reload();
+});
@@ -0,0 +1,43 @@
+// Rescale the ingredients cards in place when the servings buttons are used.
+// Without JavaScript the buttons reload the recipe page with ?servings=N.
+document.addEventListener('submit', function (event) {
+  var form = event.target.closest('[data-scale-form]');
+  if (!form) {
+    return;
+  }
+  event.preventDefault();
+  var container = form.closest('[data-ingredients]');
+  var servings = form.elements.servings.value;
+  fetch(container.dataset.scaleUrl + '?servings=' + encodeURIComponent(servings))
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.json();
+    })
+    .then(function (data) {
+      document.querySelectorAll('[data-ingredients]').forEach(function (card) {
+        updateIngredientsCard(card, data);
+      });
+      var url = new URL(window.location.href);
+      url.searchParams.set('servings', data.servings);
+      window.history.replaceState(null, '', url);
+    })
+    .catch(function () {
+      form.submit();
+    });
+});
+
+function updateIngredientsCard(card, data) {
+  card.querySelectorAll('[data-ingredient-amount]').forEach(function (amount, index) {
+    var ingredient = data.ingredients[index];
+    amount.textContent = ingredient.amount + ' ' + ingredient.units;
+  });
+  card.querySelector('[data-servings-label]').textContent =
+    data.servings + ' serving' + (data.servings === 1 ? '' : 's');
+  card.querySelectorAll('[data-servings-step]').forEach(function (input) {
+    var servings = data.servings + Number(input.dataset.servingsStep);
+    input.value = servings;
+    input.form.querySelector('button').disabled = servings < 1;
+  });
+}
@@ -0,0 +1,37 @@
+// Submit favourite and follow buttons in the background, swapping in the
+// new button and updating the follower count shown for the user. Without
+// JavaScript the forms post normally and the page reloads.
+document.addEventListener('submit', function (event) {
+  var form = event.target.closest('[data-toggle-form]');
+  if (!form) {
+    return;
+  }
+  event.preventDefault();
+  var button = form.querySelector('button');
+  if (button.disabled) {
+    return;
+  }
+  button.disabled = true;
+  fetch(form.action + '?format=json', {
+    method: 'POST',
+    body: new FormData(form),
+    headers: { 'X-Requested-With': 'XMLHttpRequest' }
+  })
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.json();
+    })
+    .then(function (data) {
+      if (data.follower_count !== undefined) {
+        document.querySelectorAll('[data-follower-count="' + data.user_id + '"]').forEach(function (count) {
+          count.textContent = data.follower_count;
+        });
+      }
+      form.outerHTML = data.html;
+    })
+    .catch(function () {
+      form.submit();
+    });
+});